@@ -38,26 +38,41 @@ class TradingStrategy(Strategy):
         self.Weight_En = 0.4
         self.Weight_EAn = 0.6
 
+        # --- EARNINGS EVENT INDEX ---
+        # Scores are only recomputed for tickers whose earnings calendar,
+        # surprises or estimates changed since they were last scored.
+        self.score_cache = {}
+        self.event_marks = {}
+        self.rescore_on_report = False  # rebalance early when a held name reports
+
         # --- DATA LOADING (REPLACED DATASETS) ---
-        self.data_list = []
-        for ticker in self.tickers:
-            self.data_list.extend([
-                EarningsSurprises(ticker),
-                EarningsCalendar(ticker),
-                AnalystEstimates(ticker),
-                LeveredDCF(ticker)
-            ])
+        # Built on first access to `data`.
+        self.data_list = None
 
     @property
     def interval(self):
         return "1day"
 
+    @property
+    def max_lookback(self):
+        # 20 bars for liquidity; ATR(14) is smoothed, so keep enough bars for it to settle
+        return 500
+
     @property
     def assets(self):
         return self.tickers
 
     @property
     def data(self):
+        if self.data_list is None:
+            self.data_list = []
+            for ticker in self.tickers:
+                self.data_list.extend([
+                    EarningsSurprises(ticker),
+                    EarningsCalendar(ticker),
+                    AnalystEstimates(ticker),
+                    LeveredDCF(ticker)
+                ])
         return self.data_list
 
     # ------------------------------------------------------------------
@@ -120,10 +135,15 @@ class TradingStrategy(Strategy):
 
         # ---- REBALANCE TIMER ----
         self.days_since_rebalance += 1
+        intra_cycle = False
         if self.days_since_rebalance < self.rebalance_interval:
-            return TargetAllocation({})
-
-        self.days_since_rebalance = 0
+            reported = self.changed_tickers(active, data) if self.rescore_on_report else []
+            if not reported:
+                return TargetAllocation({})
+            log(f"Intra-cycle update, held names reported: {sorted(reported)}")
+            intra_cycle = True
+        else:
+            self.days_since_rebalance = 0
 
         # ---- UNIVERSE SCORING ----
         liquid = [
@@ -132,15 +152,26 @@ class TradingStrategy(Strategy):
         ]
 
         scores = {}
+        rescored = 0
         for ticker in liquid:
-            s = self.calculate_scores(ticker, data)
+            mark = self.event_fingerprint(ticker, data)
+            if ticker in self.score_cache and self.event_marks.get(ticker) == mark:
+                s = self.score_cache[ticker]
+            else:
+                s = self.calculate_scores(ticker, data)
+                if s:
+                    s["combined"] = (
+                        self.Weight_En * s["En"] +
+                        self.Weight_EAn * s["EAn"]
+                    )
+                self.score_cache[ticker] = s
+                self.event_marks[ticker] = mark
+                rescored += 1
             if s:
-                s["combined"] = (
-                    self.Weight_En * s["En"] +
-                    self.Weight_EAn * s["EAn"]
-                )
                 scores[ticker] = s
 
+        log(f"Rescored {rescored} of {len(liquid)} liquid tickers, {len(liquid) - rescored} from cache.")
+
         if not scores:
             return TargetAllocation({})
 
@@ -148,11 +179,13 @@ class TradingStrategy(Strategy):
             [v["combined"] for v in scores.values()], 90
         )
 
-        for t, v in scores.items():
-            if v["combined"] >= threshold:
-                self.percentile_streak[t] = self.percentile_streak.get(t, 0) + 1
-            else:
-                self.percentile_streak[t] = 0
+        # Intra-cycle updates refresh weights but do not count as a period
+        if not intra_cycle:
+            for t, v in scores.items():
+                if v["combined"] >= threshold:
+                    self.percentile_streak[t] = self.percentile_streak.get(t, 0) + 1
+                else:
+                    self.percentile_streak[t] = 0
 
         eligible = [t for t, c in self.percentile_streak.items() if c >= 3]
         final_assets = set(eligible) - to_exit
@@ -170,6 +203,34 @@ class TradingStrategy(Strategy):
 
         return TargetAllocation(allocation)
 
+    # ------------------------------------------------------------------
+    # EARNINGS EVENT INDEX
+    # ------------------------------------------------------------------
+    def event_fingerprint(self, ticker, data):
+        # Record counts plus the last calendar date and the fields
+        # calculate_scores reads: a new report or any EPS revision changes it,
+        # at a fraction of the cost of rescoring.
+        calendar = data.get(("earnings_calendar", ticker))
+        earnings = data.get(("earnings_surprises", ticker))
+        estimates = data.get(("analyst_estimates", ticker))
+        marks = [
+            (len(calendar), calendar[-1].get("date")) if calendar else None,
+            (len(earnings), earnings[-1].get("epsEstimated"), earnings[-1].get("epsactual")) if earnings else None,
+        ]
+        if estimates:
+            last = estimates[-1]
+            eps = tuple(e.get("eps") for e in estimates)
+            marks.append((len(estimates), eps, last.get("ebitdaAvg"), last.get("ebitdaActual")))
+        else:
+            marks.append(None)
+        return tuple(marks)
+
+    def changed_tickers(self, tickers, data):
+        return [
+            t for t in tickers
+            if t in self.event_marks and self.event_marks[t] != self.event_fingerprint(t, data)
+        ]
+
     # ------------------------------------------------------------------
     # SCORE CALCULATION (DATA ACCESS ADAPTED)
     # ------------------------------------------------------------------
@@ -2,7 +2,9 @@ from surmount.base_class import Strategy, TargetAllocation
 from surmount.technical_indicators import ATR
 from surmount.logging import log
 from surmount.data import EarningsSurprises, FinancialStatement, FinancialEstimates, LeveredDCF
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 import numpy as np
+import time
 
 class TradingStrategy(Strategy):
     def __init__(self):
@@ -85,24 +87,45 @@ class TradingStrategy(Strategy):
         self.Weight_En = 0.4
         self.Weight_EAn = 0.6
 
+        # --- REBALANCE DEADLINE ---
+        # Seconds a rebalance scan may take before we fall back to the current
+        # holdings for this bar (None = always wait for the scan). Enforced
+        # here because the host runner only calls run() and has no budget.
+        self.scan_deadline = None
+        self.scan_executor = None
+        self.pending_scan = None
+        self.bar_count = 0
+        self.scan_metrics = {'deadline_hits': 0, 'scan_durations': [], 'applied_staleness': []}
+        # Optional external scan backend called like scan_universe (e.g. a sharded coordinator)
+        self.scanner = None
+
         # --- DATA LOADING ---
-        self.data_list = []
-        for ticker in self.tickers:
-            self.data_list.append(EarningsSurprises(ticker))
-            self.data_list.append(FinancialStatement(ticker))
-            self.data_list.append(FinancialEstimates(ticker))
-            self.data_list.append(LeveredDCF(ticker))
+        # Built on first access to `data`; constructing ~2000 request objects
+        # dominated instantiation.
+        self.data_list = None
 
     @property
     def interval(self):
         return "1day"
 
+    @property
+    def max_lookback(self):
+        # 20 bars for liquidity; ATR(14) is smoothed, so keep enough bars for it to settle
+        return 500
+
     @property
     def assets(self):
         return self.tickers
 
     @property
     def data(self):
+        if self.data_list is None:
+            self.data_list = []
+            for ticker in self.tickers:
+                self.data_list.append(EarningsSurprises(ticker))
+                self.data_list.append(FinancialStatement(ticker))
+                self.data_list.append(FinancialEstimates(ticker))
+                self.data_list.append(LeveredDCF(ticker))
         return self.data_list
 
     def check_liquidity(self, ticker, ohlcv_data):
@@ -189,52 +212,103 @@ class TradingStrategy(Strategy):
 
         # 2. --- REBALANCE TIMER & LIQUIDITY FILTER ---
         self.days_since_rebalance += 1
+        self.bar_count += 1
         is_rebalance_day = self.days_since_rebalance >= self.rebalance_interval
 
+        # A scan that overran its deadline on an earlier bar is applied as soon
+        # as it has finished in the background.
+        if self.pending_scan is not None and self.pending_scan['future'].done():
+            pending, self.pending_scan = self.pending_scan, None
+            self.scan_metrics['applied_staleness'].append(self.bar_count - pending['bar'])
+            return self.apply_scan(pending['future'].result(), data, to_exit, partial_sells)
+
         # If it's NOT a rebalance day, we just want to maintain current positions
         # minus the exits/trims we calculated above.
         if not is_rebalance_day:
-            # To do: to review within surmount environment
-            # Get current allocation weights from the engine's perspective            
-            # Simplification: We return the same target allocation as yesterday 
-            # but zero out the 'to_exit' and reduce 'partial_sells'.
-            # However, since we don't store yesterday's exact target object, 
-            # Surmount usually requires a TargetAllocation. 
-            
-            # We will reconstruct targets based on current holdings value
-            total_portfolio_val = data.get("portfolio", {}).get("equity", 1.0) # avoid div by zero
-            current_allocations = {}
-            
-            for ticker, val in holdings.items():
-                if ticker in self.tickers: # Only manage our strategy assets
-                    # Get current price to estimate current weight
-                    # Assuming holdings[ticker] is quantity
-                    try:
-                        qty = val
-                        if qty > 0:
-                            price = ohlcv[ticker][-1]['close']
-                            weight = (qty * price) / total_portfolio_val
-                            current_allocations[ticker] = weight
-                    except:
-                        pass
-            
-            # Apply Exits
-            final_targets = {}
-            for t, w in current_allocations.items():
-                if t in to_exit:
-                    final_targets[t] = 0.0
-                    if t in self.holdings_info: del self.holdings_info[t]
-                elif t in partial_sells:
-                    final_targets[t] = w * partial_sells[t]
-                else:
-                    final_targets[t] = w # Keep holding
-            
-            return TargetAllocation(final_targets)
+            return self.hold_targets(data, to_exit, partial_sells)
+
+        if self.pending_scan is not None:
+            log("Previous rebalance scan still running, holding current positions.")
+            return self.hold_targets(data, to_exit, partial_sells)
 
         # 3. --- REBALANCING LOGIC (Only runs every 30 days) ---
         log("Performing Monthly Rebalance and Fundamental Scan...")
         self.days_since_rebalance = 0 # Reset timer
 
+        # Fix inception prices on this thread so the scan itself never mutates state
+        held_tickers = [t for t in self.holdings_info.keys() if t not in to_exit]
+        for ticker in held_tickers:
+            self.initial_prices.setdefault(ticker, ohlcv[ticker][-1]['close'])
+
+        if self.scan_deadline is None:
+            scan = self.timed_scan(data, held_tickers)
+        else:
+            if self.scan_executor is None:
+                self.scan_executor = ThreadPoolExecutor(max_workers=1)
+            future = self.scan_executor.submit(self.timed_scan, data, held_tickers)
+            try:
+                scan = future.result(timeout=self.scan_deadline)
+            except FutureTimeout:
+                # Fall back to the risk-managed holdings; the scan keeps running
+                # and its result is applied on the first bar after it finishes.
+                self.scan_metrics['deadline_hits'] += 1
+                self.pending_scan = {'future': future, 'bar': self.bar_count}
+                log(f"Rebalance scan exceeded {self.scan_deadline}s deadline, holding current positions.")
+                return self.hold_targets(data, to_exit, partial_sells)
+
+        self.scan_metrics['applied_staleness'].append(0)
+        return self.apply_scan(scan, data, to_exit, partial_sells)
+
+    def hold_targets(self, data, to_exit, partial_sells):
+        # To do: to review within surmount environment
+        # Get current allocation weights from the engine's perspective            
+        # Simplification: We return the same target allocation as yesterday 
+        # but zero out the 'to_exit' and reduce 'partial_sells'.
+        # However, since we don't store yesterday's exact target object, 
+        # Surmount usually requires a TargetAllocation. 
+        ohlcv = data.get("ohlcv", {})
+        holdings = data.get("holdings", {})
+
+        # We will reconstruct targets based on current holdings value
+        total_portfolio_val = data.get("portfolio", {}).get("equity", 1.0) # avoid div by zero
+        current_allocations = {}
+        
+        for ticker, val in holdings.items():
+            if ticker in self.tickers: # Only manage our strategy assets
+                # Get current price to estimate current weight
+                # Assuming holdings[ticker] is quantity
+                try:
+                    qty = val
+                    if qty > 0:
+                        price = ohlcv[ticker][-1]['close']
+                        weight = (qty * price) / total_portfolio_val
+                        current_allocations[ticker] = weight
+                except:
+                    pass
+        
+        # Apply Exits
+        final_targets = {}
+        for t, w in current_allocations.items():
+            if t in to_exit:
+                final_targets[t] = 0.0
+                if t in self.holdings_info: del self.holdings_info[t]
+            elif t in partial_sells:
+                final_targets[t] = w * partial_sells[t]
+            else:
+                final_targets[t] = w # Keep holding
+        
+        return TargetAllocation(final_targets)
+
+    def timed_scan(self, data, held_tickers):
+        started = time.perf_counter()
+        scan = (self.scanner or self.scan_universe)(data, held_tickers)
+        self.scan_metrics['scan_durations'].append(time.perf_counter() - started)
+        return scan
+
+    def scan_universe(self, data, held_tickers):
+        # Read-only part of the rebalance: liquidity, scores and func_DF.
+        # Safe to run off the main thread; all state changes happen in apply_scan.
+        ohlcv = data.get("ohlcv", {})
         universe_scores = {}
         
         # LIQUIDITY FIRST: Filter universe to only liquid assets to prevent slippage
@@ -255,6 +329,18 @@ class TradingStrategy(Strategy):
             else:
                 universe_scores[ticker] = {'En': -999, 'EAn': -999, 'combined': -999}
 
+        # Fundamental exit metric for the names we currently hold
+        func_values = {}
+        for ticker in held_tickers:
+            func_values[ticker] = self.func_DF(ticker, data, ohlcv[ticker][-1]['close'])
+
+        return {'liquid': liquid_tickers, 'scores': universe_scores, 'func_DF': func_values}
+
+    def apply_scan(self, scan, data, to_exit, partial_sells):
+        ohlcv = data.get("ohlcv", {})
+        liquid_tickers = scan['liquid']
+        universe_scores = scan['scores']
+
         # Determine 90th percentile among liquid assets
         combined_list = [v['combined'] for v in universe_scores.values()]
         percentile_threshold = np.percentile(combined_list, 90) if combined_list else float('-inf')
@@ -287,8 +373,9 @@ class TradingStrategy(Strategy):
             
             # If we currently hold it, check if we should drop it fundamentally
             if ticker in self.holdings_info:
-                current_price = ohlcv[ticker][-1]['close']
-                func_val = self.func_DF(ticker, data, current_price)
+                func_val = scan['func_DF'].get(ticker)
+                if func_val is None:
+                    func_val = self.func_DF(ticker, data, ohlcv[ticker][-1]['close'])
                 if func_val < percentile_threshold and max(scores['En'], scores['EAn']) < 0:
                     log(f"{ticker}: Exiting due to fundamental deterioration (Monthly Check)")
                     if ticker in self.holdings_info: del self.holdings_info[ticker]
@@ -336,6 +423,18 @@ class TradingStrategy(Strategy):
 
     def calculate_scores(self, ticker, data):
         # Compute En and EAn
+        components = self.calculate_components(ticker, data)
+        if components is None:
+            return None
+
+        En = (self.W1 * components['B1']) + (self.W2 * components['B2']) + (self.W3 * components['B3'])
+        EAn = (self.W1 * components['A1']) + (self.W2 * components['A2']) + (self.W3 * components['A3'])
+
+        return {'En': En, 'EAn': EAn}
+
+    def calculate_components(self, ticker, data):
+        # Raw B1..B3 / A1..A3 inputs; En and EAn are linear in these, so a
+        # weight sweep can reuse them without re-reading the feeds.
         try:
             earnings = data.get(("earnings_surprises", ticker))
             financials = data.get(("financial_statement", ticker))
@@ -373,10 +472,7 @@ class TradingStrategy(Strategy):
             ebitda_est_prev = get_val(estimates, "ebitdaAvg", -2)
             A3 = ebitda_act - ebitda_est_prev if (ebitda_act is not None and ebitda_est_prev is not None) else 0.0
 
-            En = (self.W1 * B1) + (self.W2 * B2) + (self.W3 * B3)
-            EAn = (self.W1 * A1) + (self.W2 * A2) + (self.W3 * A3)
-
-            return {'En': En, 'EAn': EAn}
+            return {'B1': B1, 'B2': B2, 'B3': B3, 'A1': A1, 'A2': A2, 'A3': A3}
         except Exception as exc:
             # log(f"Score error {ticker}: {exc}")
             return None
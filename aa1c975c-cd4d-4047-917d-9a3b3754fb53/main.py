@@ -39,6 +39,11 @@ class TradingStrategy(Strategy):
         """The data interval required for the strategy."""
         return "1day"
 
+    @property
+    def max_lookback(self):
+        """Bars of history read per run: the 150-day MA slope over its last 512 values."""
+        return 150 + 512
+
     # ----------------------
     # Helper functions for ROAR Score Calculation
     # ----------------------
@@ -12,6 +12,11 @@ class TradingStrategy(Strategy):
     def interval(self):
         return "1day"
 
+    @property
+    def max_lookback(self):
+        # SPY 100-day SMA
+        return 100
+
     @property
     def assets(self):
         return self.tickers
@@ -20,6 +25,11 @@ class TradingStrategy(Strategy):
     def data(self):
         return self.data_list
 
+    @property
+    def data_depth(self):
+        # Only the latest inverse_cramer record is read
+        return {("inverse_cramer",): 1}
+
     def run(self, data):
         # ----------------------
         # SPY 100-day SMA
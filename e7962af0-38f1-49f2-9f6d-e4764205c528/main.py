@@ -30,6 +30,11 @@ class TradingStrategy(Strategy):
     def interval(self):
         return "1day"
 
+    @property
+    def max_lookback(self):
+        # 120-bar warmup plus enough bars for the span-20 EWMs to converge
+        return 600
+
     # --------------------
     # Indicator helpers
     # --------------------
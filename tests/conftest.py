@@ -0,0 +1,36 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+RULE_DOCUMENT = os.path.join(ROOT, "7f0889f7-80ed-41e5-8a62-c83d6b009ce3", "main.json")
+
+
+def random_bars(tickers, length, seed=0):
+    """Aligned ``{ticker: {field: array}}`` random-walk OHLCV arrays."""
+    rng = np.random.default_rng(seed)
+    out = {}
+    for ticker in tickers:
+        close = 100.0 * np.cumprod(1.0 + rng.normal(0.0, 0.02, length))
+        spread = np.abs(rng.normal(0.0, 0.01, length))
+        out[ticker] = {
+            "open": close, "high": close * (1.0 + spread), "low": close * (1.0 - spread),
+            "close": close, "volume": rng.integers(1000, 100000, length).astype(float),
+        }
+    return out
+
+
+def bar_rows(arrays):
+    """Per-bar ``{ticker: {field: value}}`` rows from ``random_bars`` arrays."""
+    length = len(next(iter(arrays.values()))["close"])
+    return [{t: {f: float(v[i]) for f, v in fields.items()} for t, fields in arrays.items()} for i in range(length)]
+
+
+@pytest.fixture
+def rule_bars():
+    return random_bars(["TSLA", "AAPL", "SPY"], 400)
@@ -0,0 +1,18 @@
+from toolkit.allocations import ChangeDetector, fingerprint
+
+
+def test_fresh_targets_with_equal_weights_are_unchanged():
+    detector = ChangeDetector()
+    assert detector.observe("lipps", {"SPY": 0.7, "BIL": 0.3})
+    # A new object, other key order and re-normalization noise
+    assert not detector.observe("lipps", {"BIL": 0.3, "SPY": 0.7 + 1e-13})
+    assert detector.observe("lipps", {"SPY": 0.6, "BIL": 0.4})
+    shared = {"SPY": 1.0}
+    assert detector.observe("mirror", shared)
+    assert not detector.observe("mirror", shared)
+    assert detector.observe("mirror", None)
+    assert detector.stats() == {
+        "lipps": {"changed": 2, "unchanged": 1},
+        "mirror": {"changed": 2, "unchanged": 1},
+    }
+    assert fingerprint({"A": 0.5, "B": 0.5}) != fingerprint({"A": 0.5, "C": 0.5})
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from toolkit.bars import Resampler, interval_minutes, resample
+
+INTERVALS = ["30min", "1hour", "4hours"]
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def minute_stream(seed=0):
+    """
+    Minute bars of tickers A and B over two full days (pre- and post-market
+    included, with a gap before noon) and the first 97 minutes of a third.
+    B skips a tenth of the minutes.
+    """
+    rng = np.random.default_rng(seed)
+    minutes = []
+    for day, (start, stop) in zip(["2024-03-04", "2024-03-05", "2024-03-06"], [(540, 990), (540, 990), (570, 667)]):
+        base = np.datetime64(day + "T00:00")
+        minutes.extend(base + m for m in range(start, stop) if not (day == "2024-03-04" and 660 <= m < 675))
+    stream = []
+    close = {"A": 100.0, "B": 50.0}
+    for minute in minutes:
+        quotes = {}
+        for ticker in ("A", "B"):
+            if ticker == "B" and rng.random() < 0.1:
+                continue
+            opened = close[ticker]
+            close[ticker] = opened * (1.0 + rng.normal(0.0, 0.001))
+            high = max(opened, close[ticker]) * (1.0 + abs(rng.normal(0.0, 0.0005)))
+            low = min(opened, close[ticker]) * (1.0 - abs(rng.normal(0.0, 0.0005)))
+            quotes[ticker] = {"open": opened, "high": high, "low": low, "close": close[ticker],
+                              "volume": float(rng.integers(100, 5000))}
+        stream.append((str(minute).replace("T", " "), quotes))
+    return stream
+
+
+def ticker_arrays(stream, ticker):
+    rows = [(stamp, quotes[ticker]) for stamp, quotes in stream if ticker in quotes]
+    return [s for s, _ in rows], {f: np.array([q[f] for _, q in rows]) for f in FIELDS}
+
+
+def pandas_reference(stamps, bars, interval):
+    """Session bars from a per-day pandas ``resample`` anchored at 09:30."""
+    pd = pytest.importorskip("pandas")
+    frame = pd.DataFrame(bars, index=pd.to_datetime(stamps)).between_time("09:30", "15:59")
+    size = interval_minutes(interval)
+    rule = "%dmin" % size if size else "390min"
+    out = (frame.groupby(frame.index.normalize(), group_keys=False)
+           .apply(lambda day: day.resample(rule, origin="start_day", offset="9h30min")
+                  .agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}))
+           .dropna())
+    return {"date": [str(t) for t in out.index], **{f: out[f].to_numpy() for f in FIELDS}}
+
+
+@pytest.mark.parametrize("interval", INTERVALS + ["1day"])
+def test_resample_matches_pandas(interval):
+    stamps, bars = ticker_arrays(minute_stream(), "B")
+    expected = pandas_reference(stamps, bars, interval)
+    result = resample(stamps, bars, interval)
+    assert result["date"] == expected["date"]
+    for field in FIELDS:
+        np.testing.assert_allclose(result[field], expected[field], rtol=1e-12)
+
+
+def test_stream_builds_every_interval_in_sync():
+    stream = minute_stream()
+    resampler = Resampler(INTERVALS)
+    groups = []
+    for stamp, quotes in stream:
+        groups.extend(resampler.push(stamp, quotes))
+    tail = resampler.flush()
+    ends = {end: sorted(group) for end, group in groups}
+    # Intervals sharing an end stamp are emitted in one group
+    assert ends["2024-03-04 10:30:00"] == ["1hour", "30min"]
+    assert ends["2024-03-04 13:30:00"] == ["1hour", "30min", "4hours"]
+    assert ends["2024-03-04 16:00:00"] == ["1hour", "30min", "4hours"]
+    assert [end for end, _ in groups] == sorted(ends)
+    assert resampler.skipped == 2 * 60
+
+    for ticker in ("A", "B"):
+        stamps, bars = ticker_arrays(stream, ticker)
+        for interval in INTERVALS:
+            built = [g[interval][ticker] for _, g in groups + tail if ticker in g.get(interval, {})]
+            expected = resample(stamps, bars, interval)
+            assert [b["date"] for b in built] == expected["date"]
+            for field in FIELDS:
+                np.testing.assert_allclose([b[field] for b in built], expected[field], rtol=1e-12)
+            # Volume is conserved over the session minutes
+            in_session = [int(s[11:13]) * 60 + int(s[14:16]) for s in stamps]
+            session_volume = sum(v for m, v in zip(in_session, bars["volume"]) if 570 <= m < 960)
+            assert sum(b["volume"] for b in built) == pytest.approx(session_volume, rel=1e-12)
+
+
+def test_flush_flags_the_unfinished_session():
+    stream = minute_stream()
+    resampler = Resampler(INTERVALS)
+    for stamp, quotes in stream:
+        resampler.push(stamp, quotes)
+    # The third day stops at 11:06, inside the 11:00 half hour, 10:30 hour and 09:30 four hours
+    building = resampler.partial("4hours", "A")
+    assert building["date"] == "2024-03-06 09:30:00" and building["partial"]
+    assert "partial" not in resampler.building[("4hours", "A")][2]
+    tail = resampler.flush()
+    # Open buckets keep the end stamp of their interval
+    assert [(end, sorted(group)) for end, group in tail] == [
+        ("2024-03-06 11:30:00", ["1hour", "30min"]), ("2024-03-06 13:30:00", ["4hours"]),
+    ]
+    bars = {i: b for _, group in tail for i, b in group.items()}
+    assert {i: bars[i]["A"]["date"][11:] for i in INTERVALS} == {
+        "30min": "11:00:00", "1hour": "10:30:00", "4hours": "09:30:00",
+    }
+    assert all(bars[i][t]["partial"] for i in INTERVALS for t in bars[i])
+    assert resampler.building == {}
+
+
+def test_buckets_never_span_sessions():
+    resampler = Resampler(["4hours", "1day"])
+    start = np.datetime64("2024-03-04T13:30")
+    assert resampler.bucket("4hours", int(start.astype(np.int64))) == (
+        int(start.astype(np.int64)), int(np.datetime64("2024-03-04T16:00").astype(np.int64)),
+    )
+    stamps, bars = ticker_arrays(minute_stream(), "A")
+    days = resample(stamps, bars, "1day")["date"]
+    assert days == ["2024-03-04 09:30:00", "2024-03-05 09:30:00", "2024-03-06 09:30:00"]
@@ -0,0 +1,101 @@
+import os
+import textwrap
+
+import pytest
+
+from toolkit import batch
+from toolkit.batch import BatchBacktester
+
+MIRROR = """
+class TradingStrategy:
+    interval = "1day"
+    assets = []
+    data = [("congress_ls",)]
+
+    def run(self, data):
+        holdings = data[("congress_ls",)]
+        return holdings[-1]["allocations"] if holdings else {"SPY": 1}
+"""
+
+SINGLE = """
+class TradingStrategy:
+    interval = "1day"
+    assets = ["QQQ"]
+
+    def run(self, data):
+        return {"QQQ": 1.0 if len(data["ohlcv"]) % 2 else 0.5}
+"""
+
+
+def write_strategy(root, name, source):
+    folder = os.path.join(str(root), name)
+    os.makedirs(folder)
+    with open(os.path.join(folder, "main.py"), "w") as f:
+        f.write(textwrap.dedent(source))
+    return folder
+
+
+def daily(ticker, dates):
+    return [{"date": d, "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1.0} for d in dates]
+
+
+DATES = ["2024-01-0%d" % d for d in range(1, 10)]
+FEED = [
+    {"date": "2024-01-03", "allocations": {"AAPL": 1.0}},
+    {"date": "2024-01-06", "allocations": {"MSFT": 0.5, "NVDA": 0.5}},
+]
+
+
+def loaders(bars):
+    return (lambda tickers: {t: bars[t] for t in tickers if t in bars}), (lambda key: FEED)
+
+
+def test_assetless_mirror_runs_on_store_dates(tmp_path):
+    mirror = write_strategy(tmp_path, "mirror-batch", MIRROR)
+    load_bars, load_feed = loaders({"SPY": daily("SPY", DATES)})
+    bt = BatchBacktester([mirror], load_bars, load_feed, workers=0)
+    # No strategy in the batch declares assets, so the date axis comes from the feed
+    assert bt.store.dates == ["2024-01-03", "2024-01-06"]
+    [summary] = bt.run()
+    assert summary["bars"] == 2
+    assert [e["allocations"] for e in summary["timeline"]] == [{"AAPL": 1.0}, {"MSFT": 0.5, "NVDA": 0.5}]
+
+
+def test_assetless_mirror_alongside_bar_strategies(tmp_path):
+    mirror = write_strategy(tmp_path, "mirror-mixed", MIRROR)
+    single = write_strategy(tmp_path, "single-mixed", SINGLE)
+    load_bars, load_feed = loaders({"QQQ": daily("QQQ", DATES)})
+    summaries = BatchBacktester([mirror, single], load_bars, load_feed, workers=0).run()
+    assert [s["bars"] for s in summaries] == [len(DATES), len(DATES)]
+    timeline = summaries[0]["timeline"]
+    assert timeline[0] == {"date": DATES[0], "allocations": {"SPY": 1}}
+    assert timeline[1]["date"] == "2024-01-03"
+
+
+def test_strategy_steps_only_on_its_own_dates(tmp_path, monkeypatch):
+    single = write_strategy(tmp_path, "single-own", SINGLE)
+    mirror = write_strategy(tmp_path, "mirror-own", MIRROR)
+    bars = {"QQQ": daily("QQQ", DATES[::2]), "SPY": daily("SPY", DATES)}
+    load_bars, load_feed = loaders(bars)
+    # SPY trades every day, so the batch date axis is wider than QQQ's
+    spy = write_strategy(tmp_path, "spy-own", SINGLE.replace("QQQ", "SPY"))
+    for layout in ("bars", "by_ticker"):
+        monkeypatch.setattr(batch, "ohlcv_layout", lambda name, layout=layout: layout)
+        summaries = BatchBacktester([single, spy, mirror], load_bars, load_feed, workers=0).run()
+        assert [s["bars"] for s in summaries] == [len(DATES[::2]), len(DATES), len(DATES)]
+
+
+def test_zero_bar_strategy_warns(tmp_path):
+    single = write_strategy(tmp_path, "single-none", SINGLE)
+    load_bars, load_feed = loaders({"QQQ": daily("QQQ", DATES)})
+    bt = BatchBacktester([single], load_bars, load_feed, workers=0)
+    with pytest.warns(RuntimeWarning, match="no bars"):
+        [summary] = bt.run(start="2030-01-01")
+    assert summary["warning"] == "ran on no bars"
+
+
+def test_congress_mirror_gets_bars(tmp_path):
+    pytest.importorskip("surmount")
+    load_bars, load_feed = loaders({"SPY": daily("SPY", DATES)})
+    [summary] = BatchBacktester(["2b30b604-0280-4503-bf92-177c4ce8bfe6"], load_bars, load_feed, workers=0).run()
+    assert summary["bars"] == 2
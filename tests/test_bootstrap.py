@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from toolkit.allocations import weights_of
+from toolkit.asof import to_days
+from toolkit.bootstrap import (
+    TICKERS, RoarPaths, RotationPaths, TimingPaths, business_days, extended_tsi, regime_indices, transition_matrix,
+    trend_labels,
+)
+from toolkit.indicators import tsi
+from toolkit.strategies import load_strategy
+
+
+def test_trend_labels_mark_warmup():
+    close = np.concatenate([np.linspace(100.0, 50.0, 10), np.linspace(50.0, 80.0, 10)])
+    labels = trend_labels(close, window=5)
+    assert (labels[:4] == -1).all()
+    assert set(labels[4:]) <= {0, 1}
+    assert labels[-1] == 1
+
+
+def test_warmup_is_left_out_of_the_chain():
+    # A long warmup followed by alternating regimes
+    labels = np.array([-1] * 50 + [0, 1] * 25)
+    transitions = transition_matrix(labels)
+    np.testing.assert_array_equal(transitions, [[0.0, 1.0], [1.0, 0.0]])
+    index = regime_indices(np.random.default_rng(0), labels, 64, 40)
+    assert (index >= 50).all()
+
+
+def test_regime_needs_labeled_days():
+    with pytest.raises(ValueError):
+        regime_indices(np.random.default_rng(0), np.full(10, -1), 4, 5)
+
+
+def path_bars(length, seed=0):
+    """Daily ``{ticker: bar}`` rows of random walks over ``TICKERS`` on business days."""
+    rng = np.random.default_rng(seed)
+    days = business_days(length, "2015-01-02").astype("datetime64[D]")
+    close = 100.0 * np.cumprod(1.0 + rng.normal(0.0003, 0.012, (length, len(TICKERS))), axis=0)
+    spread = np.abs(rng.normal(0.0, 0.006, close.shape))
+    return [
+        {t: {"date": str(day) + " 00:00:00", "open": c, "high": c * (1 + s), "low": c * (1 - s), "close": c, "volume": 1e6}
+         for t, c, s in zip(TICKERS, row.tolist(), gap.tolist())}
+        for day, row, gap in zip(days, close, spread)
+    ]
+
+
+def script_weights(strategy, bars):
+    """Bar-by-bar targets of a strategy script over ``bars`` as a (D, N) array."""
+    instance = load_strategy(strategy)
+    rows = []
+    for i in range(len(bars)):
+        target = weights_of(instance.run({"ohlcv": bars[:i + 1]})) or {}
+        rows.append([target.get(t, 0.0) for t in TICKERS])
+    return np.array(rows)
+
+
+@pytest.mark.parametrize("rule, strategy", [
+    (TimingPaths(), "e7962af0-38f1-49f2-9f6d-e4764205c528"),
+    (RotationPaths(), "af802605-a874-4b74-95d7-9b882cc35f1f"),
+    (RoarPaths(), "006dcb7b-b78b-4772-bd0f-f7ffdfbb9f76"),
+])
+def test_rule_matches_script_on_one_path(rule, strategy):
+    pytest.importorskip("surmount")
+    pytest.importorskip("pandas")
+    bars = path_bars(420, seed=3)
+    paths = {f: np.array([[row[t][f] for t in TICKERS] for row in bars])[None] for f in ("close", "high", "low")}
+    days = to_days([row["SPY"]["date"] for row in bars])
+    weights = rule.weights(paths, days, list(TICKERS))[0]
+    expected = script_weights(strategy, bars)
+    assert np.abs(expected[:, TICKERS.index("SPY")]).sum() > 0
+    np.testing.assert_allclose(weights, expected, rtol=0, atol=1e-12)
+
+
+def test_extended_tsi_appends_the_partial_period():
+    rng = np.random.default_rng(1)
+    ends = 100.0 * np.cumprod(1.0 + rng.normal(0.0, 0.02, 40))
+    prior = np.array([3, 12, 40])
+    values = np.array([101.0, 97.5, 104.2])
+    expected = [tsi(np.append(ends[:k], v), 10, 10)[-1] for k, v in zip(prior, values)]
+    np.testing.assert_allclose(extended_tsi(ends, values, prior, 10), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("rule", [TimingPaths(), RotationPaths(), RoarPaths()])
+def test_rules_batch_paths_independently(rule):
+    bars = [path_bars(420, seed=s) for s in range(3)]
+    paths = {f: np.array([[[row[t][f] for t in TICKERS] for row in b] for b in bars]) for f in ("close", "high", "low")}
+    days = to_days([row["SPY"]["date"] for row in bars[0]])
+    batched = rule.weights(paths, days, list(TICKERS))
+    for p in range(3):
+        single = rule.weights({f: v[p:p + 1] for f, v in paths.items()}, days, list(TICKERS))[0]
+        np.testing.assert_allclose(batched[p], single, rtol=0, atol=1e-12)
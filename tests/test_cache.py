@@ -0,0 +1,83 @@
+import os
+
+from toolkit import batch, cache
+from toolkit.batch import BatchBacktester
+from toolkit.cache import ResultCache, duplicate_groups, source_key
+
+from test_batch import DATES, SINGLE, daily, loaders, write_strategy
+
+PLACEHOLDER = "#Type code here"
+
+
+def backtester(strategies, bars, result_cache, **options):
+    load_bars, load_feed = loaders(bars)
+    return BatchBacktester(strategies, load_bars, load_feed, workers=0, cache=result_cache, **options)
+
+
+def test_repeat_run_is_cached(tmp_path):
+    single = write_strategy(tmp_path, "single-cached", SINGLE)
+    result_cache = ResultCache(str(tmp_path / "cache"))
+    bars = {"QQQ": daily("QQQ", DATES)}
+    first = backtester([single], bars, result_cache).run()
+    second = backtester([single], bars, result_cache).run()
+    assert "cached" not in first[0] and second[0]["cached"]
+    assert second[0]["timeline"] == first[0]["timeline"]
+
+
+def test_key_changes_with_date_axis_and_range(tmp_path):
+    single = write_strategy(tmp_path, "single-axis", SINGLE)
+    result_cache = ResultCache(str(tmp_path / "cache"))
+    bt = backtester([single], {"QQQ": daily("QQQ", DATES)}, result_cache)
+    key = bt.result_key(single)
+    assert bt.result_key(single, start=DATES[2]) != key
+    assert bt.result_key(single, end=DATES[-2]) != key
+    # SPY widens the shared axis; QQQ's own bars are unchanged
+    spy = write_strategy(tmp_path, "spy-axis", SINGLE.replace("QQQ", "SPY"))
+    wider = backtester([single, spy], {"QQQ": daily("QQQ", DATES[::2]), "SPY": daily("SPY", DATES)}, result_cache)
+    alone = backtester([single], {"QQQ": daily("QQQ", DATES[::2])}, result_cache)
+    assert wider.result_key(single) != alone.result_key(single)
+
+
+def test_key_changes_with_data_layout_and_version(tmp_path, monkeypatch):
+    single = write_strategy(tmp_path, "single-key", SINGLE)
+    directory = str(tmp_path / "cache")
+    bars = {"QQQ": daily("QQQ", DATES)}
+    key = backtester([single], bars, ResultCache(directory)).result_key(single)
+    changed = {"QQQ": daily("QQQ", DATES[:-1])}
+    assert backtester([single], changed, ResultCache(directory)).result_key(single) != key
+    assert backtester([single], bars, ResultCache(directory, version="next")).result_key(single) != key
+    monkeypatch.setattr(batch, "ohlcv_layout", lambda name: "by_ticker")
+    assert backtester([single], bars, ResultCache(directory)).result_key(single) != key
+
+
+def test_runner_version_follows_runner_source(monkeypatch):
+    version = cache.runner_version()
+    monkeypatch.setattr(cache, "_runner_version", None)
+    monkeypatch.setattr(cache, "RUNNER_MODULES", cache.RUNNER_MODULES + ("metrics",))
+    assert cache.runner_version() != version
+
+
+def test_source_key_ignores_formatting(tmp_path):
+    single = write_strategy(tmp_path, "single-src", SINGLE)
+    indented = write_strategy(tmp_path, "single-indent", '"""Doc."""\n' + SINGLE.replace("    ", "  "))
+    assert source_key(single) == source_key(indented)
+    assert duplicate_groups([single, indented]) == {source_key(single): [single, indented]}
+
+
+def test_placeholder_folders_are_reported_not_grouped(tmp_path):
+    single = write_strategy(tmp_path, "single-real", SINGLE)
+    placeholders = [write_strategy(tmp_path, "placeholder-%d" % i, PLACEHOLDER) for i in range(2)]
+    assert duplicate_groups(placeholders) == {}
+    bt = backtester([placeholders[0], single, placeholders[1]], {"QQQ": daily("QQQ", DATES)},
+                    ResultCache(str(tmp_path / "cache")))
+    assert bt.skipped == placeholders
+    summaries = bt.run()
+    assert [s["strategy"] for s in summaries] == [placeholders[0], single, placeholders[1]]
+    assert "skipped" in summaries[0] and "skipped" in summaries[2]
+    assert summaries[1]["bars"] == len(DATES)
+
+
+def test_repo_placeholders_are_skipped():
+    names = ["0c607d8b-e810-411a-b74b-b7c9a2d07ad0", "80f3445c-9699-448c-8916-0de2fa00573d"]
+    assert all(os.path.exists(cache.strategy_path(n)) for n in names)
+    assert duplicate_groups(names) == {}
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from toolkit.allocations import TickerIndex
+
+FEEDS = {
+    "congress_buys": {"feed": "CongressBuys", "weight": 2.0},
+    "insider_purchases": {"feed": "InsiderPurchases", "weight": 1.0},
+    "analyst_long": {"feed": "AnalystLong", "weight": 1.0},
+}
+
+
+def feed_data(allocator, records):
+    return {allocator.keys[name]: [record] if record else [] for name, record in records.items()}
+
+
+@pytest.fixture
+def ensemble():
+    pytest.importorskip("surmount")
+    from toolkit import ensemble
+    return ensemble
+
+
+def test_feeds_blend_by_weight_and_recency(ensemble):
+    allocator = ensemble.EnsembleAllocator(FEEDS, index=TickerIndex())
+    records = {
+        # Shorts are dropped and each feed is normalized before blending
+        "congress_buys": {"date": "2024-01-10", "allocations": {"X": 0.6, "Y": 0.4, "Z": -0.5}},
+        "insider_purchases": {"date": "2024-01-20", "allocations": {"Y": 1.0, "W": 3.0}},
+        # An empty feed takes no weight
+        "analyst_long": None,
+    }
+    target = allocator.run(feed_data(allocator, records))
+    assert dict(target) == pytest.approx({"X": 0.4, "Y": 2 / 3 * 0.4 + 1 / 3 * 0.25, "W": 0.25}, abs=1e-12)
+
+    # congress_buys is 10 days older than the newest record: one half-life halves its weight of 2
+    decayed = ensemble.EnsembleAllocator(FEEDS, half_life_days=10, index=TickerIndex())
+    target = decayed.run(feed_data(decayed, records))
+    np.testing.assert_allclose(decayed.feed_weights(), [0.5, 0.5, 0.0])
+    assert dict(target) == pytest.approx({"X": 0.3, "Y": 0.325, "W": 0.375}, abs=1e-12)
+
+
+def test_bars_without_news_reuse_the_target(ensemble):
+    allocator = ensemble.EnsembleAllocator(FEEDS, index=TickerIndex())
+    records = {name: {"date": "2024-01-02", "allocations": {"X": 1.0}} for name in FEEDS}
+    first = allocator.run(feed_data(allocator, records))
+    # Equal records in new objects are no news either
+    again = {name: dict(record) for name, record in records.items()}
+    assert allocator.run(feed_data(allocator, again)) is first
+    records["analyst_long"] = {"date": "2024-01-03", "allocations": {"Y": 1.0}}
+    assert dict(allocator.run(feed_data(allocator, records))) == pytest.approx({"X": 0.75, "Y": 0.25})
+    assert (allocator.recomputed, allocator.reused) == (2, 1)
+
+
+def test_cap_redistributes_then_leaves_cash(ensemble):
+    np.testing.assert_allclose(ensemble.cap_weights(np.array([0.5, 0.3, 0.2]), 0.4), [0.4, 0.36, 0.24])
+    capped = ensemble.cap_weights(np.array([0.7, 0.3]), 0.4)
+    np.testing.assert_allclose(capped, [0.4, 0.4])
@@ -0,0 +1,89 @@
+import copy
+import timeit
+
+import pytest
+
+from toolkit.strategies import load_strategy
+
+EVENT_INDEX = "35dfce14-dcb1-4717-8d21-17445bf0f6cb"
+
+
+def feeds(ticker):
+    return {
+        ("earnings_calendar", ticker): [{"date": "2024-01-25"}, {"date": "2024-04-25"}],
+        ("earnings_surprises", ticker): [
+            {"date": "2023-10-26", "epsEstimated": 1.0, "epsactual": 1.1},
+            {"date": "2024-01-25", "epsEstimated": 1.2, "epsactual": 1.15},
+        ],
+        ("analyst_estimates", ticker): [
+            {"date": "2023-12-31", "eps": 1.1, "ebitdaAvg": 2e6, "ebitdaActual": 2.1e6},
+            {"date": "2024-03-31", "eps": 1.3, "ebitdaAvg": 2.2e6, "ebitdaActual": 2.0e6},
+        ],
+    }
+
+
+@pytest.fixture
+def strategy():
+    pytest.importorskip("surmount")
+    return load_strategy(EVENT_INDEX)
+
+
+def test_revised_earlier_estimate_changes_fingerprint(strategy):
+    data = feeds("AAPL")
+    mark = strategy.event_fingerprint("AAPL", data)
+    assert strategy.event_fingerprint("AAPL", copy.deepcopy(data)) == mark
+    revised = copy.deepcopy(data)
+    revised[("analyst_estimates", "AAPL")][0]["eps"] = 0.9
+    assert strategy.event_fingerprint("AAPL", revised) != mark
+    # The score only reads the latest surprise
+    older = copy.deepcopy(data)
+    older[("earnings_surprises", "AAPL")][0]["epsactual"] = 0.5
+    assert strategy.event_fingerprint("AAPL", older) == mark
+
+
+def test_revision_marks_ticker_changed(strategy):
+    data = feeds("AAPL")
+    strategy.event_marks["AAPL"] = strategy.event_fingerprint("AAPL", data)
+    assert strategy.changed_tickers(["AAPL"], data) == []
+    data[("analyst_estimates", "AAPL")][0]["eps"] = 0.9
+    assert strategy.changed_tickers(["AAPL"], data) == ["AAPL"]
+
+
+def long_feeds(ticker, records=40):
+    data = feeds(ticker)
+    data[("analyst_estimates", ticker)] = [
+        {"date": "20%02d-03-31" % (i % 100), "eps": 1.0 + 0.05 * i, "ebitdaAvg": 2e6, "ebitdaActual": 2.1e6}
+        for i in range(records)
+    ]
+    return data
+
+
+def rebalance_data(tickers):
+    data = {"ohlcv": {t: [{"close": 100.0, "high": 101.0, "low": 99.0, "volume": 1e6}] * 25 for t in tickers}}
+    data["holdings"] = {}
+    for ticker in tickers:
+        data.update(long_feeds(ticker))
+    return data
+
+
+def test_only_changed_tickers_are_rescored(strategy, monkeypatch):
+    tickers = ["T%d" % i for i in range(10)]
+    strategy.tickers = tickers
+    scored = []
+    score = strategy.calculate_scores
+    monkeypatch.setattr(strategy, "calculate_scores", lambda t, data: scored.append(t) or score(t, data))
+    data = rebalance_data(tickers)
+    strategy.run(data)
+    assert sorted(scored) == tickers
+    del scored[:]
+    data[("analyst_estimates", "T3")][0]["eps"] = 0.5
+    strategy.days_since_rebalance = strategy.rebalance_interval
+    strategy.run(data)
+    assert scored == ["T3"]
+
+
+def test_fingerprint_is_cheaper_than_rescoring(strategy):
+    data = long_feeds("AAPL")
+    fingerprint = min(timeit.repeat(lambda: strategy.event_fingerprint("AAPL", data), number=500, repeat=5))
+    rescore = min(timeit.repeat(lambda: strategy.calculate_scores("AAPL", data), number=500, repeat=5))
+    assert fingerprint * 3 < rescore
@@ -0,0 +1,55 @@
+from toolkit.events import FeedEventBus, PushRunner, ReplayPublisher
+
+TRADES = ("congress_trades",)
+PRICES = ("prices",)
+
+
+class Recorder:
+    """Returns the record count and last record date of every feed it reads."""
+
+    data = [TRADES, PRICES]
+
+    def run(self, data):
+        return {key[0]: (len(records), records[-1]["date"] if records else None) for key, records in data.items()}
+
+
+HISTORIES = {
+    TRADES: [{"date": "2024-01-02"}, {"date": "2024-01-04"}, {"date": "2024-01-05"}],
+    PRICES: [{"date": "2024-01-03"}, {"date": "2024-01-05T12:00:00"}],
+}
+
+EXPECTED = [
+    {"congress_trades": (1, "2024-01-02"), "prices": (0, None)},
+    {"congress_trades": (1, "2024-01-02"), "prices": (1, "2024-01-03")},
+    {"congress_trades": (2, "2024-01-04"), "prices": (1, "2024-01-03")},
+    {"congress_trades": (3, "2024-01-05"), "prices": (1, "2024-01-03")},
+    {"congress_trades": (3, "2024-01-05"), "prices": (2, "2024-01-05T12:00:00")},
+]
+
+
+def replay(threaded):
+    bus = FeedEventBus()
+    runner = PushRunner(Recorder(), bus, threaded=threaded)
+    # Publish everything before the worker starts, so it runs behind the bus
+    assert ReplayPublisher(bus, HISTORIES).run() == 5
+    if threaded:
+        runner.start()
+        runner.stop()
+    return [target for _, target in runner.emitted]
+
+
+def test_inline_runs_see_feeds_as_of_their_event():
+    assert replay(threaded=False) == EXPECTED
+
+
+def test_threaded_runs_see_feeds_as_of_their_event():
+    assert replay(threaded=True) == EXPECTED
+
+
+def test_records_as_of_sequence_respects_depth():
+    bus = FeedEventBus()
+    events = [bus.publish(TRADES, {"date": d}) for d in ("a", "b", "c")]
+    bus.publish(PRICES, {"date": "p"})
+    assert [r["date"] for r in bus.records(TRADES, depth=2, sequence=events[1]["sequence"])] == ["a", "b"]
+    assert [r["date"] for r in bus.records(TRADES, depth=2)] == ["b", "c"]
+    assert len(bus.records(PRICES, sequence=events[2]["sequence"])) == 0
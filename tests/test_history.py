@@ -0,0 +1,55 @@
+import numpy as np
+
+from toolkit.history import AllocationHistory
+
+
+def feed_records(count=50, seed=0):
+    """Records two days apart that mostly repeat, with names added, re-weighted, dropped and one empty."""
+    rng = np.random.default_rng(seed)
+    names = ["N%02d" % i for i in range(12)]
+    current = {"N00": 0.5, "N01": 0.5}
+    records = []
+    for day in range(count):
+        move = rng.random()
+        if move < 0.2:
+            current[str(rng.choice(names))] = round(float(rng.uniform(-0.5, 1.0)), 4)
+        elif move < 0.3 and len(current) > 1:
+            current.pop(sorted(current)[int(rng.integers(len(current)))])
+        elif move < 0.4 and current:
+            ticker = sorted(current)[0]
+            current[ticker] = current[ticker] + 0.01
+        allocations = {} if day == 17 else dict(current)
+        records.append({"date": str(np.datetime64("2024-01-01") + 2 * day), "allocations": allocations})
+    return records
+
+
+def test_round_trip_through_deltas(tmp_path):
+    records = feed_records()
+    history = AllocationHistory.encode(records, snapshot_every=8)
+    assert history.to_records() == records
+    assert [history.record(i) for i in range(len(records))] == [r["allocations"] for r in records]
+    assert history.record(-1) == records[-1]["allocations"]
+    # Deltas keep far fewer entries than the records themselves
+    assert len(history.ids) < sum(len(r["allocations"]) for r in records) / 2
+    assert history.snapshot.sum() == 7 and np.isnan(history.weights).any()
+
+    path = tmp_path / "history.npz"
+    history.save(path)
+    loaded = AllocationHistory.load(path)
+    assert loaded.to_records() == records
+    assert loaded.tickers == history.tickers
+
+
+def test_at_returns_latest_record_on_or_before():
+    records = feed_records()
+    history = AllocationHistory.encode(records, snapshot_every=8)
+    assert history.at("2023-12-31") is None
+    assert history.at("2024-01-01") == records[0]["allocations"]
+    # Records are two days apart: an in-between date sees the earlier one
+    assert history.at("2024-01-04") == records[1]["allocations"]
+    assert history.at("2030-01-01") == records[-1]["allocations"]
+
+
+def test_empty_history():
+    history = AllocationHistory.encode([])
+    assert len(history) == 0 and history.to_records() == []
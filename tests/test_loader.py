@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+from toolkit.loader import cold_starts
+
+from conftest import ROOT
+from test_batch import write_strategy
+
+STRATEGY = """
+import heavy_dependency
+
+
+class TradingStrategy:
+    assets = ["SPY"]
+
+    def run(self, data):
+        return {"SPY": heavy_dependency.WEIGHT}
+"""
+
+
+def test_import_has_no_side_effects():
+    code = (
+        "import sys, multiprocessing.forkserver as fs\n"
+        "before = list(fs._forkserver._preload_modules)\n"
+        "import toolkit.loader\n"
+        "assert 'pandas' not in sys.modules\n"
+        "assert fs._forkserver._preload_modules == before\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+def test_cold_starts_run_in_fresh_interpreters(tmp_path, monkeypatch):
+    (tmp_path / "heavy_dependency.py").write_text("WEIGHT = 1.0\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    names = [write_strategy(tmp_path, "uses-heavy-%d" % i, STRATEGY) for i in range(2)]
+    # One worker: a reused interpreter would have heavy_dependency imported already
+    first, second = cold_starts(names, workers=1)
+    assert first["modules"] == second["modules"] >= 2
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from toolkit.metrics import evaluate, price_panel, rolling_stats, summary, timeline_from, timeline_metrics, weight_matrix
+
+DATES = ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"]
+BARS = {
+    "A": [{"date": d, "close": c} for d, c in zip(DATES, [100.0, 110.0, 99.0, 108.9])],
+    # B has no bar on the 3rd: its last close carries forward
+    "B": [{"date": d, "close": 50.0} for d in DATES if d != "2024-01-03"],
+}
+TIMELINE = [{"date": "2024-01-01", "allocations": {"A": 1.0}}, {"date": "2024-01-03", "allocations": {"B": 1.0}}]
+
+
+def test_known_equity_curve():
+    result = timeline_metrics(TIMELINE, BARS, DATES, lag=1, cost_bps=10.0, window=2)
+    # Held one bar after each decision: A on the 2nd and 3rd, B on the 4th
+    np.testing.assert_allclose(result["costs"], [0.0, 0.001, 0.0, 0.002])
+    np.testing.assert_allclose(result["returns"], [0.0, 0.099, -0.1, -0.002])
+    np.testing.assert_allclose(result["equity"], [1.0, 1.099, 0.9891, 0.9891 * 0.998])
+    np.testing.assert_allclose(result["drawdown"], [0.0, 0.0, -0.1, 0.9891 * 0.998 / 1.099 - 1.0])
+    np.testing.assert_allclose(result["turnover"], [0.0, 0.5, 0.0, 1.0])
+    np.testing.assert_array_equal(result["positions"], [0, 1, 1, 1])
+    np.testing.assert_allclose(result["volatility"][1:], [np.std(r, ddof=1) * np.sqrt(252) for r in (
+        [0.0, 0.099], [0.099, -0.1], [-0.1, -0.002])])
+
+    figures = result["summary"]
+    assert figures["total_return"] == pytest.approx(0.9891 * 0.998 - 1.0)
+    assert figures["max_drawdown"] == pytest.approx(0.9891 * 0.998 / 1.099 - 1.0)
+    assert figures["costs"] == pytest.approx(0.003)
+    assert figures["turnover"] == pytest.approx(1.5 * 252 / 4)
+    assert figures["cagr"] == pytest.approx((0.9891 * 0.998) ** (252 / 4) - 1.0)
+    returns = np.array([0.0, 0.099, -0.1, -0.002])
+    assert figures["sharpe"] == pytest.approx(returns.mean() / returns.std(ddof=1) * np.sqrt(252))
+
+
+def test_lag_zero_earns_the_decision_bar():
+    weights, tickers = weight_matrix(TIMELINE, DATES)
+    assert tickers == ["A", "B"]
+    result = evaluate(weights, price_panel(BARS, DATES, tickers), lag=0)
+    np.testing.assert_allclose(result["returns"], [0.0, 0.1, 0.0, 0.0])
+    assert timeline_from(weights, DATES, tickers) == [
+        {"date": "2024-01-01", "allocations": {"A": 1.0, "B": 0.0}},
+        {"date": "2024-01-03", "allocations": {"A": 0.0, "B": 1.0}},
+    ]
+
+
+def test_leading_axis_matches_one_at_a_time():
+    rng = np.random.default_rng(0)
+    prices = 100.0 * np.cumprod(1.0 + rng.normal(0.0, 0.01, (3, 200, 4)), axis=1)
+    weights = rng.dirichlet(np.ones(4), (3, 200))
+    batched = evaluate(weights, prices, cost_bps=[1.0, 2.0, 3.0, 4.0], window=20)
+    for s in range(3):
+        single = evaluate(weights[s], prices[s], cost_bps=[1.0, 2.0, 3.0, 4.0], window=20)
+        for name, values in single.items():
+            np.testing.assert_allclose(batched[name][s], values, rtol=1e-10, equal_nan=True)
+    stats = summary(batched)
+    assert stats["sharpe"].shape == (3,)
+
+
+def test_rolling_stats_match_direct_windows():
+    returns = np.random.default_rng(1).normal(0.0005, 0.01, 300)
+    volatility, sharpe = rolling_stats(returns, window=63)
+    assert np.isnan(volatility[:62]).all()
+    windows = np.lib.stride_tricks.sliding_window_view(returns, 63)
+    std = windows.std(axis=1, ddof=1)
+    np.testing.assert_allclose(volatility[62:], std * np.sqrt(252), rtol=1e-8)
+    np.testing.assert_allclose(sharpe[62:], windows.mean(axis=1) / std * np.sqrt(252), rtol=1e-8)
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from toolkit.allocations import weights_of
+from toolkit.strategies import load_strategy
+
+from conftest import bar_rows, random_bars
+
+LENGTH = 160
+NAMES = ["AAPL", "MSFT", "XOM", "JPM", "SPY"]
+
+
+def feed_history(rng, count):
+    """``count`` feed records of random long/short allocations, with a few summing to 0."""
+    records = []
+    for i in range(count):
+        picks = rng.choice(NAMES, size=int(rng.integers(1, 4)), replace=False)
+        allocations = {str(t): round(float(rng.uniform(-0.4, 1.0)), 3) for t in picks}
+        if i % 7 == 3:
+            allocations = {str(picks[0]): 0.0}
+        records.append({"date": "rec-%03d" % i, "allocations": allocations})
+    return records
+
+
+def feed_schedule(index, rng):
+    """Records visible on each bar: empty before the first record, during an outage, or never."""
+    if index == 0:
+        return [[] for _ in range(LENGTH)]
+    start = 5 * index
+    history = feed_history(rng, LENGTH)
+    visible = []
+    for bar in range(LENGTH):
+        if bar < start or 90 <= bar < 100:
+            visible.append([])
+        else:
+            visible.append(history[:(bar - start) // 3 + 1])
+    return visible
+
+
+def ohlcv_rows():
+    rows = bar_rows(random_bars(["SPY", "GLD"], LENGTH, seed=4))
+    start = np.datetime64("2020-01-01")
+    for i, row in enumerate(rows):
+        date = str(start + i) + " 00:00:00"
+        for quote in row.values():
+            quote["date"] = date
+    return rows
+
+
+def test_engine_matches_every_mirror_script():
+    pytest.importorskip("surmount")
+    pytest.importorskip("pandas")
+    from toolkit.mirror import MirrorEngine
+
+    engine = MirrorEngine()
+    scripts = {name: load_strategy(config["source"]) for name, config in engine.configs.items()}
+    assert len(scripts) == 14
+    rng = np.random.default_rng(0)
+    feeds = {key: feed_schedule(i, rng) for i, key in enumerate(sorted(engine.requests))}
+    rows = ohlcv_rows()
+    spy_fallbacks = 0
+    for bar in range(LENGTH):
+        data = {"ohlcv": rows[:bar + 1]}
+        data.update({key: visible[bar] for key, visible in feeds.items()})
+        targets = engine.run(data)
+        for name, script in scripts.items():
+            expected = weights_of(script.run(data))
+            assert weights_of(targets[name]) == expected, (name, bar)
+            spy_fallbacks += expected == {"SPY": 1}
+    assert spy_fallbacks > 0
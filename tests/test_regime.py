@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from toolkit.allocations import weights_of
+from toolkit.regime import IncrementalSMA, RegimeService, RegimeSignal
+from toolkit.strategies import load_strategy
+
+from test_mirror import ohlcv_rows
+
+
+def test_sma_matches_pandas_rolling():
+    pd = pytest.importorskip("pandas")
+    values = 100.0 * np.cumprod(1.0 + np.random.default_rng(2).normal(0.0, 0.02, 1000))
+    sma = IncrementalSMA(100)
+    incremental = [sma.update(v) for v in values]
+    expected = pd.Series(values).rolling(100).mean()
+    assert incremental[:99] == [None] * 99
+    np.testing.assert_allclose(incremental[99:], expected[99:], rtol=1e-12)
+
+
+def test_service_matches_script_regimes():
+    pd = pytest.importorskip("pandas")
+    rows = ohlcv_rows()
+    service = RegimeService()
+    lows = service.subscribe("SPY", "low", 100)
+    closes = service.subscribe("SPY", "close", 100)
+    states = {lows: [], closes: []}
+    for bar in range(len(rows)):
+        # The full history is passed every bar, as data["ohlcv"] is
+        assert service.update(rows[:bar + 1]) == 1
+        for key in states:
+            states[key].append(service.state(key))
+    for key, recorded in states.items():
+        series = pd.Series([row["SPY"][key[1]] for row in rows])
+        expected = (series > series.rolling(100).mean()).tolist()
+        assert recorded == expected
+    assert states[lows] != states[closes]
+    assert service.bars_seen == len(rows)
+
+
+@pytest.mark.parametrize("name", ["congress_buys_regime", "inverse_cramer_regime"])
+def test_overlay_matches_script_through_warmup(name):
+    pytest.importorskip("surmount")
+    pytest.importorskip("pandas")
+    from toolkit.mirror import OVERLAYS, MirrorEngine
+
+    config = OVERLAYS[name]
+    engine = MirrorEngine(configs={}, overlays={name: config})
+    script = load_strategy(config["source"])
+    key = engine.feed_keys[name]
+    record = {"allocations": {"AAPL": 0.6, "TSLA": -0.2, "XOM": 0.4}}
+    rows = ohlcv_rows()
+    seen = set()
+    for bar in range(len(rows)):
+        data = {"ohlcv": rows[:bar + 1], key: [record] if bar % 4 else []}
+        expected = weights_of(script.run(data))
+        assert weights_of(engine.run(data)[name]) == expected, bar
+        seen.add(next(iter(expected)))
+    # Warmup fallback, risk-off and risk-on sleeves all occur
+    assert seen == {"SPY", "GLD"} and any(e["state"] for e in engine.regimes.events)
+    # a76b3a87 leaves its warmup after 10 bars, long before the SMA is filled
+    if name == "congress_buys_regime":
+        engine = MirrorEngine(configs={}, overlays={name: config})
+        assert weights_of(engine.run({"ohlcv": rows[:10], key: []})[name]) == {"GLD": 0.5}
+
+
+def test_hysteresis_holds_inside_band():
+    signal = RegimeSignal("SPY", "close", 2, hysteresis=0.1)
+    # SMA(2) of the last two prices; the band is +/-10% around it
+    prices = [100.0, 100.0, 125.0, 120.0, 115.0, 90.0, 85.0, 86.0, 100.0, 130.0]
+    states = [signal.update(p) for p in prices]
+    assert states == [False, False, True, True, True, False, False, False, False, True]
+
+    plain = RegimeSignal("SPY", "close", 2)
+    assert [plain.update(p) for p in prices] == [False, False, True, False, False, False, False, True, True, True]
+
+
+def test_flips_are_recorded_once_per_change():
+    service = RegimeService()
+    key = service.subscribe("SPY", "close", 2)
+    assert service.subscribe("SPY", "close", 2) == key and len(service.signals) == 1
+    closes = [10.0, 11.0, 12.0, 11.0, 10.0, 12.0]
+    rows = [{"SPY": {"date": "2024-01-%02d" % (i + 1), "close": c}} for i, c in enumerate(closes)]
+    service.update(rows[:3])
+    service.update(rows)
+    # A repeated call with no new bars changes nothing
+    assert service.update(rows) == 0
+    assert [(e["date"], e["state"], e["price"]) for e in service.events] == [
+        ("2024-01-02", True, 11.0), ("2024-01-04", False, 11.0), ("2024-01-06", True, 12.0),
+    ]
@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+
+from conftest import RULE_DOCUMENT, bar_rows
+from toolkit import indicators
+from toolkit.rules import RuleBatch, StreamingEvaluator, compile_document, load_plan
+
+
+def expected_weights(bars):
+    """7f0889f7 evaluated by hand: TSLA 80/SPY 20 when MFI14 > MFI30 and RSI14 < 70, else SPY 80/TSLA 20."""
+    tsla = bars["TSLA"]
+    mfi = lambda n: indicators.mfi(tsla["high"], tsla["low"], tsla["close"], tsla["volume"], n)
+    risk_on = (mfi(14) > mfi(30)) & (indicators.rsi(tsla["close"], 14) < 70)
+    return np.column_stack([np.where(risk_on, 0.8, 0.2), np.zeros(len(risk_on)), np.where(risk_on, 0.2, 0.8)])
+
+
+def test_main_json_compiles():
+    plan = load_plan(RULE_DOCUMENT)
+    assert plan.interval == "4hours"
+    assert plan.minutes == 240
+    assert plan.tickers == ["TSLA", "AAPL", "SPY"]
+    assert sorted((k.name, dict(k.args)["length"], k.ticker) for k in plan.indicators) == [
+        ("MFI", 14, "TSLA"), ("MFI", 30, "TSLA"), ("RSI", 14, "TSLA"),
+    ]
+    assert [node[0] for node in plan.nodes] == ["cmp", "cmp", "and"]
+
+
+def test_main_json_allocations(rule_bars):
+    plan = load_plan(RULE_DOCUMENT)
+    matrix = plan.evaluate(rule_bars)
+    np.testing.assert_allclose(matrix, expected_weights(rule_bars))
+    assert plan.targets(matrix)[-1] in ({"TSLA": 0.8, "SPY": 0.2}, {"SPY": 0.8, "TSLA": 0.2})
+    # Both branches are exercised by the random walk
+    assert len({tuple(row) for row in matrix.tolist()}) == 2
+
+
+def test_operators_chain_left_to_right(rule_bars):
+    with open(RULE_DOCUMENT) as f:
+        document = json.load(f)
+    conditions = document["strategy"][0]["conditions"]
+    extra = json.loads(json.dumps(conditions[1]))
+    extra.update(operator="OR", second={"name": "constant", "args": {"value": "10", "ticker": ""}}, comp="<")
+    conditions.append(extra)
+    plan = compile_document(document)
+    assert [node[0] for node in plan.nodes] == ["cmp", "cmp", "and", "cmp", "or"]
+    tsla = rule_bars["TSLA"]
+    mfi = lambda n: indicators.mfi(tsla["high"], tsla["low"], tsla["close"], tsla["volume"], n)
+    rsi = indicators.rsi(tsla["close"], 14)
+    risk_on = ((mfi(14) > mfi(30)) & (rsi < 70)) | (rsi < 10)
+    np.testing.assert_allclose(plan.evaluate(rule_bars)[:, 0], np.where(risk_on, 0.8, 0.2))
+
+
+def test_streaming_matches_vectorized(rule_bars):
+    plan = load_plan(RULE_DOCUMENT)
+    expected = plan.targets(plan.evaluate(rule_bars))
+    evaluator = StreamingEvaluator(plan)
+    assert [evaluator.update(row) for row in bar_rows(rule_bars)] == expected
+    assert evaluator.report()["bars"] == len(expected)
+
+
+def variants():
+    """main.json plus copies with changed thresholds, lengths and comparators."""
+    with open(RULE_DOCUMENT) as f:
+        base = json.load(f)
+    documents = [base]
+    for edit in (
+        lambda c: c[1]["second"]["args"].update(value="60"),
+        lambda c: c[0]["second"]["args"].update(length="20"),
+        lambda c: c[0].update(comp="<"),
+        lambda c: c[1].update(operator="OR"),
+    ):
+        document = json.loads(json.dumps(base))
+        edit(document["strategy"][0]["conditions"])
+        documents.append(document)
+    return documents
+
+
+def test_batch_matches_streaming(rule_bars):
+    documents = variants()
+    batch = RuleBatch(documents)
+    assert batch.stats()["unique_indicators"] == 4
+    streams = [StreamingEvaluator(compile_document(d)) for d in documents]
+    for row in bar_rows(rule_bars):
+        assert batch.update({"4hours": row}) == [s.update(row) for s in streams]
+
+
+def test_batch_matches_vectorized(rule_bars):
+    documents = variants()
+    matrices = RuleBatch(documents).evaluate({"4hours": rule_bars})
+    for document, matrix in zip(documents, matrices):
+        np.testing.assert_array_equal(matrix, compile_document(document).evaluate(rule_bars))
+    assert len({m.tobytes() for m in matrices}) == len(documents)
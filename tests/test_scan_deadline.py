@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from toolkit.allocations import weights_of
+from toolkit.strategies import load_strategy
+
+FUNDAMENTAL = "78bf1974-7e8a-4f7b-930d-a9348c34d52f"
+SCAN = {"liquid": ["BBB"], "scores": {"BBB": {"En": 1.0, "EAn": 1.0, "combined": 5.0}}, "func_DF": {}}
+
+
+class SlowScanner:
+    """Scan backend that blocks until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def __call__(self, data, held_tickers):
+        self.calls += 1
+        assert self.release.wait(10)
+        return SCAN
+
+
+def bar_data():
+    bar = {"open": 100.0, "high": 101.0, "low": 99.0, "close": 100.0, "volume": 1e6}
+    return {"ohlcv": {"AAA": [bar] * 5, "BBB": [bar] * 5}, "holdings": {"AAA": 5}, "portfolio": {"equity": 1000.0}}
+
+
+@pytest.fixture
+def strategy():
+    pytest.importorskip("surmount")
+    strategy = load_strategy(FUNDAMENTAL)
+    strategy.tickers = ["AAA", "BBB"]
+    # BBB completes its three-period streak with this scan
+    strategy.percentile_streak = {"BBB": 2}
+    strategy.scanner = SlowScanner()
+    yield strategy
+    strategy.scanner.release.set()
+    if strategy.scan_executor is not None:
+        strategy.scan_executor.shutdown()
+
+
+def test_overrun_holds_then_applies_on_a_later_bar(strategy):
+    strategy.scan_deadline = 0.05
+    hold = {"AAA": 0.5}
+    assert weights_of(strategy.run(bar_data())) == hold
+    assert strategy.scan_metrics["deadline_hits"] == 1
+    # Still running: keep holding
+    assert weights_of(strategy.run(bar_data())) == hold
+    strategy.scanner.release.set()
+    strategy.pending_scan["future"].result(timeout=10)
+    assert weights_of(strategy.run(bar_data())) == {"BBB": 1.0}
+    assert strategy.pending_scan is None
+    assert strategy.scanner.calls == 1
+    assert strategy.scan_metrics["applied_staleness"] == [2]
+    [duration] = strategy.scan_metrics["scan_durations"]
+    assert duration >= 0.05
+
+
+def test_scan_within_deadline_applies_at_once(strategy):
+    strategy.scan_deadline = 5.0
+    strategy.scanner.release.set()
+    assert weights_of(strategy.run(bar_data())) == {"BBB": 1.0}
+    assert strategy.scan_metrics["deadline_hits"] == 0
+    assert strategy.scan_metrics["applied_staleness"] == [0]
+    assert len(strategy.scan_metrics["scan_durations"]) == 1
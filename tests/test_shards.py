@@ -0,0 +1,105 @@
+import textwrap
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from types import SimpleNamespace
+
+import pytest
+
+from toolkit import shards
+from toolkit.shards import SCAN_PARAMS, LocalCluster, ShardCoordinator, ShardError
+
+SCANNER = """
+class TradingStrategy:
+    def scan_universe(self, data, held):
+        if self.W1 < 0:
+            raise ValueError("negative weight")
+        return {
+            "liquid": [t for t in self.tickers if t in data["ohlcv"]],
+            "scores": {t: self.W1 * data["ohlcv"][t][-1]["close"] for t in self.tickers},
+            "func_DF": {t: self.initial_prices[t] for t in held},
+        }
+"""
+
+
+@pytest.fixture(scope="module")
+def scanner(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("shards") / "scanner"
+    folder.mkdir()
+    (folder / "main.py").write_text(textwrap.dedent(SCANNER))
+    return str(folder)
+
+
+def strategy(tickers, w1=1.0):
+    params = dict.fromkeys(SCAN_PARAMS, 1.0)
+    params["W1"] = w1
+    return SimpleNamespace(tickers=tickers, initial_prices={"B": 7.0, "E": 9.0}, func_DF=None, **params)
+
+
+def data(tickers):
+    return {"ohlcv": {t: [{"close": float(i)}] for i, t in enumerate(tickers)}}
+
+
+def test_round_trip_merges_shards(scanner):
+    tickers = ["A", "B", "C", "D", "E"]
+    with LocalCluster(scanner, 2) as cluster:
+        coordinator = ShardCoordinator(strategy(tickers), cluster.addresses, cluster.authkey)
+        try:
+            merged = coordinator(data(tickers), ["B", "E"])
+        finally:
+            coordinator.close()
+    assert merged["liquid"] == tickers
+    assert merged["scores"] == {t: float(i) for i, t in enumerate(tickers)}
+    assert merged["func_DF"] == {"B": 7.0, "E": 9.0}
+
+
+def test_failed_request_is_reported_and_worker_survives(scanner):
+    tickers = ["A", "B"]
+    with LocalCluster(scanner, 1) as cluster:
+        coordinator = ShardCoordinator(strategy(tickers, w1=-1.0), cluster.addresses, cluster.authkey)
+        try:
+            with pytest.raises(ShardError, match="negative weight"):
+                coordinator(data(tickers), [])
+            coordinator.strategy.W1 = 2.0
+            assert coordinator(data(tickers), [])["scores"] == {"A": 0.0, "B": 2.0}
+        finally:
+            coordinator.close()
+        with Client(cluster.addresses[0], authkey=cluster.authkey) as conn:
+            conn.send("garbage")
+            status, text = conn.recv()
+        assert status == "error" and "unknown message" in text
+
+
+def test_failed_request_leaves_no_stale_replies(scanner):
+    tickers = ["A", "B", "C", "D"]
+    with LocalCluster(scanner, 2) as cluster:
+        coordinator = ShardCoordinator(strategy(tickers, w1=-1.0), cluster.addresses, cluster.authkey)
+        try:
+            with pytest.raises(ShardError, match="negative weight"):
+                coordinator(data(tickers), [])
+            coordinator.strategy.W1 = 2.0
+            merged = coordinator(data(tickers), [])
+        finally:
+            coordinator.close()
+    assert merged["scores"] == {"A": 0.0, "B": 2.0, "C": 4.0, "D": 6.0}
+
+
+def test_wrong_key_is_rejected(scanner):
+    with LocalCluster(scanner, 1) as cluster:
+        assert cluster.addresses[0][0] == "127.0.0.1"
+        with pytest.raises(AuthenticationError):
+            Client(cluster.addresses[0], authkey=b"not-the-key")
+        # The worker is still serving after the failed handshake
+        with Client(cluster.addresses[0], authkey=cluster.authkey) as conn:
+            conn.send("ping")
+            assert conn.recv()[0] == "error"
+
+
+def test_key_is_required(monkeypatch):
+    monkeypatch.delenv(shards.AUTHKEY_ENV, raising=False)
+    with pytest.raises(SystemExit):
+        shards.main(["serve", "0", "scanner"])
+    with pytest.raises(ValueError):
+        shards.authkey_from_env({})
+    assert shards.authkey_from_env({shards.AUTHKEY_ENV: "secret"}) == b"secret"
+    assert shards.parse_address("9000") == ("127.0.0.1", 9000)
+    assert shards.parse_address("0.0.0.0:9000") == ("0.0.0.0", 9000)
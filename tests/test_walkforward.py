@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from toolkit.walkforward import TIMING_DEFAULTS, LippsTimingRule, WalkForward, folds, grid
+
+from test_bootstrap import path_bars, script_weights
+
+TIMING = "e7962af0-38f1-49f2-9f6d-e4764205c528"
+
+
+def rule_bars(rows, tickers=("SPY", "BIL")):
+    return {t: [row[t] for row in rows] for t in tickers}
+
+
+def test_defaults_match_script_on_every_bar():
+    pytest.importorskip("surmount")
+    pytest.importorskip("pandas")
+    rows = path_bars(900, seed=11)
+    weights = LippsTimingRule(rule_bars(rows)).weights(TIMING_DEFAULTS)
+    expected = script_weights(TIMING, rows)[:, [0, -1]]
+    # Both sleeves and several switches occur
+    assert 0 < expected[:, 0].sum() < len(rows) and np.abs(np.diff(expected[:, 0])).sum() >= 4
+    np.testing.assert_array_equal(weights, expected)
+
+
+def test_folds_roll_and_anchor():
+    rolling = folds(10, train=4, test=2)
+    assert [(f.start, f.stop, t.start, t.stop) for f, t in rolling] == [(0, 4, 4, 6), (2, 6, 6, 8), (4, 8, 8, 10)]
+    anchored = folds(10, train=4, test=3, step=2, anchored=True)
+    assert [(f.start, f.stop, t.start, t.stop) for f, t in anchored] == [(0, 4, 4, 7), (0, 6, 6, 9)]
+    assert len(grid({"a": [1, 2], "b": [3, 4, 5]})) == 6
+
+
+def test_each_fold_trades_its_train_winner():
+    rule = LippsTimingRule(rule_bars(path_bars(700, seed=2)))
+    candidates = grid({"midline": [11, 31], "rebalance_day": [1, 3]})
+    study = WalkForward(rule, candidates, train=250, test=100, workers=0, chunk_size=3)
+    result = study.run()
+    returns = study.search()
+    assert returns.shape == (4, 700) and len(result["folds"]) == 4
+    span = study.folds[0][1].start
+    for (train, test), fold in zip(study.folds, result["folds"]):
+        best = int(np.argmax(study.objective(returns[:, train])))
+        assert fold["params"] == candidates[best]
+        # Out of sample, each test bar earns what the fold's winner earned on it
+        stitched = result["metrics"]["returns"][test.start - span:test.stop - span]
+        np.testing.assert_allclose(stitched, returns[best, test], rtol=0, atol=1e-15)
+    assert result["metrics"]["returns"].shape == (400,)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from toolkit.allocations import weights_of
+from toolkit.strategies import load_strategy
+from toolkit.weight_sweep import COMPONENTS, MISSING_SCORE, sweep
+
+WEIGHTS = [(0.5, 0.3, 0.2, 0.4, 0.6), (0.2, 0.2, 0.6, 0.9, 0.1)]
+
+
+def random_components(n_dates, n_tickers, seed=0):
+    rng = np.random.default_rng(seed)
+    components = rng.normal(0.2, 1.0, (len(COMPONENTS), n_dates, n_tickers))
+    components[:, rng.random((n_dates, n_tickers)) < 0.05] = np.nan
+    liquid = rng.random((n_dates, n_tickers)) < 0.9
+    return components, liquid
+
+
+def test_held_names_outlast_their_streak():
+    # Ticker 0 leads for three scans, then falls to the bottom
+    components = np.zeros((len(COMPONENTS), 5, 10))
+    components[:, :, 1:] = np.linspace(0.1, 0.9, 9)
+    components[:, :3, 0] = 2.0
+    components[:, 3:, 0] = 0.05
+    liquid = np.ones((5, 10), dtype=bool)
+    result = sweep(components, liquid, WEIGHTS[:1], streak=3, keep=[0])
+    allocations = result["allocations"][0]
+    assert allocations[:2].sum() == 0
+    assert allocations[2, 0] == 1.0
+    assert (allocations[3:, 0] > 0).all()
+
+    exits = np.zeros((5, 10), dtype=bool)
+    exits[3, 0] = True
+    allocations = sweep(components, liquid, WEIGHTS[:1], streak=3, keep=[0], exits=exits)["allocations"][0]
+    assert (allocations[3:, 0] == 0).all()
+
+
+def scan_of(strategy, components, liquid, d, tickers):
+    w1, w2, w3 = strategy.W1, strategy.W2, strategy.W3
+    scores = {}
+    for j, ticker in enumerate(tickers):
+        if not liquid[d, j]:
+            continue
+        b1, b2, b3, a1, a2, a3 = components[:, d, j]
+        if np.isnan(components[:, d, j]).any():
+            scores[ticker] = {"En": MISSING_SCORE, "EAn": MISSING_SCORE, "combined": MISSING_SCORE}
+            continue
+        en, ean = w1 * b1 + w2 * b2 + w3 * b3, w1 * a1 + w2 * a2 + w3 * a3
+        scores[ticker] = {"En": en, "EAn": ean, "combined": strategy.Weight_En * en + strategy.Weight_EAn * ean}
+    # func_DF never triggers the fundamental exit, which the sweep does not model
+    held = {t: float("inf") for t in strategy.holdings_info}
+    return {"liquid": [t for t, ok in zip(tickers, liquid[d]) if ok], "scores": scores, "func_DF": held}
+
+
+@pytest.mark.parametrize("candidate", range(len(WEIGHTS)))
+def test_sweep_matches_apply_scan(candidate):
+    pytest.importorskip("surmount")
+    components, liquid = random_components(18, 40)
+    strategy = load_strategy("78bf1974-7e8a-4f7b-930d-a9348c34d52f")
+    strategy.W1, strategy.W2, strategy.W3, strategy.Weight_En, strategy.Weight_EAn = WEIGHTS[candidate]
+    tickers = strategy.tickers[:40]
+    data = {"ohlcv": {t: [{"close": 1.0}] for t in tickers}}
+    result = sweep(components, liquid, WEIGHTS, keep=[candidate])
+    for d in range(components.shape[1]):
+        scan = scan_of(strategy, components, liquid, d, tickers)
+        target = weights_of(strategy.apply_scan(scan, data, set(), {})) or {}
+        expected = np.array([target.get(t, 0.0) for t in tickers])
+        np.testing.assert_allclose(result["allocations"][candidate][d], expected, atol=1e-12)
@@ -0,0 +1,7 @@
+"""
+Shared research and runtime helpers for the strategies in this repository.
+
+Strategy folders stay self-contained so they can be deployed as single files;
+everything in this package is used by our own backtests and runners around
+them, never imported by a strategy's main.py.
+"""
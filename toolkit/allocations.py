@@ -0,0 +1,219 @@
+"""
+Allocation helpers shared by the runners and engines in this package.
+"""
+import hashlib
+import struct
+
+import numpy as np
+
+
+def weights_of(target):
+    """The weight dict behind a TargetAllocation (or a plain dict)."""
+    if target is None or isinstance(target, dict):
+        return target
+    for attr in ("allocations", "target_allocations", "allocation"):
+        weights = getattr(target, attr, None)
+        if isinstance(weights, dict):
+            return weights
+    return dict(target)
+
+
+def fingerprint(weights, precision=10):
+    """
+    Cheap content hash of an allocation, independent of key order.
+
+    Weights are rounded to ``precision`` decimals so float noise from
+    re-normalizing the same record does not count as a change.
+    """
+    if weights is None:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    for ticker in sorted(weights):
+        digest.update(ticker.encode())
+        digest.update(struct.pack("<d", round(float(weights[ticker]), precision)))
+    return digest.digest()
+
+
+class ChangeDetector:
+    """
+    Tells a runner whether a strategy's target changed since its last bar.
+
+    The content fingerprint decides, so strategies can build a fresh
+    TargetAllocation every bar; the identical object (as ``MirrorEngine``
+    returns for an unchanged portfolio) is accepted without hashing.
+    Unchanged bars are counted per strategy so the runner can report how many
+    rebalances were short-circuited.
+    """
+
+    def __init__(self):
+        self.last_target = {}
+        self.last_fingerprint = {}
+        self.unchanged = {}
+        self.changed = {}
+
+    def observe(self, name, target):
+        """Records ``target`` for ``name``; returns True if it differs from the last one."""
+        if name in self.last_target and target is self.last_target[name]:
+            self.unchanged[name] = self.unchanged.get(name, 0) + 1
+            return False
+        mark = fingerprint(weights_of(target))
+        self.last_target[name] = target
+        if name in self.last_fingerprint and mark == self.last_fingerprint[name]:
+            self.unchanged[name] = self.unchanged.get(name, 0) + 1
+            return False
+        self.last_fingerprint[name] = mark
+        self.changed[name] = self.changed.get(name, 0) + 1
+        return True
+
+    def stats(self):
+        names = set(self.changed) | set(self.unchanged)
+        return {n: {"changed": self.changed.get(n, 0), "unchanged": self.unchanged.get(n, 0)} for n in sorted(names)}
+
+
+class TickerIndex:
+    """Interns tickers to stable int64 ordinals shared by sparse allocations."""
+
+    def __init__(self, tickers=()):
+        self.ordinal = {}
+        self.names = []
+        for ticker in tickers:
+            self.intern(ticker)
+
+    def intern(self, ticker):
+        ordinal = self.ordinal.get(ticker)
+        if ordinal is None:
+            ordinal = self.ordinal[ticker] = len(self.names)
+            self.names.append(ticker)
+        return ordinal
+
+    def ordinals(self, tickers):
+        return np.fromiter((self.intern(t) for t in tickers), dtype=np.int64, count=len(tickers))
+
+    def tickers(self, ordinals):
+        names = self.names
+        return [names[i] for i in ordinals]
+
+
+TICKERS = TickerIndex()
+
+
+class SparseAllocation:
+    """
+    Allocation stored as sorted ticker ordinals and float64 weights.
+
+    All arithmetic (scale, normalize, long-only filter, merge, top-k) is done on
+    the arrays; tickers are only touched when converting from or to a dict or a
+    TargetAllocation. Instances are treated as immutable: every operation
+    returns a new allocation sharing the same ``TickerIndex``.
+    """
+
+    __slots__ = ("ids", "weights", "index")
+
+    def __init__(self, ids, weights, index=TICKERS, presorted=False):
+        ids = np.asarray(ids, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        if not presorted and len(ids):
+            order = np.argsort(ids, kind="stable")
+            ids, weights = ids[order], weights[order]
+            if len(ids) > 1 and (ids[1:] == ids[:-1]).any():
+                ids, inverse = np.unique(ids, return_inverse=True)
+                weights = np.bincount(inverse, weights=weights, minlength=len(ids))
+        self.ids = ids
+        self.weights = weights
+        self.index = index
+
+    @classmethod
+    def from_dict(cls, allocations, index=TICKERS):
+        ids = index.ordinals(list(allocations))
+        weights = np.fromiter(allocations.values(), dtype=np.float64, count=len(allocations))
+        return cls(ids, weights, index)
+
+    @classmethod
+    def from_target(cls, target, index=TICKERS):
+        return cls.from_dict(weights_of(target) or {}, index)
+
+    @classmethod
+    def empty(cls, index=TICKERS):
+        return cls(np.empty(0, dtype=np.int64), np.empty(0), index, presorted=True)
+
+    def to_dict(self):
+        return dict(zip(self.index.tickers(self.ids), self.weights.tolist()))
+
+    def to_target(self):
+        from surmount.base_class import TargetAllocation
+        return TargetAllocation(self.to_dict())
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return f"SparseAllocation({len(self)} names, total={self.total():.6g})"
+
+    def _derive(self, ids, weights):
+        return SparseAllocation(ids, weights, self.index, presorted=True)
+
+    def total(self):
+        return float(self.weights.sum())
+
+    def scale(self, factor):
+        return self._derive(self.ids, self.weights * factor)
+
+    def normalize(self, total=1.0):
+        """Rescales weights to sum to ``total``; an allocation summing to 0 is returned empty."""
+        current = self.weights.sum()
+        if current == 0:
+            return SparseAllocation.empty(self.index)
+        return self._derive(self.ids, self.weights * (total / current))
+
+    def long_only(self):
+        keep = self.weights > 0
+        return self._derive(self.ids[keep], self.weights[keep])
+
+    def drop_zero(self):
+        keep = self.weights != 0
+        return self._derive(self.ids[keep], self.weights[keep])
+
+    def top_k(self, k):
+        """The ``k`` largest weights (ties broken by ticker ordinal)."""
+        if len(self) <= k:
+            return self
+        order = np.lexsort((self.ids, -self.weights))[:k]
+        order.sort()
+        return self._derive(self.ids[order], self.weights[order])
+
+    def cap(self, limit):
+        return self._derive(self.ids, np.minimum(self.weights, limit))
+
+    def add(self, other, weight=1.0):
+        """``self + weight * other`` over the union of both ticker sets."""
+        return merge([self, other], [1.0, weight])
+
+    def __add__(self, other):
+        return self.add(other)
+
+    def __mul__(self, factor):
+        return self.scale(factor)
+
+    __rmul__ = __mul__
+
+    def dense(self, size=None):
+        """Weights as a dense vector indexed by ticker ordinal."""
+        out = np.zeros(size if size is not None else len(self.index.names))
+        out[self.ids] = self.weights
+        return out
+
+
+def merge(allocations, coefficients=None):
+    """Weighted sum of sparse allocations sharing one ``TickerIndex``, in one pass."""
+    allocations = list(allocations)
+    if not allocations:
+        return SparseAllocation.empty()
+    index = allocations[0].index
+    if coefficients is None:
+        coefficients = np.ones(len(allocations))
+    ids = np.concatenate([a.ids for a in allocations])
+    weights = np.concatenate([a.weights * c for a, c in zip(allocations, coefficients)])
+    if not len(ids):
+        return SparseAllocation.empty(index)
+    union, inverse = np.unique(ids, return_inverse=True)
+    return SparseAllocation(union, np.bincount(inverse, weights=weights, minlength=len(union)), index, presorted=True)
@@ -0,0 +1,161 @@
+"""
+Point-in-time (as-of) views of fundamental feeds.
+
+The fundamental strategies read ``data[("financial_statement", ticker)][-1]``
+and ``[-2]`` and assume the feed was already trimmed to the bar being
+processed. When we replay history ourselves we have to build that trimmed
+view for every (date, ticker); filtering each feed on each day is
+O(days x records x tickers).
+
+An ``AsOfIndex`` flattens one feed for the whole universe into a single array
+sorted by (ticker, availability date). One ``np.searchsorted`` call then
+resolves the cut-off row of every ticker for one date, or for a whole grid of
+dates at once, and the per-ticker views are index ranges over the shared
+record list instead of copies.
+"""
+from collections.abc import Sequence
+
+import numpy as np
+
+# Availability is the filing/acceptance date when a feed carries one; the
+# period "date" of a statement is earlier than the day it became public.
+DEFAULT_DATE_KEYS = ("acceptedDate", "fillingDate", "date")
+
+
+def to_days(values):
+    """Converts dates (ISO strings, datetimes, Timestamps) to int64 day ordinals."""
+    return np.array([str(v)[:10] for v in values], dtype="datetime64[D]").astype(np.int64)
+
+
+class RecordView(Sequence):
+    """Read-only window ``records[start:stop]`` that does not copy the records."""
+
+    __slots__ = ("_records", "_start", "_stop")
+
+    def __init__(self, records, start, stop):
+        self._records = records
+        self._start = start
+        self._stop = stop
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return RecordView(self._records, self._start + start, self._start + max(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("record index out of range")
+        return self._records[self._start + index]
+
+    def __repr__(self):
+        return f"RecordView({len(self)} records)"
+
+
+class AsOfIndex:
+    """
+    As-of index over one feed for a whole ticker universe.
+
+    ``records_by_ticker`` maps ticker -> list of record dicts. Records without a
+    usable availability date are dropped; the rest are kept in availability
+    order (ties keep their original order).
+    """
+
+    def __init__(self, records_by_ticker, date_keys=DEFAULT_DATE_KEYS):
+        self.tickers = sorted(records_by_ticker)
+        self.position = {t: i for i, t in enumerate(self.tickers)}
+
+        self.records = []
+        days = []
+        starts = [0]
+        for ticker in self.tickers:
+            rows = []
+            for record in records_by_ticker[ticker] or []:
+                available = next((record[k] for k in date_keys if record.get(k)), None)
+                if available is not None:
+                    rows.append((str(available)[:10], record))
+            rows.sort(key=lambda r: r[0])
+            self.records.extend(r[1] for r in rows)
+            days.extend(r[0] for r in rows)
+            starts.append(len(self.records))
+
+        day_array = to_days(days)
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self._day_min = int(day_array.min()) if len(day_array) else 0
+        # Every ticker owns a disjoint key range of width ``_span``; a query
+        # clipped to [-1, _span - 1] therefore never crosses into a neighbour.
+        self._span = (int(day_array.max()) - self._day_min + 2) if len(day_array) else 2
+        owner = np.repeat(np.arange(len(self.tickers), dtype=np.int64), np.diff(self.starts))
+        self._keys = owner * self._span + (day_array - self._day_min)
+        self._owner_base = np.arange(len(self.tickers), dtype=np.int64) * self._span
+
+    def cutoffs(self, days):
+        """
+        End row (exclusive) of every ticker for each day ordinal in ``days``.
+
+        ``days`` may be a scalar or an array of shape (D,); the result has shape
+        (tickers,) or (D, tickers).
+        """
+        days = np.asarray(days, dtype=np.int64)
+        offset = np.clip(days - self._day_min, -1, self._span - 1)
+        query = self._owner_base + offset[..., None]
+        return np.searchsorted(self._keys, query, side="right")
+
+    def counts(self, days):
+        """Number of records available per ticker as of each day in ``days``."""
+        return self.cutoffs(days) - self.starts[:-1]
+
+    def view(self, ticker, day, cutoffs=None):
+        """All records of ``ticker`` available on ``day`` as a non-copying view."""
+        i = self.position[ticker]
+        stop = cutoffs[i] if cutoffs is not None else self.cutoffs(day)[i]
+        return RecordView(self.records, int(self.starts[i]), int(stop))
+
+    def latest(self, day, n=1):
+        """Maps every ticker to its latest ``n`` records available on ``day``."""
+        cut = self.cutoffs(day)
+        first = np.maximum(self.starts[:-1], cut - n)
+        return {
+            t: RecordView(self.records, int(first[i]), int(cut[i]))
+            for i, t in enumerate(self.tickers)
+        }
+
+
+class AsOfJoin:
+    """
+    As-of join of several fundamental feeds onto a sequence of bar dates.
+
+    ``feeds`` maps a feed key (e.g. ``"financial_statement"``) to its
+    ``records_by_ticker`` mapping. ``views(dates)`` yields, per date, the dict a
+    strategy would receive under ``data[(feed_key, ticker)]``. All cut-offs for
+    the whole date range are resolved up front with one ``searchsorted`` per
+    feed, so rebuilding the views for a full backtest is linear in the number
+    of (date, ticker) cells.
+    """
+
+    def __init__(self, feeds, date_keys=DEFAULT_DATE_KEYS):
+        self.indexes = {key: AsOfIndex(records, date_keys) for key, records in feeds.items()}
+
+    def views(self, dates):
+        days = to_days(dates)
+        grids = {key: index.cutoffs(days) for key, index in self.indexes.items()}
+        for row in range(len(days)):
+            frame = {}
+            for key, index in self.indexes.items():
+                cut = grids[key][row]
+                for i, ticker in enumerate(index.tickers):
+                    frame[(key, ticker)] = RecordView(index.records, int(index.starts[i]), int(cut[i]))
+            yield frame
+
+    def latest(self, date, n=1):
+        """Latest ``n`` records per (feed_key, ticker) available on ``date``."""
+        day = to_days([date])[0]
+        return {
+            (key, ticker): view
+            for key, index in self.indexes.items()
+            for ticker, view in index.latest(day, n).items()
+        }
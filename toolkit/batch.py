@@ -0,0 +1,286 @@
+"""
+Batch backtests of many strategies over one shared data load.
+
+Backtesting every ``TradingStrategy`` on its own reloads the same SPY/BIL/QQQ/
+TLT bars and the same alt-data feeds once per strategy. ``BatchBacktester``
+reads the ``assets`` and ``data`` declarations of all strategies, loads the
+union of them once into a ``SharedStore``, and hands the store to a process
+pool as read-only state (inherited without copying where ``fork`` is
+available). Each worker steps its group of strategies through the shared date
+axis in lockstep, building every bar's ``data`` dict from non-copying views,
+and writes one timeline per strategy:
+
+    <out_dir>/<strategy>.jsonl   one {"date", "allocations"} line per change
+
+With at least as many workers as strategies the wall time approaches that of
+the slowest strategy rather than the sum of all of them. Given a
+``ResultCache``, strategies whose source, declared data and date range were
+seen before are answered from the cache, and duplicate sources run once.
+Folders without a ``TradingStrategy`` (placeholder main.py files) are not
+run; they are reported with a ``skipped`` summary.
+
+Loading is left to the caller: ``load_bars(tickers)`` returns ``{ticker: [bar,
+...]}`` of date-ordered OHLCV dicts and ``load_feed(key)`` returns the records
+of a data key such as ``("congress_ls",)``.
+"""
+import json
+import multiprocessing
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from toolkit.allocations import ChangeDetector, weights_of
+from toolkit.asof import RecordView, to_days
+from toolkit.cache import DataFingerprint, source_key
+from toolkit.feeds import FeedStore, declared_depths
+from toolkit.strategies import is_strategy, load_strategy, ohlcv_layout
+from toolkit.windows import declared_lookback, lookback_for
+
+_store = None
+
+
+class SharedStore:
+    """
+    Bars and feed histories of every strategy in a batch, loaded once.
+
+    ``dates`` is the union of bar dates (of feed record dates when there are
+    no bars, e.g. a batch of alt-data mirrors); ``counts[ticker][i]`` is how
+    many of a ticker's bars are visible on ``dates[i]``.
+    """
+
+    def __init__(self, bars, feeds=None, date_keys=("date",)):
+        self.bars = {t: list(b) for t, b in bars.items()}
+        self.dates = sorted({bar["date"] for b in self.bars.values() for bar in b})
+        if not self.dates and feeds:
+            self.dates = sorted({
+                str(next(r[k] for k in date_keys if r.get(k)))[:10]
+                for records in feeds.values() for r in records if any(r.get(k) for k in date_keys)
+            })
+        self.days = to_days(self.dates)
+        self.counts = {}
+        for ticker, b in self.bars.items():
+            own = to_days([bar["date"] for bar in b]) if b else np.array([], dtype=np.int64)
+            self.counts[ticker] = np.searchsorted(own, self.days, side="right")
+        self.feeds = FeedStore(feeds, date_keys) if feeds else None
+
+    def rows(self, tickers):
+        """List-of-bars layout over ``tickers``: one ``{ticker: bar}`` row per date, or None."""
+        rows = []
+        for i, date in enumerate(self.dates):
+            row = {}
+            for t in tickers:
+                n = self.counts[t][i] if t in self.counts else 0
+                if n and self.bars[t][n - 1]["date"] == date:
+                    row[t] = self.bars[t][n - 1]
+            rows.append(row or None)
+        return rows
+
+
+class StrategyTrack:
+    """
+    One strategy inside a worker: its instance, bar layout and timeline.
+
+    A strategy is stepped on the dates where at least one of its assets has a
+    bar; strategies without assets (the alt-data mirrors) on every date of the
+    store, with an empty ``ohlcv``.
+    """
+
+    def __init__(self, name, store, bounded=True):
+        self.name = name
+        self.strategy = load_strategy(name)
+        self.layout = ohlcv_layout(name)
+        self.lookback = declared_lookback(self.strategy) if bounded else None
+        self.assets = list(self.strategy.assets)
+        self.keys = [tuple(request) for request in getattr(self.strategy, "data", None) or []]
+        self.depths = declared_depths(self.strategy)
+        if not self.assets:
+            self.rows = []
+            self.visible = np.zeros(len(store.dates), dtype=np.int64)
+            self.has_bar = np.ones(len(store.dates), dtype=bool)
+        elif self.layout == "bars":
+            rows = store.rows(self.assets)
+            self.rows = [row for row in rows if row is not None]
+            self.visible = np.cumsum([row is not None for row in rows])
+            self.has_bar = np.array([row is not None for row in rows], dtype=bool)
+        else:
+            self.has_bar = np.zeros(len(store.dates), dtype=bool)
+            for t in self.assets:
+                if t in store.counts:
+                    self.has_bar |= np.diff(store.counts[t], prepend=0) > 0
+        self.timeline = []
+        self.bars = 0
+        self.seconds = 0.0
+
+    def _start(self, stop, ticker=None):
+        size = lookback_for(self.lookback, ticker)
+        return 0 if size is None else max(0, stop - size)
+
+    def data(self, store, i):
+        if not self.has_bar[i]:
+            return None
+        if self.layout == "bars":
+            stop = int(self.visible[i])
+            data = {"ohlcv": RecordView(self.rows, self._start(stop), stop)}
+        else:
+            data = {"ohlcv": {
+                t: RecordView(store.bars[t], self._start(int(store.counts[t][i]), t), int(store.counts[t][i]))
+                for t in self.assets if t in store.counts and store.counts[t][i]
+            }}
+        if store.feeds is not None and self.keys:
+            keys = [k for k in self.keys if k in store.feeds.index.position]
+            data.update(store.feeds.frame(store.dates[i], self.depths, keys))
+        return data
+
+
+def run_group(names, start=None, end=None, store=None, bounded=True):
+    """
+    Steps the strategies ``names`` through the store's dates together; returns
+    one summary dict, including the allocation timeline, per strategy.
+    """
+    store = store or _store
+    detector = ChangeDetector()
+    tracks, summaries = [], []
+    for name in names:
+        try:
+            tracks.append(StrategyTrack(name, store, bounded))
+        except Exception as exc:
+            summaries.append({"strategy": name, "error": repr(exc)})
+    lo = 0 if start is None else int(np.searchsorted(store.days, to_days([start])[0]))
+    hi = len(store.dates) if end is None else int(np.searchsorted(store.days, to_days([end])[0], side="right"))
+    for i in range(lo, hi):
+        for track in list(tracks):
+            data = track.data(store, i)
+            if data is None:
+                continue
+            began = time.perf_counter()
+            try:
+                target = track.strategy.run(data)
+            except Exception as exc:
+                tracks.remove(track)
+                summaries.append({"strategy": track.name, "error": repr(exc), "date": store.dates[i]})
+                continue
+            track.seconds += time.perf_counter() - began
+            track.bars += 1
+            if detector.observe(track.name, target):
+                track.timeline.append({"date": store.dates[i], "allocations": weights_of(target)})
+    stats = detector.stats()
+    for track in tracks:
+        summary = {
+            "strategy": track.name, "bars": track.bars, "seconds": track.seconds,
+            "changes": stats.get(track.name, {}).get("changed", 0), "timeline": track.timeline,
+        }
+        if not track.bars:
+            summary["warning"] = "ran on no bars"
+            warnings.warn("%s ran on no bars" % track.name, RuntimeWarning)
+        summaries.append(summary)
+    return summaries
+
+
+def write_timeline(out_dir, summary):
+    """Writes a summary's timeline to ``<out_dir>/<strategy>.jsonl`` and records the path."""
+    summary["path"] = os.path.join(out_dir, os.path.basename(summary["strategy"].rstrip("/")) + ".jsonl")
+    with open(summary["path"], "w") as f:
+        for entry in summary.pop("timeline"):
+            f.write(json.dumps(entry, default=float) + "\n")
+
+
+def _init_worker(store):
+    global _store
+    _store = store
+
+
+class BatchBacktester:
+    """
+    Backtests ``strategies`` (folder names) over one shared data load.
+
+    ``group_size`` strategies are stepped together per task; ``workers=0``
+    runs everything in-process. With ``bounded`` each strategy sees only the
+    ``max_lookback`` bars it declares. ``cache`` is an optional ``ResultCache``.
+    """
+
+    def __init__(self, strategies, load_bars, load_feed=None, workers=None, group_size=1, date_keys=("date",),
+                 bounded=True, cache=None):
+        self.order = list(strategies)
+        self.names = [name for name in self.order if is_strategy(name)]
+        self.skipped = [name for name in self.order if not is_strategy(name)]
+        self.bounded = bounded
+        self.date_keys = list(date_keys)
+        self.cache = cache
+        self.declarations = {}
+        self.workers = os.cpu_count() if workers is None else workers
+        self.group_size = group_size
+        assets, keys = set(), {}
+        for name in self.names:
+            strategy = load_strategy(name)
+            requests = getattr(strategy, "data", None) or []
+            self.declarations[name] = (list(strategy.assets), [tuple(r) for r in requests])
+            assets.update(strategy.assets)
+            for request in requests:
+                keys.setdefault(tuple(request), request)
+        self.assets = sorted(assets)
+        self.keys = sorted(keys)
+        began = time.perf_counter()
+        feeds = {key: list(load_feed(key)) for key in self.keys} if load_feed else {}
+        self.store = SharedStore(load_bars(self.assets), feeds, date_keys)
+        self.load_seconds = time.perf_counter() - began
+        self.fingerprints = DataFingerprint(self.store)
+
+    def result_key(self, name, start=None, end=None):
+        assets, keys = self.declarations[name]
+        data = self.fingerprints.of(assets, keys)
+        return self.cache.key(
+            source_key(name), data, start, end, axis=self.fingerprints.axis(), layout=ohlcv_layout(name),
+            bounded=self.bounded, date_keys=self.date_keys,
+        )
+
+    def _execute(self, names, start, end):
+        groups = [names[i:i + self.group_size] for i in range(0, len(names), self.group_size)]
+        if not groups:
+            return []
+        if self.workers == 0:
+            return [s for g in groups for s in run_group(g, start, end, self.store, self.bounded)]
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        summaries = []
+        with ProcessPoolExecutor(min(self.workers, len(groups)), context, _init_worker, (self.store,)) as pool:
+            futures = [pool.submit(run_group, g, start, end, None, self.bounded) for g in groups]
+            for future in as_completed(futures):
+                summaries.extend(future.result())
+        return summaries
+
+    def run(self, start=None, end=None, out_dir=None):
+        """Runs every strategy; returns the per-strategy summaries in input order."""
+        began = time.perf_counter()
+        if self.cache is None:
+            summaries = self._execute(self.names, start, end)
+        else:
+            # One run per distinct result key: cache hits and duplicate sources
+            # reuse the stored or freshly computed summary
+            keyed = {name: self.result_key(name, start, end) for name in self.names}
+            results, pending = {}, {}
+            for name, key in keyed.items():
+                if key in results or key in pending:
+                    continue
+                cached = self.cache.get(key)
+                if cached is not None:
+                    results[key] = dict(cached, cached=True)
+                else:
+                    pending[key] = name
+            for summary in self._execute(list(pending.values()), start, end):
+                key = keyed[summary["strategy"]]
+                if "error" not in summary:
+                    self.cache.put(key, summary)
+                results[key] = summary
+            summaries = [dict(results[keyed[name]], strategy=name) for name in self.names]
+        summaries += [{"strategy": name, "skipped": "no TradingStrategy in main.py"} for name in self.skipped]
+        if out_dir is not None:
+            os.makedirs(out_dir, exist_ok=True)
+            for summary in summaries:
+                if "timeline" in summary:
+                    write_timeline(out_dir, summary)
+        self.wall_seconds = time.perf_counter() - began
+        order = {name: i for i, name in enumerate(self.order)}
+        return sorted(summaries, key=lambda s: order[s["strategy"]])
@@ -0,0 +1,444 @@
+"""
+Bootstrap and Monte Carlo robustness runs on vectorized price paths.
+
+A timing rule that looks good on the one history it was tuned on may just
+have been lucky. ``MonteCarlo`` resamples the daily bars of SPY/QQQ/TLT/IEF/
+IAU/UUP/BIL into thousands of synthetic histories and scores each rule on all
+of them:
+
+- ``block``: circular blocks of ``block`` consecutive days drawn uniformly,
+  keeping short-range autocorrelation and the cross-asset structure of each
+  day
+- ``regime``: a Markov chain fitted to regime labels (by default SPY above or
+  below its 200-day SMA) drives the path's regime, and days are drawn from
+  that regime's history, continuing the current run of days with probability
+  ``1 - 1 / block``; days without a label (the SMA warmup) are left out of
+  both the chain and the draws
+
+Paths are ``(paths, days, tickers)`` arrays of close/high/low built from the
+sampled days' returns and high/low ranges. They are produced and consumed in
+chunks of ``chunk_size`` paths, so memory is bounded by one chunk whatever the
+path count. Rules are batched kernels over a chunk (``weights(paths, days,
+tickers)`` returning (P, D, N) targets): ``TimingPaths`` is e7962af0,
+``RotationPaths`` is af802605 (weekly/monthly TSI ranking, Keltner exposure
+steps, Ichimoku base filter), ``RoarPaths`` is 006dcb7b (ROAR score from SMA
+curvature, slope percentiles, strength bands and volatility deciles) and
+``FixedPaths`` a constant-mix benchmark. Each kernel reproduces its script's
+targets bar for bar on a single path.
+Each rule is scored with ``metrics.evaluate`` and ``run`` reports per-path
+return, drawdown, Sharpe and turnover with their percentiles.
+"""
+import warnings
+
+import numpy as np
+
+from toolkit.asof import to_days
+from toolkit.indicators import ewm_mean, rolling_extreme, sma, tsi
+from toolkit.metrics import PERIODS, asset_returns, evaluate, price_panel, summary
+from toolkit.walkforward import IndicatorCache, timing_weights
+
+TICKERS = ("SPY", "QQQ", "TLT", "IEF", "IAU", "UUP", "BIL")
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def trend_labels(close, window=200):
+    """1 where ``close`` is above its ``window``-bar SMA, 0 below, -1 during the warmup."""
+    line = sma(close, window)
+    return np.where(np.isnan(line), -1, close > line).astype(np.int64)
+
+
+def transition_matrix(labels, states=None):
+    """Row-normalized counts of ``labels[t] -> labels[t + 1]`` between labeled (>= 0) days."""
+    states = states or int(labels.max()) + 1
+    counts = np.zeros((states, states))
+    labeled = (labels[:-1] >= 0) & (labels[1:] >= 0)
+    np.add.at(counts, (labels[:-1][labeled], labels[1:][labeled]), 1.0)
+    totals = counts.sum(axis=1, keepdims=True)
+    return np.where(totals > 0, counts / np.where(totals > 0, totals, 1.0), np.eye(states))
+
+
+def block_indices(rng, size, count, length, block=21):
+    """(count, length) day indices made of circular blocks of ``block`` days."""
+    blocks = -(-length // block)
+    starts = rng.integers(0, size, (count, blocks))
+    return ((starts[:, :, None] + np.arange(block)) % size).reshape(count, -1)[:, :length]
+
+
+def regime_indices(rng, labels, count, length, block=21, transitions=None):
+    """
+    (count, length) day indices following a Markov chain over ``labels``.
+
+    Each step keeps the chain's regime by continuing the previous day with
+    probability ``1 - 1 / block`` when the next historical day is in the same
+    regime, and otherwise draws a day of that regime at random. Days with a
+    negative label are never drawn.
+    """
+    labeled = np.flatnonzero(labels >= 0)
+    if not len(labeled):
+        raise ValueError("no labeled days to fit the regime chain on")
+    states = int(labels.max()) + 1
+    transitions = transition_matrix(labels, states) if transitions is None else transitions
+    cumulative = np.cumsum(transitions, axis=1)
+    order = labeled[np.argsort(labels[labeled], kind="stable")]
+    sizes = np.bincount(labels[labeled], minlength=states)
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    frequencies = sizes / sizes.sum()
+    state = rng.choice(states, count, p=frequencies)
+    out = np.empty((count, length), dtype=np.int64)
+    out[:, 0] = order[offsets[state] + (rng.random(count) * sizes[state]).astype(np.int64)]
+    for t in range(1, length):
+        state = np.minimum((rng.random(count)[:, None] > cumulative[state]).sum(axis=1), states - 1)
+        following = out[:, t - 1] + 1
+        keep = (rng.random(count) >= 1.0 / block) & (following < len(labels))
+        keep &= labels[np.minimum(following, len(labels) - 1)] == state
+        drawn = order[offsets[state] + (rng.random(count) * sizes[state]).astype(np.int64)]
+        out[:, t] = np.where(keep, following, drawn)
+    return out
+
+
+def business_days(length, start="2000-01-03"):
+    """Day ordinals of ``length`` consecutive weekdays: the calendar of a synthetic path."""
+    return np.busday_offset(np.datetime64(start, "D"), np.arange(length), roll="forward").astype(np.int64)
+
+
+def weekdays_of(days):
+    return (days + 3) % 7
+
+
+# --- batched rules ---
+
+class FixedPaths:
+    """Constant-mix target, e.g. ``{"SPY": 0.6, "TLT": 0.4}``."""
+
+    def __init__(self, weights):
+        self.target = dict(weights)
+
+    def weights(self, paths, days, tickers):
+        row = np.array([self.target.get(t, 0.0) for t in tickers])
+        return np.broadcast_to(row, paths["close"].shape).copy()
+
+
+class TimingPaths:
+    """e7962af0 (``walkforward.timing_weights``) on every path at once."""
+
+    def __init__(self, params=None, risk="SPY", safe="BIL"):
+        self.params = dict(params or {})
+        self.risk = risk
+        self.safe = safe
+
+    def weights(self, paths, days, tickers):
+        close = paths["close"][..., tickers.index(self.risk)]
+        risk = timing_weights(IndicatorCache(close), weekdays_of(days), self.params)
+        out = np.zeros(paths["close"].shape)
+        out[..., tickers.index(self.risk)] = risk
+        out[..., tickers.index(self.safe)] = 1.0 - risk
+        return out
+
+
+def period_ends(labels):
+    """Index of each day's period and the last day of every period, for sorted ``labels``."""
+    first = np.ones(len(labels), dtype=bool)
+    first[1:] = labels[1:] != labels[:-1]
+    period = np.cumsum(first) - 1
+    ends = np.append(np.flatnonzero(first)[1:] - 1, len(labels) - 1)
+    return period, ends
+
+
+def extended_tsi(ends, values, prior, span):
+    """
+    TSI(``span``, ``span``) of ``ends[..., :prior]`` extended by ``values``.
+
+    This is the last value of a ``resample(...).last()`` series on a day that
+    is not a period end: the completed periods plus the day's own close.
+    ``prior`` (K,) is the number of completed periods before each of the K
+    days in ``values`` (..., K) and must be at least 1.
+    """
+    decay = 1.0 - 2.0 / (span + 1.0)
+    delta = np.diff(ends, prepend=np.full(ends.shape[:-1] + (1,), np.nan))
+    last = prior - 1
+    weight = decay * (1.0 - decay ** last) / (1.0 - decay)
+    step = values - ends[..., last]
+    smoothed = []
+    for series, x in ((delta, step), (np.abs(delta), np.abs(step))):
+        first = ewm_mean(series, span)
+        second = ewm_mean(first, span)
+        one = (weight * np.nan_to_num(first[..., last]) + x) / (weight + 1.0)
+        smoothed.append((weight * np.nan_to_num(second[..., last]) + one) / (weight + 1.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return smoothed[0] / smoothed[1]
+
+
+class RotationPaths:
+    """
+    af802605 on every path at once.
+
+    On rebalance days each risk asset is scored from TSI(10) of its weekly
+    (W-FRI) and monthly closes, including the current partial period, as the
+    script's resamples do. The best-scoring asset above its 26-bar Ichimoku
+    base gets 100/50/25/0% exposure by where its score sits in the Keltner
+    band of its smoothed weekly score; the rest goes to the safe asset.
+    """
+
+    def __init__(self, risk=TICKERS[:-1], safe="BIL", rebalance_day=1, period=10):
+        self.risk = list(risk)
+        self.safe = safe
+        self.rebalance_day = rebalance_day
+        self.period = period
+
+    def weights(self, paths, days, tickers):
+        columns = [tickers.index(t) for t in self.risk]
+        close, high, low = (np.moveaxis(paths[f][..., columns], -1, -2) for f in ("close", "high", "low"))
+        size = close.shape[-1]
+        weekly, weekly_ends = period_ends(days + (4 - weekdays_of(days)) % 7)
+        monthly, monthly_ends = period_ends(days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64))
+        decide = np.flatnonzero(weekdays_of(days) == self.rebalance_day)
+        decide = decide[(weekly[decide] >= 5) & (monthly[decide] >= 3)]
+        out = np.zeros(paths["close"].shape)
+        out[..., tickers.index(self.safe)] = 1.0
+        if not len(decide):
+            return out
+        weeks, months = weekly[decide], monthly[decide]
+        today = close[..., decide]
+
+        weekly_close = close[..., weekly_ends]
+        weekly_tsi = tsi(weekly_close, self.period, self.period)
+        smooth = sma(weekly_tsi, 5)
+        current = extended_tsi(weekly_close, today, weeks, self.period)
+        latest = (weekly_tsi[..., weeks[:, None] - 4 + np.arange(4)].sum(axis=-1) + current) / 5.0
+        monthly_tsi = extended_tsi(close[..., monthly_ends], today, months, self.period)
+        score = 0.75 * latest + 0.25 * monthly_tsi
+        roc = (score - smooth[..., weeks - 4]) * 100.0
+
+        # Keltner band over the last 10 smoothed weekly scores (incl. today's)
+        band = np.concatenate([smooth[..., np.maximum(weeks[:, None] - 9 + np.arange(9), 0)], latest[..., None]], axis=-1)
+        band[..., weeks < 10, :] = np.nan
+        mid = band.mean(axis=-1)
+        lower = mid - 2.5 * band.std(axis=-1, ddof=1)
+
+        base = (rolling_extreme(high, 26, np.max) + rolling_extreme(low, 26, np.min)) / 2.0
+        passed = today > base[..., decide]
+        key = np.where(passed, score, -np.inf)
+        tied = np.where(key == key.max(axis=-2, keepdims=True), np.nan_to_num(roc, nan=-np.inf), -np.inf)
+        top = np.argmax(np.where(passed, tied, -np.inf), axis=-2)
+        pick = lambda values: np.take_along_axis(values, top[..., None, :], axis=-2)[..., 0, :]
+        best, best_mid, best_lower = pick(score), pick(mid), pick(lower)
+        exposure = np.select([best > best_mid, best > best_lower, best > best_lower * 0.7], [1.0, 0.5, 0.25], 0.0)
+        exposure = np.where(passed.any(axis=-2), exposure, 0.0)
+
+        chosen = np.zeros(close.shape[:-2] + (len(decide), len(tickers)))
+        np.put_along_axis(chosen, np.array(columns)[top][..., None], exposure[..., None], axis=-1)
+        chosen[..., tickers.index(self.safe)] = 1.0 - exposure
+        rows = np.searchsorted(decide, np.arange(size), side="right") - 1
+        return np.where((rows >= 0)[:, None], chosen[..., np.maximum(rows, 0), :], out)
+
+
+# ROAR rating codes and their score tables (006dcb7b's calc_* mappings)
+BUY, HOLD, SELL = 0, 1, 2
+STRONGEST, STRENGTHENING, AVERAGE, WEAKENING, WEAKEST = range(5)
+MAXIMUM, STRONG, SOFT, WEAK = 0, 1, 3, 4
+MA_SCORE = np.array([5, 2, 0])
+DIRECTION_SCORE = np.array([[5, 4, 2, 1, 0], [3, 2, 2, 1, 0], [0, 0, 0, 1, 2]])
+STRENGTH_SCORE = np.array([[5, 4, 2, 1, 0], [5, 4, 2, 1, 0], [0, 0, 1, 1, 2]])
+STRENGTH_THRESHOLDS = {20: (-0.02, 0.03, 0.05, 0.08), 50: (-0.05, 0.04, 0.08, 0.12), 150: (-0.05, 0.05, 0.10, 0.15)}
+
+
+def lagged(values, lag):
+    """``values[..., t - lag]`` along the last axis, NaN before it exists."""
+    out = np.full(values.shape, np.nan)
+    out[..., lag:] = values[..., :values.shape[-1] - lag]
+    return out
+
+
+def curvature_rating(ma, length, decide):
+    """006dcb7b ``get_ma_rating_by_curvature`` of an SMA(``length``) on the days ``decide``."""
+    slope = np.diff(ma, prepend=np.nan)
+    accel = np.diff(slope, prepend=np.nan)
+    s, a = slope[..., decide], accel[..., decide]
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        recent = np.nanmean(accel[..., decide[:, None] + np.arange(-2, 1)], axis=-1)
+    rating = np.select([(s > 0.1) & (a > 0.05) & (recent > 0), (s < -0.1) | ((a < -0.05) & (recent < -0.02))],
+                       [BUY, SELL], HOLD)
+    valid = (decide - length + 2 >= 10) & ~np.isnan(s) & ~np.isnan(a)
+    return np.where(valid, rating, HOLD)
+
+
+def direction_category(ma, length, decide):
+    """
+    006dcb7b ``get_direction_category_slope``: the slope against the 35th and
+    65th percentiles of its last 512 values, with the acceleration.
+    """
+    slope = np.diff(ma, prepend=np.nan)
+    accel = np.diff(slope, prepend=np.nan)
+    s, a = slope[..., decide], accel[..., decide]
+    weak, strong = np.full(s.shape, np.nan), np.full(s.shape, np.nan)
+    for r, i in enumerate(decide):
+        window = slope[..., max(length, i - 511):i + 1]
+        if window.shape[-1]:
+            weak[..., r], strong[..., r] = np.percentile(window, [35.0, 65.0], axis=-1)
+    category = np.select(
+        [s > strong, (s < weak) & (a < -0.05), (s < weak) & (a > 0.05), (s > strong) & (a < -0.05)],
+        [STRONGEST, WEAKEST, STRENGTHENING, WEAKENING], AVERAGE,
+    )
+    valid = (decide - length + 2 >= length) & ~np.isnan(s) & ~np.isnan(a)
+    return np.where(valid, category, AVERAGE)
+
+
+def strength_category(close, period, decide):
+    """006dcb7b ``strength_by_barchart_method``: the ``period``-day change against fixed bands."""
+    t = STRENGTH_THRESHOLDS.get(period, STRENGTH_THRESHOLDS[150])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = close[..., decide] / lagged(close, period)[..., decide] - 1
+    average = np.isnan(pct) | ((pct > t[1]) & (pct <= t[2]))
+    category = np.select([average, pct <= t[0], pct <= t[1], pct <= t[3]], [AVERAGE, WEAK, SOFT, STRONG], MAXIMUM)
+    return np.where(decide >= period, category, AVERAGE)
+
+
+def volatility_score(close, decide, lookback=126, window=15):
+    """006dcb7b ``realized_vol_score``: today's realized volatility ranked in the deciles of the prior ``lookback`` days."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = close / lagged(close, 1) - 1
+    realized = np.full(close.shape, np.nan)
+    if close.shape[-1] > window:
+        views = np.lib.stride_tricks.sliding_window_view(returns[..., 1:], window, axis=-1)
+        realized[..., window:] = views.std(axis=-1, ddof=1) * np.sqrt(252)
+    score = np.zeros(close.shape[:-1] + (len(decide),))
+    deciles = np.arange(0.1, 1.0, 0.1) * 100.0
+    for r, i in enumerate(decide):
+        start = max(i - lookback, window)
+        if i - window + 1 < lookback or i - start < 20:
+            continue
+        levels = np.percentile(realized[..., start:i], deciles, axis=-1)
+        rank = (realized[..., i] > levels).sum(axis=0)
+        score[..., r] = 10 - rank * (20 / 9)
+    return score
+
+
+class RoarPaths:
+    """
+    006dcb7b (ROAR score) on every path at once.
+
+    On each rebalance day after the 175-bar warmup the score combines, for the
+    20/50/150-day SMAs of the risk asset, a curvature rating, a slope
+    direction against its own 512-day percentiles and a price-strength band,
+    plus a realized-volatility decile score and a blended 5/10/20/50-day
+    change. The mean of the last 10 scores, truncated and clipped to 0..100,
+    is the risk asset's weight in percent; the rest goes to the safe asset.
+    """
+
+    def __init__(self, risk="SPY", safe="BIL", rebalance_day=1, warmup=175, smoothing=10):
+        self.risk = risk
+        self.safe = safe
+        self.rebalance_day = rebalance_day
+        self.warmup = warmup
+        self.smoothing = smoothing
+
+    def weights(self, paths, days, tickers):
+        close = paths["close"][..., tickers.index(self.risk)]
+        size = close.shape[-1]
+        decide = np.flatnonzero((weekdays_of(days) == self.rebalance_day) & (np.arange(size) >= self.warmup - 1))
+        out = np.zeros(paths["close"].shape)
+        out[..., tickers.index(self.safe)] = 1.0
+        if not len(decide):
+            return out
+        parts = []
+        for length, weights in ((20, (0.10, 0.10, 0.08)), (50, (0.10, 0.10, 0.08)), (150, (0.12, 0.08, 0.08))):
+            ma = sma(close, length)
+            rating = curvature_rating(ma, length, decide)
+            direction = direction_category(ma, length, decide)
+            strength = strength_category(close, length, decide)
+            parts.append((MA_SCORE[rating] * weights[0], DIRECTION_SCORE[rating, direction] * weights[1],
+                          STRENGTH_SCORE[rating, strength] * weights[2]))
+        volatility = volatility_score(close, decide) * 0.2
+        # Summed in the script's order
+        weighted = 0.0
+        for term in parts[0] + (volatility,) + parts[1] + parts[2]:
+            weighted = weighted + term
+        with np.errstate(divide="ignore", invalid="ignore"):
+            changes = [close[..., decide] / lagged(close, k)[..., decide] - 1 for k in (5, 10, 20, 50)]
+        blend = (changes[0] + changes[1] + changes[2] + changes[3]) / 4
+        raw = np.ascontiguousarray(weighted * 30 - blend * 100)
+        final = np.empty(raw.shape)
+        for r in range(raw.shape[-1]):
+            final[..., r] = np.trunc(np.mean(raw[..., max(0, r - self.smoothing + 1):r + 1], axis=-1))
+        risk = np.round(np.clip(final / 100.0, 0.0, 1.0), 2)
+        rows = np.searchsorted(decide, np.arange(size), side="right") - 1
+        held = np.where(rows >= 0, risk[..., np.maximum(rows, 0)], 0.0)
+        out[..., tickers.index(self.risk)] = held
+        out[..., tickers.index(self.safe)] = 1.0 - held
+        return out
+
+
+class MonteCarlo:
+    """
+    Resampled histories of ``tickers`` built from ``bars`` (``{ticker: [bar,
+    ...]}``) on the dates where every ticker has a bar.
+
+    ``method`` is ``"block"`` or ``"regime"``; ``labels`` overrides the
+    default SPY trend regimes (-1 marks a day without one). Paths are generated ``chunk_size`` at a time.
+    """
+
+    def __init__(self, bars, tickers=TICKERS, method="block", block=21, labels=None, seed=0, chunk_size=128):
+        self.tickers = list(tickers)
+        dates = sorted({bar["date"] for t in self.tickers for bar in bars.get(t) or []})
+        panels = {f: price_panel(bars, dates, self.tickers, f) for f in ("close", "high", "low")}
+        complete = np.isfinite(panels["close"]).all(axis=1)
+        closes = panels["close"][complete]
+        self.dates = [d for d, ok in zip(dates, complete) if ok]
+        self.returns = asset_returns(closes)[1:]
+        self.high = (panels["high"][complete] / closes)[1:]
+        self.low = (panels["low"][complete] / closes)[1:]
+        if labels is None:
+            labels = trend_labels(closes[:, self.tickers.index("SPY")])
+        self.labels = np.asarray(labels, dtype=np.int64)[-len(self.returns):]
+        self.method = method
+        self.block = block
+        self.chunk_size = chunk_size
+        self.rng = np.random.default_rng(seed)
+
+    def indices(self, count, length):
+        if self.method == "regime":
+            return regime_indices(self.rng, self.labels, count, length, self.block)
+        return block_indices(self.rng, len(self.returns), count, length, self.block)
+
+    def paths(self, count, length):
+        """Yields dicts of (chunk, length, tickers) ``close``/``high``/``low`` arrays and their ``indices``."""
+        for start in range(0, count, self.chunk_size):
+            index = self.indices(min(self.chunk_size, count - start), length)
+            close = 100.0 * np.cumprod(1.0 + self.returns[index], axis=1)
+            yield {"close": close, "high": close * self.high[index], "low": close * self.low[index], "indices": index}
+
+    def run(self, rules, count=1000, length=None, burn_in=0, lag=1, cost_bps=0.0, periods=PERIODS):
+        """
+        Scores every rule in ``rules`` (``{name: rule}``) on the same ``count``
+        paths of ``length`` days (default: the history's length), ignoring the
+        first ``burn_in`` days of each path for the figures.
+
+        Returns ``{"paths": {name: {figure: (count,) array}}, "distribution":
+        {name: {figure: {"mean", "p5", ..., "p95"}}}}``.
+        """
+        length = length or len(self.returns)
+        days = business_days(length)
+        figures = {name: {} for name in rules}
+        for chunk in self.paths(count, length):
+            for name, rule in rules.items():
+                result = evaluate(rule.weights(chunk, days, self.tickers), chunk["close"], lag, cost_bps, periods=periods)
+                result = {k: result[k][..., burn_in:] for k in ("returns", "turnover", "costs", "exposure")}
+                result["equity"] = np.cumprod(1.0 + result["returns"], axis=-1)
+                result["drawdown"] = result["equity"] / np.maximum.accumulate(result["equity"], axis=-1) - 1.0
+                for figure, values in summary(result, periods).items():
+                    figures[name].setdefault(figure, []).append(values)
+        figures = {name: {f: np.concatenate(v) for f, v in per.items()} for name, per in figures.items()}
+        return {"paths": figures, "distribution": {name: distribution(per) for name, per in figures.items()}}
+
+
+def distribution(figures):
+    """Mean and ``PERCENTILES`` of each per-path figure."""
+    out = {}
+    for figure, values in figures.items():
+        finite = values[np.isfinite(values)]
+        row = {"mean": float(finite.mean()) if len(finite) else float("nan")}
+        for q, value in zip(PERCENTILES, np.percentile(finite, PERCENTILES) if len(finite) else [float("nan")] * len(PERCENTILES)):
+            row["p%d" % q] = float(value)
+        out[figure] = row
+    return out
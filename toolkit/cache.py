@@ -0,0 +1,192 @@
+"""
+Content-addressed cache of backtest results.
+
+Many backtests are repeats: the same strategy over the same data after an
+unrelated change, or byte-for-byte copies such as 09c1913d/aa1c975c and
+af802605/bb6dab73 (da83d5d7 is the same code re-indented). A result is keyed
+by:
+
+- ``source_key``: a hash of the strategy's AST with docstrings removed, so
+  comments, formatting and indentation do not matter
+- a fingerprint of exactly the bars and feed records the strategy declares
+  (``DataFingerprint``), so unrelated data changes do not invalidate it
+- the batch's date axis (``DataFingerprint.axis``) and the requested range
+- the runner options, including the strategy's ``ohlcv`` layout
+- ``runner_version``: a hash of the toolkit modules that step strategies and
+  build their summaries, so a change to the runner invalidates old results
+
+``ResultCache`` stores one JSON file per key and evicts least recently used
+entries (by file mtime, refreshed on every hit) once the directory exceeds
+its byte budget. ``duplicate_groups`` finds strategies that share a source
+key; ``BatchBacktester`` runs one of each group and reuses its result.
+Placeholder folders without a ``TradingStrategy`` are never grouped.
+"""
+import ast
+import hashlib
+import json
+import os
+import tempfile
+
+from toolkit.strategies import is_strategy, strategy_path
+
+# Modules whose code decides what a batch run returns
+RUNNER_MODULES = ("allocations", "asof", "batch", "cache", "feeds", "strategies", "windows")
+
+_runner_version = None
+
+
+def _digest(*parts):
+    digest = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        digest.update(part.encode() if isinstance(part, str) else part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def normalized_source(source):
+    """``ast.dump`` of ``source`` without docstrings or position information."""
+    tree = ast.parse(source)
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(getattr(body[0], "value", None), ast.Constant) \
+                    and isinstance(body[0].value.value, str):
+                node.body = body[1:] or [ast.Pass()]
+    return ast.dump(tree, include_attributes=False)
+
+
+def source_key(strategy):
+    """Hash of a strategy's normalized main.py."""
+    with open(strategy_path(strategy)) as f:
+        return _digest(normalized_source(f.read()))
+
+
+def runner_version():
+    """Hash of the normalized source of ``RUNNER_MODULES``, computed once per process."""
+    global _runner_version
+    if _runner_version is None:
+        folder = os.path.dirname(os.path.abspath(__file__))
+        parts = []
+        for module in RUNNER_MODULES:
+            with open(os.path.join(folder, module + ".py")) as f:
+                parts.append(normalized_source(f.read()))
+        _runner_version = _digest(*parts)
+    return _runner_version
+
+
+def duplicate_groups(strategies):
+    """
+    Maps each source key shared by several strategies to those strategies.
+    Folders without a ``TradingStrategy`` are skipped, not grouped.
+    """
+    groups = {}
+    for name in strategies:
+        if not is_strategy(name):
+            continue
+        groups.setdefault(source_key(name), []).append(name)
+    return {key: names for key, names in groups.items() if len(names) > 1}
+
+
+class DataFingerprint:
+    """
+    Fingerprints of the bars and feeds in a ``SharedStore``, per ticker and
+    per data key, computed once each and combined per strategy.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.memo = {}
+
+    def _records(self, records):
+        return _digest(json.dumps(list(records), sort_keys=True, default=str))
+
+    def ticker(self, ticker):
+        key = ("bars", ticker)
+        if key not in self.memo:
+            self.memo[key] = self._records(self.store.bars.get(ticker, ()))
+        return self.memo[key]
+
+    def feed(self, data_key):
+        key = ("feed", data_key)
+        if key not in self.memo:
+            feeds = self.store.feeds
+            if feeds is None or data_key not in feeds.index.position:
+                self.memo[key] = _digest("missing")
+            else:
+                index = feeds.index
+                i = index.position[data_key]
+                self.memo[key] = self._records(index.records[index.starts[i]:index.starts[i + 1]])
+        return self.memo[key]
+
+    def axis(self):
+        """Fingerprint of the store's date axis."""
+        if "axis" not in self.memo:
+            self.memo["axis"] = _digest(*self.store.dates)
+        return self.memo["axis"]
+
+    def of(self, assets, data_keys):
+        parts = ["%s=%s" % (t, self.ticker(t)) for t in sorted(assets)]
+        parts += ["%r=%s" % (k, self.feed(k)) for k in sorted(data_keys)]
+        return _digest(*parts)
+
+
+class ResultCache:
+    """
+    Result files under ``directory``, LRU-evicted above ``budget`` bytes.
+    Keys include ``version`` (by default ``runner_version()``).
+    """
+
+    def __init__(self, directory, budget=1 << 30, salt="", version=None):
+        self.directory = directory
+        self.budget = budget
+        self.salt = salt
+        self.version = runner_version() if version is None else version
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, source, data, start=None, end=None, **options):
+        return _digest(self.salt, self.version, source, data, str(start), str(end),
+                       json.dumps(options, sort_keys=True, default=str))
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(value, f, default=float)
+        os.replace(tmp, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """Removes least recently used entries until the directory fits the budget."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.budget:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+            self.evicted += 1
+        return total
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evicted": self.evicted}
@@ -0,0 +1,163 @@
+"""
+Event-driven (push) execution for alt-data mirror strategies.
+
+Mirror strategies are polled every bar even though their feeds publish a few
+times a month, and each poll runs ``run()`` only to find the same last record.
+Here a strategy subscribes to update events of the feeds it declares in
+``data``; ``run()`` executes only when one of them receives a new record, and
+a subscriber with no pending events blocks on its queue without using CPU.
+
+Every event carries the bus's publication ``sequence``, and a run reads the
+feeds as of its event: a threaded runner that falls behind still sees, for
+each queued event, exactly the records that were published up to it.
+
+``ReplayPublisher`` is a local stand-in for the live publisher: it replays
+historical feed records in timestamp order, optionally paced in real time.
+``PushRunner`` measures the latency from a record being published to the
+allocation being emitted.
+"""
+import heapq
+import queue
+from bisect import bisect_right
+import threading
+import time
+
+import numpy as np
+
+from toolkit.asof import RecordView
+from toolkit.feeds import declared_depths
+
+STOP = object()
+
+
+class FeedEventBus:
+    """
+    Keeps every feed's published records and notifies subscribers of new ones.
+    ``published`` doubles as the sequence number of the latest event.
+    """
+
+    def __init__(self):
+        self.history = {}
+        self.sequences = {}
+        self.subscribers = {}
+        self.published = 0
+
+    def subscribe(self, key, handler):
+        self.subscribers.setdefault(key, []).append(handler)
+
+    def publish(self, key, record):
+        records = self.history.setdefault(key, [])
+        records.append(record)
+        self.published += 1
+        self.sequences.setdefault(key, []).append(self.published)
+        event = {
+            "key": key, "record": record, "index": len(records) - 1, "sequence": self.published,
+            "published": time.perf_counter(),
+        }
+        for handler in self.subscribers.get(key, ()):
+            handler(event)
+        return event
+
+    def records(self, key, depth=None, sequence=None):
+        """The last ``depth`` records of ``key`` as of event ``sequence`` (default: now)."""
+        records = self.history.get(key, [])
+        stop = len(records) if sequence is None else bisect_right(self.sequences.get(key, []), sequence)
+        start = 0 if depth is None else max(0, stop - depth)
+        return RecordView(records, start, stop)
+
+
+class ReplayPublisher:
+    """
+    Replays historical feed records onto a bus in timestamp order.
+
+    ``histories`` maps a data key to its time-ordered records. With ``speed``
+    set, one second of wall time covers ``speed`` seconds of history;
+    otherwise events are published back to back.
+    """
+
+    def __init__(self, bus, histories, date_key="date", speed=None):
+        self.bus = bus
+        self.date_key = date_key
+        self.speed = speed
+        streams = [self._stream(i, key, records) for i, (key, records) in enumerate(sorted(histories.items()))]
+        self.events = heapq.merge(*streams, key=lambda e: (e[0], e[1], e[2]))
+
+    def _stream(self, position, key, records):
+        for n, record in enumerate(records):
+            yield np.datetime64(str(record[self.date_key])[:19]), position, n, key, record
+
+    def run(self):
+        previous = None
+        count = 0
+        for stamp, _, _, key, record in self.events:
+            if self.speed and previous is not None:
+                gap = (stamp - previous) / np.timedelta64(1, "s")
+                if gap > 0:
+                    time.sleep(gap / self.speed)
+            previous = stamp
+            self.bus.publish(key, record)
+            count += 1
+        return count
+
+
+class PushRunner:
+    """
+    Runs one strategy only when one of its feeds receives a new record.
+
+    ``threaded=True`` hands events to a worker thread that blocks on a queue
+    while the feeds are quiet; otherwise ``run()`` executes inside ``publish``.
+    Emitted allocations are kept in ``emitted`` as (record date, allocation).
+    """
+
+    def __init__(self, strategy, bus, threaded=False, date_key="date"):
+        self.strategy = strategy
+        self.bus = bus
+        self.date_key = date_key
+        self.keys = [tuple(request) for request in strategy.data]
+        self.depths = declared_depths(strategy)
+        self.emitted = []
+        self.latencies = []
+        self.runs = 0
+        self.queue = queue.Queue() if threaded else None
+        self.thread = None
+        for key in self.keys:
+            bus.subscribe(key, self.queue.put if threaded else self.handle)
+
+    def handle(self, event):
+        data = {key: self.bus.records(key, self.depths.get(key), event["sequence"]) for key in self.keys}
+        target = self.strategy.run(data)
+        self.runs += 1
+        self.latencies.append(time.perf_counter() - event["published"])
+        self.emitted.append((event["record"].get(self.date_key), target))
+        return target
+
+    def start(self):
+        def loop():
+            while True:
+                event = self.queue.get()
+                if event is STOP:
+                    return
+                self.handle(event)
+
+        self.thread = threading.Thread(target=loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread is not None:
+            self.queue.put(STOP)
+            self.thread.join()
+            self.thread = None
+
+    def latency_report(self):
+        """Publish-to-allocation latency in seconds."""
+        if not self.latencies:
+            return {"runs": 0}
+        lat = np.asarray(self.latencies)
+        return {
+            "runs": self.runs,
+            "mean": float(lat.mean()),
+            "p50": float(np.percentile(lat, 50)),
+            "p95": float(np.percentile(lat, 95)),
+            "max": float(lat.max()),
+        }
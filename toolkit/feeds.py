@@ -0,0 +1,63 @@
+"""
+Bounded views of alt-data feed histories.
+
+Mirror and overlay strategies only read the latest record of their feeds, yet
+``data[("congress_ls",)]`` and similar keys carry the full, growing list of
+allocation records on every call. A strategy can declare how much of each feed
+it reads with a ``data_depth`` property:
+
+    @property
+    def data_depth(self):
+        return {("congress_buys",): 1}
+
+``FeedStore`` keeps every feed's full history once and serves, per bar, a
+non-copying ``RecordView`` over only the declared tail, so per-call memory and
+marshaling cost no longer grow with the history. Feeds without a declared
+depth get their full as-of history, as before.
+"""
+from toolkit.asof import AsOfIndex, RecordView, to_days
+
+
+def declared_depths(strategy):
+    """The ``data_depth`` a strategy declares, or an empty dict."""
+    return dict(getattr(strategy, "data_depth", None) or {})
+
+
+def tail(records, depth):
+    """The last ``depth`` records as a view (all of them when depth is None)."""
+    if depth is None or records is None:
+        return records
+    if isinstance(records, RecordView):
+        return records[max(0, len(records) - depth):]
+    return RecordView(records, max(0, len(records) - depth), len(records))
+
+
+class FeedStore:
+    """
+    Full feed histories, served per bar as bounded as-of views.
+
+    ``histories`` maps a data key (e.g. ``("congress_ls",)``) to its records;
+    records become visible on their availability date.
+    """
+
+    def __init__(self, histories, date_keys=("date",)):
+        self.index = AsOfIndex(histories, date_keys)
+
+    @property
+    def keys(self):
+        return self.index.tickers
+
+    def frame(self, date, depths=None, keys=None):
+        """``{key: records}`` as of ``date``, bounded to ``depths`` per key."""
+        depths = depths or {}
+        cut = self.index.cutoffs(to_days([date])[0])
+        index = self.index
+        frame = {}
+        for key in keys if keys is not None else index.tickers:
+            i = index.position[key]
+            start, stop = int(index.starts[i]), int(cut[i])
+            depth = depths.get(key)
+            if depth is not None:
+                start = max(start, stop - depth)
+            frame[key] = RecordView(index.records, start, stop)
+        return frame
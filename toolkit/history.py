@@ -0,0 +1,119 @@
+"""
+Compact storage for alt-data allocation histories.
+
+Feeds such as ``congress_ls``, ``house_ls`` and ``insider_purchases`` are
+shipped as one full ``{"allocations": {...}}`` dict per record even though
+consecutive records are mostly identical. ``AllocationHistory`` stores a full
+snapshot every ``snapshot_every`` records and, in between, only the per-record
+delta (names added, re-weighted or removed) over interned ticker ids:
+
+- ``tickers``: interned ticker table
+- ``days``: int64 day ordinal of each record
+- ``offsets``: start of each record's entries in ``ids``/``weights``
+- ``ids``/``weights``: the entries; a NaN weight removes the name
+- ``snapshot``: True where a record's entries are a full snapshot
+
+Any record is rebuilt by replaying at most ``snapshot_every`` deltas from the
+nearest snapshot; ``iter_records`` replays the whole history in one pass.
+Only the ``allocations`` of each record are kept.
+"""
+import numpy as np
+
+from toolkit.asof import to_days
+
+
+class AllocationHistory:
+    def __init__(self, tickers, days, offsets, ids, weights, snapshot):
+        self.tickers = list(tickers)
+        self.days = np.asarray(days, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.ids = np.asarray(ids, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.snapshot = np.asarray(snapshot, dtype=bool)
+        self.snapshot_rows = np.flatnonzero(self.snapshot)
+
+    @classmethod
+    def encode(cls, records, snapshot_every=64, date_key="date"):
+        """Encodes time-ordered records of the form ``{"date": ..., "allocations": {...}}``."""
+        position, tickers = {}, []
+        offsets, ids, weights, snapshot = [0], [], [], []
+        previous = {}
+        for i, record in enumerate(records):
+            current = {}
+            for ticker, weight in record.get("allocations", {}).items():
+                if ticker not in position:
+                    position[ticker] = len(tickers)
+                    tickers.append(ticker)
+                current[position[ticker]] = float(weight)
+            if i % snapshot_every == 0:
+                entries = sorted(current.items())
+                snapshot.append(True)
+            else:
+                entries = [(t, w) for t, w in current.items() if previous.get(t) != w]
+                entries += [(t, np.nan) for t in previous if t not in current]
+                entries.sort()
+                snapshot.append(False)
+            ids.extend(t for t, _ in entries)
+            weights.extend(w for _, w in entries)
+            offsets.append(len(ids))
+            previous = current
+        days = to_days([r[date_key] for r in records]) if records else []
+        return cls(tickers, days, offsets, ids, weights, snapshot)
+
+    def save(self, path):
+        np.savez_compressed(
+            path, tickers=np.array(self.tickers, dtype=str), days=self.days, offsets=self.offsets,
+            ids=self.ids, weights=self.weights, snapshot=self.snapshot,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            return cls(f["tickers"].tolist(), f["days"], f["offsets"], f["ids"], f["weights"], f["snapshot"])
+
+    def __len__(self):
+        return len(self.days)
+
+    def dates(self):
+        return self.days.astype("datetime64[D]").astype(str).tolist()
+
+    def _apply(self, state, row):
+        start, stop = self.offsets[row], self.offsets[row + 1]
+        if self.snapshot[row]:
+            state.clear()
+        for i, w in zip(self.ids[start:stop].tolist(), self.weights[start:stop].tolist()):
+            if w != w:
+                state.pop(i, None)
+            else:
+                state[i] = w
+
+    def _named(self, state):
+        tickers = self.tickers
+        return {tickers[i]: w for i, w in state.items()}
+
+    def record(self, row):
+        """Allocations of record ``row`` (negative indexes count from the end)."""
+        if row < 0:
+            row += len(self)
+        base = self.snapshot_rows[np.searchsorted(self.snapshot_rows, row, side="right") - 1]
+        state = {}
+        for r in range(base, row + 1):
+            self._apply(state, r)
+        return self._named(state)
+
+    def at(self, date):
+        """Allocations of the latest record on or before ``date``, or None."""
+        row = int(np.searchsorted(self.days, to_days([date])[0], side="right")) - 1
+        return self.record(row) if row >= 0 else None
+
+    def iter_records(self):
+        """Streams ``(date, allocations)`` for every record in order."""
+        state = {}
+        dates = self.dates()
+        for row in range(len(self)):
+            self._apply(state, row)
+            yield dates[row], self._named(state)
+
+    def to_records(self):
+        """Expands back to ``{"date", "allocations"}`` records (e.g. for ``FeedStore``)."""
+        return [{"date": d, "allocations": a} for d, a in self.iter_records()]
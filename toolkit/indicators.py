@@ -0,0 +1,268 @@
+"""
+Indicator kernels for rule strategies.
+
+Every indicator is computed over a whole history as a float64 array, with NaN
+until it has enough bars. The recursive parts (Wilder smoothing) and rolling
+sums are accumulated in the same order a bar-by-bar update would use, so a
+streaming evaluator reproduces these arrays bit for bit. The streaming
+counterparts (``RSIState``, ``MFIState``, ...) keep O(length) state and
+return the value of the newest bar on each ``update``.
+"""
+from collections import deque
+
+import numpy as np
+
+NAN = float("nan")
+
+
+def rolling_sum(x, n):
+    """Sum of the last ``n`` values along the last axis, accumulated oldest to newest; NaN before."""
+    out = np.full(np.shape(x), np.nan)
+    size = np.shape(x)[-1]
+    if size >= n:
+        total = x[..., : size - n + 1].copy()
+        for k in range(1, n):
+            total += x[..., k: size - n + 1 + k]
+        out[..., n - 1:] = total
+    return out
+
+
+def wilder(x, n, start):
+    """
+    Wilder smoothing of ``x`` seeded with the mean of ``x[start:start + n]``.
+
+    Returns NaN before ``start + n - 1``. The recursion is inherently serial;
+    it runs once per indicator instance over plain floats.
+    """
+    out = np.full(len(x), np.nan)
+    first = start + n - 1
+    if len(x) <= first:
+        return out
+    values = x.tolist()
+    avg = sum(values[start:start + n]) / n
+    out[first] = avg
+    for t in range(first + 1, len(values)):
+        avg = (avg * (n - 1) + values[t]) / n
+        out[t] = avg
+    return out
+
+
+def ratio_index(up, down):
+    """100 - 100 / (1 + up / down), with 100 when ``down`` is 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100.0 - 100.0 / (1.0 + up / down)
+    return np.where(down == 0, np.where(np.isnan(up), np.nan, 100.0), value)
+
+
+def rsi(close, length=14):
+    """Wilder RSI; the first value is available after ``length`` price changes."""
+    close = np.asarray(close, dtype=np.float64)
+    delta = np.diff(close, prepend=np.nan)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    return ratio_index(wilder(gain, length, 1), wilder(loss, length, 1))
+
+
+def mfi(high, low, close, volume, length=14):
+    """Money Flow Index over ``length`` typical-price changes."""
+    typical = (np.asarray(high, dtype=np.float64) + low + close) / 3.0
+    flow = typical * np.asarray(volume, dtype=np.float64)
+    change = np.diff(typical, prepend=np.nan)
+    positive = np.where(change > 0, flow, 0.0)
+    negative = np.where(change < 0, flow, 0.0)
+    up, down = rolling_sum(positive, length), rolling_sum(negative, length)
+    up[:length] = np.nan
+    down[:length] = np.nan
+    return ratio_index(up, down)
+
+
+def sma(values, length=14):
+    return rolling_sum(np.asarray(values, dtype=np.float64), length) / length
+
+
+def price(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+def ewm_mean(x, span):
+    """
+    ``pandas`` ``ewm(span=span).mean()`` (adjust=True) along the last axis.
+
+    Leading NaNs stay NaN and later NaNs carry the previous value, as in
+    pandas. Serial like ``wilder``; with leading axes (many paths) each step
+    updates all of them at once.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    decay = 1.0 - 2.0 / (span + 1.0)
+    out = np.full(x.shape, np.nan)
+    if x.ndim > 1:
+        total = np.zeros(x.shape[:-1])
+        weight = np.zeros(x.shape[:-1])
+        for t in range(x.shape[-1]):
+            value = x[..., t]
+            seen = ~np.isnan(value)
+            total = total * decay + np.where(seen, value, 0.0)
+            weight = weight * decay + seen
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out[..., t] = np.where(weight > 0, total / weight, np.nan)
+        return out
+    total = weight = 0.0
+    for t, value in enumerate(x.tolist()):
+        if value == value:
+            total = total * decay + value
+            weight = weight * decay + 1.0
+        elif weight:
+            total *= decay
+            weight *= decay
+        if weight:
+            out[t] = total / weight
+    return out
+
+
+def tsi(close, short, long):
+    """True Strength Index as the scripts compute it: double-smoothed change over double-smoothed |change|."""
+    close = np.asarray(close, dtype=np.float64)
+    delta = np.diff(close, prepend=np.full(close.shape[:-1] + (1,), np.nan))
+    numerator = ewm_mean(ewm_mean(delta, short), long)
+    denominator = ewm_mean(ewm_mean(np.abs(delta), short), long)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return numerator / denominator
+
+
+def rolling_extreme(values, length, reduce=np.max):
+    """``reduce`` over the last ``length`` values along the last axis; NaN before."""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= length:
+        out[..., length - 1:] = reduce(np.lib.stride_tricks.sliding_window_view(values, length, axis=-1), axis=-1)
+    return out
+
+
+def midpoint(values, length):
+    """Middle of the ``length``-bar range (the Ichimoku cloud/base line on one series)."""
+    return (rolling_extreme(values, length, np.max) + rolling_extreme(values, length, np.min)) / 2.0
+
+
+# --- streaming state ---
+
+def ratio_value(up, down):
+    if down == 0:
+        return NAN if up != up else 100.0
+    return 100.0 - 100.0 / (1.0 + up / down)
+
+
+class WilderState:
+    """Incremental form of ``wilder`` over values fed from ``start`` on."""
+
+    def __init__(self, length):
+        self.length = length
+        self.seen = 0
+        self.total = 0
+        self.value = NAN
+
+    def update(self, x):
+        self.seen += 1
+        n = self.length
+        if self.seen < n:
+            self.total += x
+        elif self.seen == n:
+            self.value = (self.total + x) / n
+        else:
+            self.value = (self.value * (n - 1) + x) / n
+        return self.value
+
+
+class RSIState:
+    def __init__(self, length=14):
+        self.previous = None
+        self.gain = WilderState(length)
+        self.loss = WilderState(length)
+        self.value = NAN
+
+    def update(self, bar):
+        close = float(bar["close"])
+        if self.previous is not None:
+            delta = close - self.previous
+            self.value = ratio_value(
+                self.gain.update(delta if delta > 0 else 0.0),
+                self.loss.update(-delta if delta < 0 else 0.0),
+            )
+        self.previous = close
+        return self.value
+
+
+class RollingSum:
+    """Sum of the last ``length`` values in the order ``rolling_sum`` adds them."""
+
+    def __init__(self, length):
+        self.values = deque(maxlen=length)
+
+    def update(self, x):
+        self.values.append(x)
+        return sum(self.values) if len(self.values) == self.values.maxlen else NAN
+
+
+class MFIState:
+    def __init__(self, length=14):
+        self.previous = None
+        self.positive = RollingSum(length)
+        self.negative = RollingSum(length)
+        self.changes = 0
+        self.length = length
+        self.value = NAN
+
+    def update(self, bar):
+        typical = (float(bar["high"]) + float(bar["low"]) + float(bar["close"])) / 3.0
+        flow = typical * float(bar["volume"])
+        change = NAN if self.previous is None else typical - self.previous
+        up = self.positive.update(flow if change > 0 else 0.0)
+        down = self.negative.update(flow if change < 0 else 0.0)
+        if self.previous is not None:
+            self.changes += 1
+        if self.changes >= self.length:
+            self.value = ratio_value(up, down)
+        self.previous = typical
+        return self.value
+
+
+class SMAState:
+    def __init__(self, length=14):
+        self.window = RollingSum(length)
+        self.length = length
+        self.value = NAN
+
+    def update(self, bar):
+        self.value = self.window.update(float(bar["close"])) / self.length
+        return self.value
+
+
+class PriceState:
+    def __init__(self):
+        self.value = NAN
+
+    def update(self, bar):
+        self.value = float(bar["close"])
+        return self.value
+
+
+STATES = {"RSI": RSIState, "MFI": MFIState, "SMA": SMAState, "PRICE": PriceState}
+
+
+def streaming(name, args):
+    """Fresh streaming state for indicator ``name`` with ``args``."""
+    return STATES[name](**dict(args))
+
+
+# name -> (kernel, bar fields it reads, default arguments)
+KERNELS = {
+    "RSI": (rsi, ("close",), {"length": 14}),
+    "MFI": (mfi, ("high", "low", "close", "volume"), {"length": 14}),
+    "SMA": (sma, ("close",), {"length": 14}),
+    "PRICE": (price, ("close",), {}),
+}
+
+
+def compute(name, args, bars):
+    """Evaluates indicator ``name`` with ``args`` over one ticker's bar arrays."""
+    kernel, fields, _ = KERNELS[name]
+    return kernel(*(bars[f] for f in fields), **dict(args))
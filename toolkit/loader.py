@@ -0,0 +1,145 @@
+"""
+Fast cold start for strategy instances.
+
+Every strategy module imports ``pandas`` and ``numpy`` at load time, including
+the alt-data mirrors that never call them, so spinning up hundreds of
+instances is dominated by imports. Two opt-in tools make that cost
+measurable and bounded; importing this module changes nothing by itself:
+
+- ``enable_lazy_imports(names)`` registers the heavy modules in ``names`` as
+  ``importlib.util.LazyLoader`` modules for the rest of the process: ``import
+  pandas as pd`` then binds a placeholder that executes pandas on first
+  attribute access, so a strategy that never touches ``pd`` never pays for it.
+  ``load_timed`` reports import, construction and declaration
+  (``assets``/``data``) time and how many modules the load pulled in.
+- ``preload_forkserver(modules)`` makes the ``forkserver`` import ``PRELOAD``
+  (surmount and the scientific stack) before it forks; a ``WarmPool`` created
+  afterwards starts every worker with those modules in memory, so it only
+  pays for the strategy itself.
+
+Timings are taken in fresh processes: ``WarmPool`` runs each task in a new
+worker forked from the server and ``cold_starts`` in a newly spawned
+interpreter, so no measurement reuses modules an earlier load imported.
+"""
+import importlib.util
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from toolkit.strategies import load_module
+
+HEAVY = ("pandas", "numpy")
+PRELOAD = (
+    "numpy", "pandas",
+    "surmount.base_class", "surmount.data", "surmount.logging", "surmount.technical_indicators",
+    "toolkit.strategies",
+)
+
+
+def lazy_import(name):
+    """Registers ``name`` as a module that is executed on first attribute access."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError("no module named %r" % name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def enable_lazy_imports(names=HEAVY):
+    """Registers every module in ``names`` that is not imported yet as lazy, process-wide."""
+    return [lazy_import(name) for name in names]
+
+
+def preload_forkserver(modules=PRELOAD):
+    """
+    Has the ``forkserver`` import ``modules`` before forking workers.
+
+    The setting is process-wide and only takes effect if the server has not
+    started yet. Returns False where ``forkserver`` is unavailable.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return False
+    multiprocessing.get_context("forkserver").set_forkserver_preload(list(modules))
+    return True
+
+
+def load_timed(strategy, lazy=()):
+    """
+    Loads and instantiates ``strategy``; returns ``(instance, timings)`` with
+    seconds spent importing, constructing and reading the declarations.
+    Modules in ``lazy`` are registered with ``enable_lazy_imports`` first.
+    """
+    before = len(sys.modules)
+    start = time.perf_counter()
+    enable_lazy_imports(lazy)
+    module = load_module(strategy)
+    imported = time.perf_counter()
+    instance = module.TradingStrategy()
+    constructed = time.perf_counter()
+    assets = instance.assets
+    requests = getattr(instance, "data", None) or []
+    declared = time.perf_counter()
+    return instance, {
+        "strategy": strategy,
+        "import": imported - start,
+        "construct": constructed - imported,
+        "declarations": declared - constructed,
+        "total": declared - start,
+        "modules": len(sys.modules) - before,
+        "assets": len(assets),
+        "requests": len(requests),
+    }
+
+
+def cold_start(strategy, lazy=()):
+    """Worker task: loads ``strategy`` and returns its timings."""
+    return load_timed(strategy, lazy)[1]
+
+
+def cold_starts(strategies, workers=None, lazy=()):
+    """Per-strategy load timings, each measured in a newly spawned interpreter."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, context, max_tasks_per_child=1) as pool:
+        return list(pool.map(cold_start, strategies, [lazy] * len(strategies)))
+
+
+class WarmPool:
+    """
+    Process pool on the ``forkserver``, which imports what ``preload_forkserver``
+    registered before the pool was created.
+
+    With ``fresh`` every task runs in a new worker, so tasks do not share
+    modules loaded by earlier ones. Falls back to ``spawn`` (no preloading)
+    where ``forkserver`` is missing.
+    """
+
+    def __init__(self, workers=None, fresh=True):
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.context = multiprocessing.get_context(method)
+        self.pool = ProcessPoolExecutor(workers, self.context, max_tasks_per_child=1 if fresh else None)
+
+    def map(self, fn, strategies):
+        return list(self.pool.map(fn, strategies))
+
+    def submit(self, fn, *args):
+        return self.pool.submit(fn, *args)
+
+    def cold_starts(self, strategies):
+        """Per-strategy load timings, each measured in a new warm worker."""
+        return self.map(cold_start, strategies)
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
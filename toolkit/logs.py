@@ -0,0 +1,233 @@
+"""
+Structured, low-overhead logging for strategies and runners.
+
+Scripts call ``surmount.logging.log`` with an eagerly formatted f-string on
+every bar (a76b3a87 logs its whole allocation dict daily, the alt-data mirrors
+log two dicts per bar, the Lipps scripts one line per asset per rebalance).
+In a long backtest that is a lot of formatting and output nobody reads.
+
+``StrategyLogger`` is the replacement for code we control:
+
+    logger = StrategyLogger("a76b3a87", level=INFO, buffer=buffer)
+    logger.debug("allocation %s", lambda: final_alloc, regime=regime)
+
+- levels are filtered before anything is formatted: methods below the
+  logger's level are rebound to a no-op, so a disabled call costs one call
+- ``%``-style arguments and keyword fields are formatted only for records
+  that are kept; callables among them are evaluated lazily
+- ``limit()`` samples (keep one call in ``every``) and rate-limits (at most
+  ``per_second``) per call site, i.e. per file and line
+- kept records go to a shared ``LogBuffer``: a bounded ring that a
+  background thread drains in batches into a sink, dropping the oldest
+  records instead of blocking when the sink falls behind
+
+``install(module, logger)`` routes an existing script's ``log(...)`` calls
+through a logger, so their volume is counted and limited like the rest.
+``LogBuffer.volume()`` reports records and bytes per strategy.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+
+def _noop(*args, **fields):
+    return None
+
+
+def _value(v):
+    return v() if callable(v) else v
+
+
+class SiteLimit:
+    """Sampling and rate limit for one call site."""
+
+    def __init__(self, every=None, per_second=None):
+        self.every = every
+        self.per_second = per_second
+        self.calls = 0
+        self.tokens = per_second or 0.0
+        self.stamp = time.monotonic()
+
+    def allow(self):
+        self.calls += 1
+        if self.every and (self.calls - 1) % self.every:
+            return False
+        if self.per_second:
+            now = time.monotonic()
+            self.tokens = min(self.per_second, self.tokens + (now - self.stamp) * self.per_second)
+            self.stamp = now
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+        return True
+
+
+class LogBuffer:
+    """
+    Bounded ring of log records drained into ``sink`` in batches.
+
+    ``sink`` receives a list of record dicts. With ``interval`` set, a daemon
+    thread flushes every ``interval`` seconds or as soon as ``batch_size``
+    records are waiting; otherwise records wait for ``flush()``.
+    """
+
+    def __init__(self, sink=None, capacity=10000, batch_size=500, interval=1.0):
+        self.sink = sink
+        self.records = deque(maxlen=capacity)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopping = False
+        self.dropped = 0
+        self.flushed = 0
+        self.volumes = {}
+        self.thread = None
+        if sink is not None and interval:
+            self.thread = threading.Thread(target=self._drain, daemon=True)
+            self.thread.start()
+
+    def append(self, record):
+        with self.lock:
+            if len(self.records) == self.records.maxlen:
+                self.dropped += 1
+            self.records.append(record)
+            volume = self.volumes.setdefault(record["strategy"], [0, 0])
+            volume[0] += 1
+            volume[1] += len(record["message"])
+            waiting = len(self.records)
+        if waiting >= self.batch_size:
+            self.wake.set()
+
+    def flush(self):
+        """Hands every waiting record to the sink; returns how many were flushed."""
+        with self.lock:
+            batch = list(self.records)
+            self.records.clear()
+        if batch and self.sink is not None:
+            self.sink(batch)
+        self.flushed += len(batch)
+        return len(batch)
+
+    def _drain(self):
+        while not self.stopping:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            self.flush()
+
+    def close(self):
+        self.stopping = True
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.flush()
+
+    def tail(self, n=20):
+        """The last ``n`` records still in the ring."""
+        with self.lock:
+            return list(self.records)[-n:]
+
+    def volume(self):
+        """Records and message bytes logged per strategy."""
+        return {name: {"records": r, "bytes": b} for name, (r, b) in sorted(self.volumes.items())}
+
+
+def jsonl_sink(path):
+    """Sink appending each record as one JSON line to ``path``."""
+    def write(batch):
+        with open(path, "a") as f:
+            for record in batch:
+                f.write(json.dumps(record, default=str) + "\n")
+    return write
+
+
+class StrategyLogger:
+    """Leveled, sampled logging for one strategy into a shared ``LogBuffer``."""
+
+    def __init__(self, strategy, level=INFO, buffer=None):
+        self.strategy = strategy
+        self.buffer = buffer if buffer is not None else LogBuffer()
+        self.default_limit = None
+        self.limits = {}
+        self.sites = {}
+        self.kept = 0
+        self.limited = 0
+        self.set_level(level)
+
+    def set_level(self, level):
+        self.level = level
+        for value, name in LEVEL_NAMES.items():
+            if value < level:
+                setattr(self, name.lower(), _noop)
+            else:
+                self.__dict__.pop(name.lower(), None)
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def limit(self, site=None, every=None, per_second=None):
+        """Samples/rate-limits ``site`` (``"file:line"``), or every site without its own limit."""
+        if site is None:
+            self.default_limit = (every, per_second)
+        else:
+            self.limits[site] = SiteLimit(every, per_second)
+
+    def _site(self, depth):
+        frame = sys._getframe(depth + 1)
+        code = frame.f_code.co_filename
+        return "%s/%s:%d" % (os.path.basename(os.path.dirname(code)), os.path.basename(code), frame.f_lineno)
+
+    def emit(self, level, msg, args=(), fields=None, depth=1):
+        if level < self.level:
+            return False
+        site = self._site(depth)
+        limit = self.limits.get(site)
+        if limit is None and self.default_limit is not None:
+            limit = self.limits[site] = SiteLimit(*self.default_limit)
+        self.sites[site] = self.sites.get(site, 0) + 1
+        if limit is not None and not limit.allow():
+            self.limited += 1
+            return False
+        text = msg % tuple(_value(a) for a in args) if args else _value(msg)
+        record = {"time": time.time(), "level": LEVEL_NAMES.get(level, level), "strategy": self.strategy, "site": site, "message": text}
+        if fields:
+            record["fields"] = {k: _value(v) for k, v in fields.items()}
+        self.buffer.append(record)
+        self.kept += 1
+        return True
+
+    def debug(self, msg, *args, **fields):
+        return self.emit(DEBUG, msg, args, fields, 2)
+
+    def info(self, msg, *args, **fields):
+        return self.emit(INFO, msg, args, fields, 2)
+
+    def warning(self, msg, *args, **fields):
+        return self.emit(WARNING, msg, args, fields, 2)
+
+    def error(self, msg, *args, **fields):
+        return self.emit(ERROR, msg, args, fields, 2)
+
+    def adapter(self, level=INFO):
+        """A ``log(message)`` function that records through this logger at ``level``."""
+        if level < self.level:
+            return _noop
+
+        def log(msg):
+            return self.emit(level, msg, depth=2)
+        return log
+
+    def stats(self):
+        return {"strategy": self.strategy, "kept": self.kept, "limited": self.limited, "sites": dict(self.sites)}
+
+
+def install(module, logger, level=INFO):
+    """Points a loaded strategy module's ``log`` at ``logger``."""
+    module.log = logger.adapter(level)
+    return logger
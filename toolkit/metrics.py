@@ -0,0 +1,195 @@
+"""
+Vectorized performance metrics for allocation timelines.
+
+A backtest timeline (``BatchBacktester`` writes one ``{"date",
+"allocations"}`` line per change) is sparse in time: ROAR switches between
+SPY and BIL a few times a year, the Lipps scripts hold one asset for weeks.
+``weight_matrix`` expands it into a dense date x ticker array by indexing the
+change rows with ``searchsorted``, ``price_panel`` aligns close prices on the
+same axis, and ``evaluate`` computes everything else with whole-array NumPy
+operations:
+
+- ``returns``: daily portfolio returns net of costs, ``gross`` before them
+- ``equity``/``drawdown``: compounded curve and distance from its running peak
+- ``turnover``: one-way, 0.5 * sum |dw| per day; ``costs`` charged on it
+- ``exposure``/``net``/``positions``: sum |w|, sum w and names held per day
+
+Targets are assumed to be held at constant weight (rebalanced every bar), and
+a target decided on day t's close earns returns from ``lag`` days later
+(``lag=0`` is the look-ahead case). ``cost_bps`` is charged on traded notional,
+either one figure or one per ticker. Every function also accepts a leading
+axis of strategies or parameter sets: weights of shape (S, D, N) against one
+(D, N) price panel, or against (S, D, N) simulated prices, are evaluated in
+the same pass.
+"""
+import numpy as np
+
+from toolkit.allocations import weights_of
+from toolkit.asof import to_days
+
+PERIODS = 252
+
+
+def weight_matrix(timeline, dates, tickers=None, date_key="date"):
+    """
+    Dense (D, N) weights over ``dates`` from a change-point timeline.
+
+    Each date holds the allocations of the latest entry on or before it and
+    zeros before the first entry; ``None`` allocations mean all cash. Returns
+    ``(weights, tickers)``.
+    """
+    entries = [(entry[date_key], weights_of(entry["allocations"]) or {}) for entry in timeline]
+    if tickers is None:
+        tickers = sorted({t for _, weights in entries for t in weights})
+    column = {t: j for j, t in enumerate(tickers)}
+    changes = np.zeros((len(entries) + 1, len(tickers)))
+    for row, (_, weights) in enumerate(entries, 1):
+        for ticker, weight in weights.items():
+            if ticker in column:
+                changes[row, column[ticker]] = weight
+    change_days = to_days([date for date, _ in entries]) if entries else np.array([], dtype=np.int64)
+    rows = np.searchsorted(change_days, to_days(dates), side="right")
+    return changes[rows], list(tickers)
+
+
+def timeline_from(weights, dates, tickers):
+    """Inverse of ``weight_matrix``: one ``{"date", "allocations"}`` entry per row that changes."""
+    weights = np.asarray(weights, dtype=float)
+    changed = np.ones(len(weights), dtype=bool)
+    changed[1:] = np.any(weights[1:] != weights[:-1], axis=1)
+    return [
+        {"date": dates[i], "allocations": {t: float(w) for t, w in zip(tickers, weights[i])}}
+        for i in np.flatnonzero(changed)
+    ]
+
+
+def price_panel(bars, dates, tickers, field="close"):
+    """
+    (D, N) prices of ``tickers`` on ``dates`` from ``{ticker: [bar, ...]}``.
+
+    Each date takes the ticker's latest bar on or before it; NaN before its
+    first bar or for tickers without bars.
+    """
+    days = to_days(dates)
+    panel = np.full((len(days), len(tickers)), np.nan)
+    for j, ticker in enumerate(tickers):
+        series = bars.get(ticker) or []
+        if not series:
+            continue
+        own = to_days([bar["date"] for bar in series])
+        values = np.array([bar[field] for bar in series], dtype=float)
+        rows = np.searchsorted(own, days, side="right") - 1
+        panel[:, j] = np.where(rows >= 0, values[np.maximum(rows, 0)], np.nan)
+    return panel
+
+
+def asset_returns(prices):
+    """Simple returns along the date axis (-2); 0 on the first date and wherever a price is missing."""
+    prices = np.asarray(prices, dtype=float)
+    returns = np.zeros_like(prices)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[..., 1:, :] = prices[..., 1:, :] / prices[..., :-1, :] - 1.0
+    returns[~np.isfinite(returns)] = 0.0
+    return returns
+
+
+def shift(values, lag, axis=-2):
+    """``values`` delayed by ``lag`` steps along ``axis``, zero-filled."""
+    if lag == 0:
+        return values
+    out = np.zeros_like(values)
+    source = [slice(None)] * values.ndim
+    target = [slice(None)] * values.ndim
+    source[axis] = slice(None, -lag)
+    target[axis] = slice(lag, None)
+    out[tuple(target)] = values[tuple(source)]
+    return out
+
+
+def drawdown(equity):
+    """Relative distance of ``equity`` from its running maximum along the last axis."""
+    return equity / np.maximum.accumulate(equity, axis=-1) - 1.0
+
+
+def rolling_stats(returns, window=63, periods=PERIODS, risk_free=0.0):
+    """
+    Annualized rolling volatility and Sharpe ratio over ``window`` periods.
+
+    Computed from cumulative sums of returns and squared returns, so the cost
+    does not depend on ``window``. The first ``window - 1`` values are NaN.
+    """
+    excess = np.asarray(returns, dtype=float) - risk_free
+    shape = excess.shape[:-1] + (1,)
+    sums = np.concatenate([np.zeros(shape), np.cumsum(excess, axis=-1)], axis=-1)
+    squares = np.concatenate([np.zeros(shape), np.cumsum(excess * excess, axis=-1)], axis=-1)
+    volatility = np.full(excess.shape, np.nan)
+    sharpe = np.full(excess.shape, np.nan)
+    if excess.shape[-1] >= window > 1:
+        mean = (sums[..., window:] - sums[..., :-window]) / window
+        variance = (squares[..., window:] - squares[..., :-window]) / window - mean * mean
+        std = np.sqrt(np.maximum(variance * window / (window - 1), 0.0))
+        volatility[..., window - 1:] = std * np.sqrt(periods)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe[..., window - 1:] = np.where(std > 1e-12, mean / std, np.nan) * np.sqrt(periods)
+    return volatility, sharpe
+
+
+def evaluate(weights, prices, lag=1, cost_bps=0.0, window=63, periods=PERIODS, risk_free=0.0):
+    """
+    Daily series for target ``weights`` (..., D, N) held against ``prices``,
+    either one (D, N) panel or one per leading index (..., D, N).
+
+    Returns a dict of arrays shaped (..., D): ``returns``, ``gross``,
+    ``costs``, ``equity``, ``drawdown``, ``turnover``, ``exposure``, ``net``,
+    ``positions``, ``volatility`` and ``sharpe`` (rolling over ``window``).
+    """
+    weights = np.nan_to_num(np.asarray(weights, dtype=float))
+    held = shift(weights, lag)
+    traded = np.abs(np.diff(held, axis=-2, prepend=0.0))
+    gross = np.einsum("...dn,...dn->...d", held, asset_returns(prices))
+    costs = traded @ np.broadcast_to(np.asarray(cost_bps, dtype=float) / 1e4, held.shape[-1:])
+    returns = gross - costs
+    equity = np.cumprod(1.0 + returns, axis=-1)
+    volatility, sharpe = rolling_stats(returns, window, periods, risk_free)
+    return {
+        "returns": returns,
+        "gross": gross,
+        "costs": costs,
+        "equity": equity,
+        "drawdown": drawdown(equity),
+        "turnover": 0.5 * traded.sum(axis=-1),
+        "exposure": np.abs(held).sum(axis=-1),
+        "net": held.sum(axis=-1),
+        "positions": np.count_nonzero(held, axis=-1),
+        "volatility": volatility,
+        "sharpe": sharpe,
+    }
+
+
+def summary(result, periods=PERIODS, risk_free=0.0):
+    """Whole-period figures (arrays over any leading axis) from an ``evaluate`` result."""
+    returns = result["returns"]
+    n = returns.shape[-1]
+    excess = returns - risk_free
+    std = excess.std(axis=-1, ddof=1) if n > 1 else np.zeros(returns.shape[:-1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 1e-12, excess.mean(axis=-1) / std, np.nan) * np.sqrt(periods)
+        cagr = result["equity"][..., -1] ** (periods / max(n, 1)) - 1.0
+    return {
+        "total_return": result["equity"][..., -1] - 1.0,
+        "cagr": cagr,
+        "volatility": std * np.sqrt(periods),
+        "sharpe": sharpe,
+        "max_drawdown": result["drawdown"].min(axis=-1),
+        "turnover": result["turnover"].sum(axis=-1) * periods / max(n, 1),
+        "costs": result["costs"].sum(axis=-1),
+        "exposure": result["exposure"].mean(axis=-1),
+    }
+
+
+def timeline_metrics(timeline, bars, dates, tickers=None, **options):
+    """``evaluate`` and ``summary`` for one timeline against ``{ticker: [bar, ...]}``."""
+    weights, tickers = weight_matrix(timeline, dates, tickers)
+    result = evaluate(weights, price_panel(bars, dates, tickers), **options)
+    result["summary"] = summary(result, options.get("periods", PERIODS), options.get("risk_free", 0.0))
+    return result
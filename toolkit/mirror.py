@@ -0,0 +1,176 @@
+"""
+One engine hosting every alt-data mirror portfolio.
+
+The mirror strategies in this repository (CongressLS, HouseLS, TimMoore,
+DCInsiderTrades, ...) each wrap a single feed and copy the allocations of its
+latest record. ``MirrorEngine`` hosts all of them from the ``MIRRORS`` config
+table: each feed is requested once, however many portfolios read it, and one
+``run`` call evaluates every portfolio for the bar.
+
+Each config entry names the strategy folder it replaces and the fallback rule
+that folder uses:
+
+- ``"spy"``: latest record's allocations, ``{"SPY": 1}`` while the feed is empty.
+- ``"sticky"``: like ``"spy"``, but once a record has been seen an empty feed
+  keeps the previous allocations (950fd0f6).
+- ``"normalize"``: latest record's allocations scaled to sum to 1; no
+  allocation (``None``) while the feed is empty or sums to 0 (64e8ba4e).
+
+``OVERLAYS`` hosts the SPY-regime overlays (a76b3a87, ca48ba2e) the same way:
+a fixed regime sleeve plus the feed's latest record scaled into the remaining
+bucket. Their regimes come from a shared ``RegimeService``, so each
+(ticker, field, window) SMA is updated once per bar for all overlays.
+"""
+import surmount.data
+from surmount.base_class import TargetAllocation
+
+from toolkit.allocations import fingerprint
+from toolkit.regime import RegimeService
+
+MIRRORS = {
+    "congress_ls": {"source": "2b30b604-0280-4503-bf92-177c4ce8bfe6", "feed": "CongressLS", "fallback": "spy"},
+    "house_ls": {"source": "85a4b1eb-2e37-4045-b286-83f001fe835b", "feed": "HouseLS", "fallback": "spy"},
+    "tim_moore": {"source": "94c26188-f4fc-415e-a7da-98c3aae24b3f", "feed": "TimMoore", "fallback": "spy"},
+    "dc_insider_trades": {"source": "a04a38c0-8a5c-4bc5-b220-f215f9cb9efa", "feed": "DCInsiderTrades", "fallback": "spy"},
+    "insider_purchases": {"source": "b740b50e-f128-47a2-93b4-a926bc758cff", "feed": "InsiderPurchases", "fallback": "spy"},
+    "insider_purchases_min_500m_market_cap": {
+        "source": "8552b860-55d3-4137-98ae-7e50006a8efb", "feed": "InsiderPurchasesMin500MMarketCap", "fallback": "spy",
+    },
+    "lobby_qoq_growth": {"source": "7367f75c-5132-4f64-a940-923c38b793f9", "feed": "LobbyQoQGrowth", "fallback": "spy"},
+    "analyst_long": {"source": "818d2972-9df6-402d-adc3-6cb83f726078", "feed": "AnalystLong", "fallback": "spy"},
+    "house_transportation_and_infrastructure_committee": {
+        "source": "a7fc3d60-3904-4356-8c77-07687ef8b61a",
+        "feed": "HouseTransportationAndInfrastructureCommittee",
+        "fallback": "spy",
+    },
+    "house_energy_and_commerce_committee": {
+        "source": "e9abb489-9696-4858-b9cd-316e12f9e93f",
+        "feed": "HouseEnergyAndCommerceCommittee",
+        "fallback": "spy",
+        "assets": ["SPY"],
+    },
+    "rob_bresnahan": {"source": "950fd0f6-1661-4814-b32d-d373a7fc57f5", "feed": "RobBresnahan", "fallback": "sticky"},
+    "ndw_ftrust5": {"source": "64e8ba4e-add2-4328-84df-a89b99f8f1d9", "feed": "NDWFirstTrustFocusFive", "fallback": "normalize"},
+}
+
+OVERLAYS = {
+    "congress_buys_regime": {
+        "source": "a76b3a87-de3d-4a7b-a9ef-b98b2927220c",
+        "feed": "CongressBuys",
+        "regime": ("SPY", "low", 100),
+        "min_bars": 10,
+        "risk_on": ({"SPY": 0.25}, 0.75),
+        "risk_off": ({"GLD": 0.5}, 0.50),
+        "long_only": False,
+        "assets": ["SPY", "GLD"],
+    },
+    "inverse_cramer_regime": {
+        "source": "ca48ba2e-b5b4-4c77-9cfe-1fe429a98d6d",
+        "feed": "InverseCramer",
+        "regime": ("SPY", "close", 100),
+        "min_bars": 100,
+        "risk_on": ({"SPY": 0.25}, 0.75),
+        "risk_off": ({"GLD": 0.5}, 0.50),
+        "long_only": True,
+        "assets": ["SPY", "GLD"],
+    },
+}
+
+FALLBACK_SPY = {"SPY": 1}
+
+
+class MirrorEngine:
+    """
+    Evaluates every configured mirror portfolio against one shared ``data`` dict.
+
+    ``run(data)`` returns ``{portfolio name: TargetAllocation or None}`` with the
+    allocation each original strategy would have returned for the bar. A
+    portfolio whose weights did not change gets the same TargetAllocation
+    object as on its previous bar.
+    """
+
+    def __init__(self, configs=None, overlays=None):
+        self.configs = dict(MIRRORS if configs is None else configs)
+        self.configs.update(OVERLAYS if overlays is None else overlays)
+        self.requests = {}
+        self.feed_keys = {}
+        self.regimes = RegimeService()
+        self.regime_keys = {}
+        for name, config in self.configs.items():
+            request = getattr(surmount.data, config["feed"])()
+            key = tuple(request)
+            self.requests.setdefault(key, request)
+            self.feed_keys[name] = key
+            if "regime" in config:
+                self.regime_keys[name] = self.regimes.subscribe(*config["regime"])
+        self.allocations = {name: None for name in self.configs}
+        self.seen = {name: False for name in self.configs}
+        self.targets = {name: None for name in self.configs}
+        self.fingerprints = {name: None for name in self.configs}
+
+    @property
+    def interval(self):
+        return "1day"
+
+    @property
+    def assets(self):
+        assets = []
+        for config in self.configs.values():
+            assets.extend(a for a in config.get("assets", []) if a not in assets)
+        return assets
+
+    @property
+    def data(self):
+        return list(self.requests.values())
+
+    @property
+    def data_depth(self):
+        # Every mirror reads only the latest record of its feed
+        return {key: 1 for key in self.requests}
+
+    def evaluate(self, name, records):
+        """Allocation dict (or None) of one portfolio given its feed records."""
+        if name in self.regime_keys:
+            return self.evaluate_overlay(name, records)
+        fallback = self.configs[name]["fallback"]
+        if fallback == "normalize":
+            if not records:
+                return None
+            allocations = records[-1].get("allocations", {})
+            total = sum(allocations.values())
+            return {k: v / total for k, v in allocations.items()} if total > 0 else None
+        if records:
+            self.seen[name] = True
+            return records[-1]["allocations"]
+        if fallback == "sticky" and self.seen[name]:
+            return self.allocations[name]
+        return dict(FALLBACK_SPY)
+
+    def evaluate_overlay(self, name, records):
+        config = self.configs[name]
+        if self.regimes.bars_seen < config["min_bars"]:
+            return dict(FALLBACK_SPY)
+        sleeve, bucket = config["risk_on" if self.regimes.state(self.regime_keys[name]) else "risk_off"]
+        base = records[-1]["allocations"] if records else {}
+        if config["long_only"]:
+            base = {k: v for k, v in base.items() if v > 0}
+        allocations = dict(sleeve)
+        total = sum(base.values())
+        if total > 0:
+            for ticker, weight in base.items():
+                allocations[ticker] = bucket * (weight / total)
+        return allocations
+
+    def run(self, data):
+        if self.regime_keys:
+            self.regimes.update(data.get("ohlcv"))
+        results = {}
+        for name, key in self.feed_keys.items():
+            allocations = self.evaluate(name, data.get(key))
+            self.allocations[name] = allocations
+            mark = fingerprint(allocations)
+            if mark is None or mark != self.fingerprints[name]:
+                self.fingerprints[name] = mark
+                self.targets[name] = TargetAllocation(allocations) if allocations is not None else None
+            results[name] = self.targets[name]
+        return results
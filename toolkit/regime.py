@@ -0,0 +1,120 @@
+"""
+Shared regime signals for SMA-overlay strategies.
+
+a76b3a87 (CongressBuys) and ca48ba2e (InverseCramer) rebuild a SPY pandas
+Series from ``data["ohlcv"]`` every bar and run ``rolling(100).mean()`` over
+the whole history to get one boolean. ``RegimeService`` keeps one incremental
+SMA per subscribed (ticker, field, window), consumes only the bars it has not
+seen yet, and publishes a regime state that any number of overlays read for
+free. Regime flips are recorded in ``events`` for analysis.
+"""
+from collections import deque
+
+
+class IncrementalSMA:
+    """Simple moving average updated in O(1) per value."""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.updates = 0
+
+    def update(self, value):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+        self.updates += 1
+        # Re-sum once per window so float drift cannot accumulate
+        if self.updates % self.window == 0:
+            self.total = sum(self.values)
+        return self.value
+
+    @property
+    def value(self):
+        return self.total / self.window if len(self.values) == self.window else None
+
+
+class RegimeSignal:
+    """
+    Price-vs-SMA regime with optional hysteresis.
+
+    With ``hysteresis == 0`` the regime is on exactly when price > SMA, as in
+    the overlay scripts. With a band ``h`` it turns on above SMA * (1 + h),
+    off below SMA * (1 - h), and keeps its state in between. The regime is off
+    until the SMA window is filled.
+    """
+
+    def __init__(self, ticker, field, window, hysteresis=0.0):
+        self.key = (ticker, field, window, hysteresis)
+        self.ticker = ticker
+        self.field = field
+        self.hysteresis = hysteresis
+        self.sma = IncrementalSMA(window)
+        self.state = False
+        self.price = None
+
+    def update(self, price):
+        self.price = price
+        sma = self.sma.update(price)
+        if sma is None:
+            self.state = False
+        elif self.hysteresis == 0:
+            self.state = price > sma
+        elif price > sma * (1 + self.hysteresis):
+            self.state = True
+        elif price < sma * (1 - self.hysteresis):
+            self.state = False
+        return self.state
+
+
+class RegimeService:
+    """
+    Computes every subscribed regime once per bar.
+
+    ``update(ohlcv)`` takes the list-of-bars ``data["ohlcv"]`` (each bar maps
+    ticker -> OHLCV dict with a ``date``) and feeds only bars newer than the
+    last one processed, so the full history may be passed every call.
+    """
+
+    def __init__(self):
+        self.signals = {}
+        self.events = []
+        self.bars_seen = 0
+        self.last_date = None
+
+    def subscribe(self, ticker, field="close", window=100, hysteresis=0.0):
+        signal = RegimeSignal(ticker, field, window, hysteresis)
+        return self.signals.setdefault(signal.key, signal).key
+
+    def state(self, key):
+        return self.signals[key].state
+
+    def update(self, ohlcv):
+        if not ohlcv:
+            return 0
+        start = len(ohlcv)
+        if self.last_date is None:
+            start = 0
+        else:
+            while start > 0 and self._date(ohlcv[start - 1]) > self.last_date:
+                start -= 1
+        for bar in ohlcv[start:]:
+            self._step(bar)
+        return len(ohlcv) - start
+
+    def _date(self, bar):
+        return next(iter(bar.values()))["date"]
+
+    def _step(self, bar):
+        date = self._date(bar)
+        for key, signal in self.signals.items():
+            quote = bar.get(signal.ticker)
+            if quote is None:
+                continue
+            before = signal.state
+            if signal.update(quote[signal.field]) != before:
+                self.events.append({"date": date, "key": key, "state": signal.state, "price": signal.price})
+        self.bars_seen += 1
+        self.last_date = date
@@ -0,0 +1,552 @@
+"""
+Compiler for JSON rule strategies.
+
+A rule document (7f0889f7/main.json) lists ``IF`` steps under ``strategy``.
+Each step holds a list of ``BINARY`` conditions comparing two operands with
+``comp``; an operand is an indicator (``MFI``, ``RSI``, ...) or a
+``constant``, with its settings as strings under ``args``. The ``operator`` of
+every condition after the first (``AND``/``OR``) chains it to the ones before
+it, left to right. ``if_action``/``else_action`` are ``ACTION`` nodes whose
+``allocation`` steps give an ``amount`` in percent per ``asset``:
+
+    {"interval": "4hours", "assets": ["TSLA", "AAPL", "SPY"],
+     "strategy": [{"type": "IF",
+                   "conditions": [
+                       {"type": "BINARY", "comp": ">", "operator": "",
+                        "first": {"name": "MFI", "args": {"length": "14", "ticker": "TSLA"}},
+                        "second": {"name": "MFI", "args": {"length": "30", "ticker": "TSLA"}}},
+                       {"type": "BINARY", "comp": "<", "operator": "AND",
+                        "first": {"name": "RSI", "args": {"length": "14", "ticker": "TSLA"}},
+                        "second": {"name": "constant", "args": {"value": "70", "ticker": ""}}}],
+                   "if_action": {"type": "ACTION", "steps": [
+                       {"action": "allocation", "asset": "TSLA", "amount": "80"},
+                       {"action": "allocation", "asset": "SPY", "amount": "20"}]},
+                   "else_action": {"type": "ACTION", "steps": [
+                       {"action": "allocation", "asset": "SPY", "amount": "80"},
+                       {"action": "allocation", "asset": "TSLA", "amount": "20"}]}}]}
+
+``compile_document`` turns such a document into a ``RulePlan``:
+
+- every distinct indicator instance, keyed by (name, args, ticker, interval),
+  is listed once in ``indicators``
+- conditions become a deduplicated list of ``nodes`` in evaluation order
+- every allocation step becomes a leaf: the (condition, branch) guards on its
+  path plus a weight row over the plan's ``tickers``
+
+``RulePlan.evaluate`` computes each indicator once as an array, each condition
+once as a boolean array, and sums the guarded weight rows into a (bars x
+tickers) allocation matrix: a full-history backtest in one vectorized pass.
+Allocation steps active on the same bar add up. Plans are cached by the hash
+of the canonical document.
+
+``StreamingEvaluator`` runs the same plan live: it keeps streaming state per
+indicator and re-evaluates the node list once per new bar, producing the
+same allocations as ``evaluate`` over the full history.
+
+``RuleBatch`` evaluates many documents together. Their indicators are merged
+into one global table keyed by (name, args, ticker, interval) and their
+comparison nodes into one global node list, so an indicator or condition
+shared by thousands of strategies is computed once per bar; only the
+per-strategy allocation leaves are evaluated per strategy.
+"""
+import hashlib
+import json
+import operator
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from toolkit import indicators
+from toolkit.bars import interval_minutes
+
+IndicatorKey = namedtuple("IndicatorKey", "name args ticker interval")
+
+COMPARATORS = {
+    ">": operator.gt, "<": operator.lt, ">=": operator.ge, "<=": operator.le,
+    "==": operator.eq, "!=": operator.ne,
+    "GT": operator.gt, "LT": operator.lt, "GTE": operator.ge, "LTE": operator.le,
+    "EQ": operator.eq, "NE": operator.ne,
+}
+LOGICAL = ("AND", "OR")
+PLAN_CACHE_SIZE = 1024
+
+_plans = OrderedDict()
+
+
+def document_hash(document):
+    """Hash of the canonical JSON form of a rule document."""
+    text = json.dumps(document, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _kind(node):
+    return str(node.get("type", "")).upper()
+
+
+def _actions(action):
+    """The steps of an ``if_action``/``else_action`` (an ``ACTION`` node, a list or None)."""
+    if action is None:
+        return []
+    if isinstance(action, list):
+        return action
+    if _kind(action) == "ACTION":
+        return action.get("steps") or []
+    return [action]
+
+
+def indicator_key(node, interval):
+    """Normalized key of an indicator operand ``{"name", "args": {..., "ticker"}}``."""
+    name = str(node.get("name", "")).upper()
+    if name not in indicators.KERNELS:
+        raise ValueError("unknown indicator %r" % node.get("name"))
+    given = dict(node.get("args") or {})
+    defaults = indicators.KERNELS[name][2]
+    args = {k: int(given.get(k, v)) if isinstance(v, int) else given.get(k, v) for k, v in defaults.items()}
+    ticker = given.get("ticker")
+    if not ticker:
+        raise ValueError("%s needs a ticker" % name)
+    return IndicatorKey(name, tuple(sorted(args.items())), str(ticker).upper(), node.get("interval", interval))
+
+
+def _operand_value(operand, values):
+    return operand[1] if operand[0] == "const" else values[operand[1]]
+
+
+def array_node(node, values, results):
+    """Boolean array of one node given indicator arrays and earlier node results."""
+    if node[0] == "cmp":
+        return node[1](_operand_value(node[2], values), _operand_value(node[3], values))
+    combine = np.logical_and if node[0] == "and" else np.logical_or
+    value = results[node[1][0]]
+    for i in node[1][1:]:
+        value = combine(value, results[i])
+    return value
+
+
+def scalar_node(node, values, results):
+    """Truth value of one node on a single bar."""
+    if node[0] == "cmp":
+        return bool(node[1](_operand_value(node[2], values), _operand_value(node[3], values)))
+    if node[0] == "and":
+        return all(results[i] for i in node[1])
+    return any(results[i] for i in node[1])
+
+
+def leaf_matrix(leaves, results, length, width):
+    """Sum of guarded weight rows over boolean node arrays."""
+    matrix = np.zeros((length, width))
+    for guard, weights in leaves:
+        mask = np.ones(length, dtype=bool)
+        for i, taken in guard:
+            mask &= results[i] if taken else ~results[i]
+        matrix += mask[:, None] * weights
+    return matrix
+
+
+def sparse_leaves(leaves):
+    """Leaves with their weight rows as (column, weight) pairs, for ``leaf_row``."""
+    return [(guard, [(j, w) for j, w in enumerate(weights.tolist()) if w]) for guard, weights in leaves]
+
+
+def leaf_row(leaves, results, width):
+    """Single-bar counterpart of ``leaf_matrix`` over ``sparse_leaves``, summed in the same order."""
+    row = [0.0] * width
+    for guard, entries in leaves:
+        if all(results[i] == taken for i, taken in guard):
+            for j, w in entries:
+                row[j] += w
+    return row
+
+
+class RulePlan:
+    """
+    Compiled form of one rule document.
+
+    ``nodes`` holds ``("cmp", fn, left, right)``, ``("and", ids)`` and
+    ``("or", ids)`` entries, children before parents; operands are
+    ``("const", value)`` or ``("ind", indicator position)``. ``leaves`` holds
+    ``(guard, weights)`` with ``guard`` a tuple of (node id, branch taken).
+    """
+
+    def __init__(self, document, digest=None):
+        self.digest = digest or document_hash(document)
+        self.interval = str(document.get("interval", "1day"))
+        self.minutes = interval_minutes(self.interval)
+        self.indicators = []
+        self.nodes = []
+        self.tickers = []
+        self.leaves = []
+        self.references = 0
+        self._indicator_ids = {}
+        self._node_ids = {}
+        self._ticker_ids = {}
+        for ticker in document.get("assets") or []:
+            self._ticker(ticker)
+        raw_leaves = []
+        self._walk(document.get("strategy") or [], (), raw_leaves)
+        for guard, alloc in raw_leaves:
+            weights = np.zeros(len(self.tickers))
+            for ticker, w in alloc.items():
+                weights[self._ticker_ids[ticker]] += w
+            self.leaves.append((guard, weights))
+        self.row_leaves = sparse_leaves(self.leaves)
+
+    # --- compilation ---
+
+    def _walk(self, steps, guard, leaves):
+        for step in steps:
+            kind = _kind(step)
+            if kind == "IF":
+                cond = self._conditions(step.get("conditions") or [])
+                self._walk(_actions(step.get("if_action")), guard + ((cond, True),), leaves)
+                self._walk(_actions(step.get("else_action")), guard + ((cond, False),), leaves)
+            elif kind == "ACTION":
+                self._walk(_actions(step), guard, leaves)
+            elif str(step.get("action", "")).lower() == "allocation":
+                leaves.append((guard, self._allocation(step)))
+            else:
+                raise ValueError("unknown step %r" % (step.get("type") or step.get("action")))
+
+    def _ticker(self, ticker):
+        ticker = str(ticker).upper()
+        if ticker not in self._ticker_ids:
+            self._ticker_ids[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+        return ticker
+
+    def _allocation(self, step):
+        return {self._ticker(step["asset"]): float(step["amount"]) / 100.0}
+
+    def _add_node(self, node):
+        if node not in self._node_ids:
+            self._node_ids[node] = len(self.nodes)
+            self.nodes.append(node)
+        return self._node_ids[node]
+
+    def _conditions(self, conditions):
+        """
+        Node id of a condition list chained by each entry's ``operator``.
+
+        Runs of the same operator become one n-ary node; a change of operator
+        wraps everything before it, so ``a AND b OR c`` is ``(a AND b) OR c``.
+        """
+        if not conditions:
+            raise ValueError("IF step has no conditions")
+        logic, ids = None, [self._comparison(conditions[0])]
+        for cond in conditions[1:]:
+            op = str(cond.get("operator", "")).upper()
+            if op not in LOGICAL:
+                raise ValueError("unknown operator %r" % cond.get("operator"))
+            if logic is not None and op != logic:
+                ids = [self._add_node((logic.lower(), tuple(ids)))]
+            logic = op
+            ids.append(self._comparison(cond))
+        return ids[0] if logic is None else self._add_node((logic.lower(), tuple(ids)))
+
+    def _comparison(self, cond):
+        if _kind(cond) != "BINARY":
+            raise ValueError("unknown condition %r" % cond.get("type"))
+        fn = COMPARATORS.get(str(cond.get("comp", "")).upper())
+        if fn is None:
+            raise ValueError("unknown comparator %r" % cond.get("comp"))
+        return self._add_node(("cmp", fn, self._operand(cond["first"]), self._operand(cond["second"])))
+
+    def _operand(self, node):
+        if str(node.get("name", "")).lower() == "constant":
+            return ("const", float(node["args"]["value"]))
+        key = indicator_key(node, self.interval)
+        self.references += 1
+        if key not in self._indicator_ids:
+            self._indicator_ids[key] = len(self.indicators)
+            self.indicators.append(key)
+        return ("ind", self._indicator_ids[key])
+
+    # --- evaluation ---
+
+    def compute_indicators(self, bars):
+        """Indicator arrays over ``bars`` ({ticker: {field: array}}), in plan order."""
+        return [indicators.compute(k.name, k.args, bars[k.ticker]) for k in self.indicators]
+
+    def allocation_matrix(self, values, length):
+        results = []
+        for node in self.nodes:
+            results.append(array_node(node, values, results))
+        return leaf_matrix(self.leaves, results, length, len(self.tickers))
+
+    def evaluate(self, bars):
+        """
+        Allocation matrix (bars x ``tickers``) over aligned per-ticker bar
+        arrays ``{ticker: {"open", "high", "low", "close", "volume": array}}``.
+        """
+        length = len(next(iter(bars.values()))["close"])
+        return self.allocation_matrix(self.compute_indicators(bars), length)
+
+    def targets(self, matrix):
+        """Per-bar allocation dicts from an allocation matrix, zero weights dropped."""
+        return [{t: w for t, w in zip(self.tickers, row) if w} for row in matrix.tolist()]
+
+
+class StreamingEvaluator:
+    """
+    Bar-by-bar evaluation of a ``RulePlan``.
+
+    ``update(bar)`` takes the new bar as ``{ticker: {field: value}}``, advances
+    each indicator's state once and evaluates every node once, so a bar costs
+    O(indicators + nodes) however long the history. Per-node evaluation counts
+    and cumulative seconds are kept in ``counts`` and ``seconds``; indicator
+    updates are tallied the same way in ``indicator_counts`` and
+    ``indicator_seconds``.
+    """
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.states = [indicators.streaming(k.name, k.args) for k in plan.indicators]
+        self.values = [indicators.NAN] * len(self.states)
+        self.counts = [0] * len(plan.nodes)
+        self.seconds = [0.0] * len(plan.nodes)
+        self.indicator_counts = [0] * len(self.states)
+        self.indicator_seconds = [0.0] * len(self.states)
+        self.bars = 0
+
+    def update(self, bar):
+        """Allocation dict for the new bar; tickers missing from it keep their values."""
+        clock = time.perf_counter
+        for i, key in enumerate(self.plan.indicators):
+            quote = bar.get(key.ticker)
+            if quote is None:
+                continue
+            start = clock()
+            self.values[i] = self.states[i].update(quote)
+            self.indicator_seconds[i] += clock() - start
+            self.indicator_counts[i] += 1
+        results = []
+        for i, node in enumerate(self.plan.nodes):
+            start = clock()
+            results.append(scalar_node(node, self.values, results))
+            self.seconds[i] += clock() - start
+            self.counts[i] += 1
+        row = leaf_row(self.plan.row_leaves, results, len(self.plan.tickers))
+        self.bars += 1
+        return {t: w for t, w in zip(self.plan.tickers, row) if w}
+
+    def report(self):
+        """Per-node and per-indicator evaluation counts and timings."""
+        nodes = [
+            {"node": i, "kind": node[0], "count": self.counts[i], "seconds": self.seconds[i]}
+            for i, node in enumerate(self.plan.nodes)
+        ]
+        inds = [
+            {"indicator": key, "count": self.indicator_counts[i], "seconds": self.indicator_seconds[i]}
+            for i, key in enumerate(self.plan.indicators)
+        ]
+        return {"bars": self.bars, "nodes": nodes, "indicators": inds}
+
+
+class RuleBatch:
+    """
+    Many rule plans evaluated over one shared indicator and node table.
+
+    Bars are passed per interval: ``{interval: {ticker: fields}}``, with array
+    fields for ``evaluate`` and scalar fields for the bar-by-bar ``step``.
+    A bar costs one update per unique indicator plus a few array operations
+    over the unique nodes and all leaves; ``stats()`` reports total versus
+    unique indicator references and ``seconds`` the time spent in each stage.
+    """
+
+    def __init__(self, documents):
+        self.plans = [compile_document(d) for d in documents]
+        self.indicators = []
+        self.nodes = []
+        self.leaves = []
+        indicator_ids, node_ids = {}, {}
+        for plan in self.plans:
+            imap = []
+            for key in plan.indicators:
+                if key not in indicator_ids:
+                    indicator_ids[key] = len(self.indicators)
+                    self.indicators.append(key)
+                imap.append(indicator_ids[key])
+            nmap = []
+            for node in plan.nodes:
+                if node[0] == "cmp":
+                    node = ("cmp", node[1], self._remap(node[2], imap), self._remap(node[3], imap))
+                else:
+                    node = (node[0], tuple(nmap[i] for i in node[1]))
+                if node not in node_ids:
+                    node_ids[node] = len(self.nodes)
+                    self.nodes.append(node)
+                nmap.append(node_ids[node])
+            self.leaves.append([(tuple((nmap[i], taken) for i, taken in guard), w) for guard, w in plan.leaves])
+        self._flatten_nodes()
+        self._flatten_leaves()
+        self.states = [indicators.streaming(k.name, k.args) for k in self.indicators]
+        self.values = [indicators.NAN] * len(self.states)
+        self.bars = 0
+        self.seconds = {"indicators": 0.0, "nodes": 0.0, "leaves": 0.0}
+
+    def _flatten_nodes(self):
+        # Comparison nodes grouped by comparator as operand index arrays, and
+        # AND/OR nodes grouped by depth as child edge lists, so a bar's nodes
+        # are resolved with a handful of array operations
+        groups = {}
+        depth = [0] * len(self.nodes)
+        edges = {}
+        for n, node in enumerate(self.nodes):
+            if node[0] == "cmp":
+                group = groups.setdefault(node[1], ([], [], [], [], []))
+                group[0].append(n)
+                for side, operand in ((1, node[2]), (3, node[3])):
+                    # Constants read the spare slot past the indicator values
+                    is_indicator = operand[0] == "ind"
+                    group[side].append(operand[1] if is_indicator else len(self.indicators))
+                    group[side + 1].append(0.0 if is_indicator else operand[1])
+            else:
+                depth[n] = 1 + max(depth[i] for i in node[1])
+                level = edges.setdefault(depth[n], {"and": ([], []), "or": ([], [])})[node[0]]
+                for i in node[1]:
+                    level[0].append(n)
+                    level[1].append(i)
+        self.compare_groups = [
+            (fn, np.asarray(ids), np.asarray(li), np.asarray(lc), np.asarray(ri), np.asarray(rc))
+            for fn, (ids, li, lc, ri, rc) in groups.items()
+        ]
+        self.logic_levels = []
+        for d in sorted(edges):
+            for kind, (parents, children) in edges[d].items():
+                if parents:
+                    parents = np.asarray(parents)
+                    self.logic_levels.append((kind, np.unique(parents), parents, np.asarray(children)))
+
+    def node_results(self, values):
+        """Truth value of every global node for one bar of indicator ``values``."""
+        values = np.append(np.asarray(values, dtype=np.float64), 0.0)
+        spare = len(values) - 1
+        results = np.zeros(len(self.nodes), dtype=bool)
+        for fn, ids, li, lc, ri, rc in self.compare_groups:
+            left = np.where(li == spare, lc, values[li])
+            right = np.where(ri == spare, rc, values[ri])
+            results[ids] = fn(left, right)
+        for kind, ids, parents, children in self.logic_levels:
+            hits = np.bincount(parents, weights=results[children] if kind == "or" else ~results[children], minlength=len(self.nodes))
+            results[ids] = hits[ids] > 0 if kind == "or" else hits[ids] == 0
+        return results
+
+    def _flatten_leaves(self):
+        # Every leaf of every plan as flat guard and weight-entry arrays, so a
+        # bar's leaves are resolved with two bincounts instead of a loop per plan
+        guard_node, guard_taken, guard_leaf = [], [], []
+        entry_leaf, entry_column, entry_weight = [], [], []
+        self.columns = [0]
+        leaf = 0
+        for plan, leaves in zip(self.plans, self.leaves):
+            base = self.columns[-1]
+            for guard, entries in sparse_leaves(leaves):
+                for i, taken in guard:
+                    guard_node.append(i)
+                    guard_taken.append(taken)
+                    guard_leaf.append(leaf)
+                for j, w in entries:
+                    entry_leaf.append(leaf)
+                    entry_column.append(base + j)
+                    entry_weight.append(w)
+                leaf += 1
+            self.columns.append(base + len(plan.tickers))
+        self.leaf_count = leaf
+        self.guard_node = np.asarray(guard_node, dtype=np.int64)
+        self.guard_taken = np.asarray(guard_taken, dtype=bool)
+        self.guard_leaf = np.asarray(guard_leaf, dtype=np.int64)
+        self.entry_leaf = np.asarray(entry_leaf, dtype=np.int64)
+        self.entry_column = np.asarray(entry_column, dtype=np.int64)
+        self.entry_weight = np.asarray(entry_weight, dtype=np.float64)
+
+    @classmethod
+    def from_paths(cls, paths):
+        documents = []
+        for path in paths:
+            with open(path) as f:
+                documents.append(json.load(f))
+        return cls(documents)
+
+    @staticmethod
+    def _remap(operand, imap):
+        return operand if operand[0] == "const" else ("ind", imap[operand[1]])
+
+    def stats(self):
+        """Total versus unique indicator references and condition nodes."""
+        return {
+            "strategies": len(self.plans),
+            "indicator_references": sum(p.references for p in self.plans),
+            "plan_indicators": sum(len(p.indicators) for p in self.plans),
+            "unique_indicators": len(self.indicators),
+            "condition_nodes": sum(len(p.nodes) for p in self.plans),
+            "unique_nodes": len(self.nodes),
+        }
+
+    def evaluate(self, bars):
+        """One allocation matrix per plan over full per-interval bar arrays."""
+        values = [indicators.compute(k.name, k.args, bars[k.interval][k.ticker]) for k in self.indicators]
+        results = []
+        for node in self.nodes:
+            results.append(array_node(node, values, results))
+        matrices = []
+        for plan, leaves in zip(self.plans, self.leaves):
+            length = len(next(iter(bars[plan.interval].values()))["close"])
+            matrices.append(leaf_matrix(leaves, results, length, len(plan.tickers)))
+        return matrices
+
+    def step(self, bars):
+        """
+        Advances the indicators of every interval present in ``bars`` by one bar
+        and returns the weights of all plans as one flat row; plan ``k`` owns
+        ``row[columns[k]:columns[k + 1]]`` over its ``tickers``.
+        """
+        clock = time.perf_counter
+        start = clock()
+        for i, key in enumerate(self.indicators):
+            quote = bars.get(key.interval, {}).get(key.ticker)
+            if quote is not None:
+                self.values[i] = self.states[i].update(quote)
+        mark = clock()
+        results = self.node_results(self.values)
+        done = clock()
+        failed = np.bincount(self.guard_leaf, weights=results[self.guard_node] != self.guard_taken, minlength=self.leaf_count)
+        active = failed[self.entry_leaf] == 0
+        row = np.bincount(self.entry_column, weights=self.entry_weight * active, minlength=self.columns[-1])
+        self.seconds["indicators"] += mark - start
+        self.seconds["nodes"] += done - mark
+        self.seconds["leaves"] += clock() - done
+        self.bars += 1
+        return row
+
+    def split(self, row):
+        """Per-plan allocation dicts from a flat ``step`` row."""
+        row = row.tolist()
+        return [
+            {t: w for t, w in zip(plan.tickers, row[lo:hi]) if w}
+            for plan, lo, hi in zip(self.plans, self.columns, self.columns[1:])
+        ]
+
+    def update(self, bars):
+        """``step`` followed by ``split``: the allocation dict of each plan."""
+        return self.split(self.step(bars))
+
+
+def compile_document(document):
+    """Compiled ``RulePlan`` for ``document``, cached by document hash."""
+    digest = document_hash(document)
+    plan = _plans.get(digest)
+    if plan is None:
+        plan = RulePlan(document, digest)
+        _plans[digest] = plan
+        if len(_plans) > PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    else:
+        _plans.move_to_end(digest)
+    return plan
+
+
+def load_plan(path):
+    """Compiles a rule document from a JSON file."""
+    with open(path) as f:
+        return compile_document(json.load(f))
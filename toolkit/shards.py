@@ -0,0 +1,240 @@
+"""
+Sharded universe scan for the En/EAn fundamental scoring model (78bf1974).
+
+A ``ShardCoordinator`` plugs into the strategy's ``scanner`` hook. On each
+rebalance it splits the universe into contiguous ticker shards, ships every
+shard's bars and fundamental feeds to a worker, and merges the partial scans
+(liquidity, ``calculate_scores``, ``func_DF``) back in global ticker order, so
+the percentile and allocation computed by ``apply_scan`` do not depend on how
+many workers there are or in which order they answer.
+
+Workers speak ``multiprocessing.connection``: pickled messages over TCP,
+authenticated with an HMAC key. Unpickling runs code, so anyone holding the
+key can run code on a worker; there is no built-in key, and workers bind to
+localhost unless given a host:
+
+    SHARDS_AUTHKEY=... python -m toolkit.shards serve [HOST:]PORT 78bf1974-7e8a-4f7b-930d-a9348c34d52f
+
+A failed request is answered with ``("error", traceback)`` and the worker
+keeps serving, as it does after a connection that fails authentication; ``ShardCoordinator`` raises it as ``ShardError``.
+``LocalCluster`` starts the same workers as local processes, with a random
+key, to stand in for remote nodes.
+"""
+import argparse
+import multiprocessing
+import os
+import traceback
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from toolkit.strategies import load_strategy
+
+AUTHKEY_ENV = "SHARDS_AUTHKEY"
+DEFAULT_HOST = "127.0.0.1"
+
+# Strategy attributes a worker needs to score exactly like the coordinator.
+SCAN_PARAMS = ("min_dollar_volume", "liquidity_lookback", "W1", "W2", "W3", "Weight_En", "Weight_EAn")
+
+
+class ShardError(RuntimeError):
+    """A shard worker failed to answer a request."""
+
+
+def authkey_from_env(environ=None):
+    """The shard key from ``$SHARDS_AUTHKEY``; raises if it is unset or empty."""
+    key = (environ if environ is not None else os.environ).get(AUTHKEY_ENV)
+    if not key:
+        raise ValueError("set %s to the shard authentication key" % AUTHKEY_ENV)
+    return key.encode()
+
+
+def parse_address(text):
+    """``(host, port)`` from ``HOST:PORT`` or ``PORT`` (localhost)."""
+    host, _, port = text.rpartition(":")
+    return (host or DEFAULT_HOST, int(port))
+
+
+def split_shards(tickers, n_shards):
+    """Splits sorted tickers into ``n_shards`` contiguous, near-equal shards."""
+    tickers = sorted(tickers)
+    size, extra = divmod(len(tickers), n_shards)
+    shards, start = [], 0
+    for i in range(n_shards):
+        stop = start + size + (1 if i < extra else 0)
+        shards.append(tickers[start:stop])
+        start = stop
+    return shards
+
+
+def shard_data(data, tickers):
+    """The subset of a strategy ``data`` dict that one shard needs."""
+    wanted = set(tickers)
+    ohlcv = data.get("ohlcv", {})
+    subset = {"ohlcv": {t: ohlcv[t] for t in tickers if t in ohlcv}}
+    for key, value in data.items():
+        if isinstance(key, tuple) and len(key) > 1 and key[1] in wanted:
+            subset[key] = value
+    return subset
+
+
+def _scan(scanner, message):
+    if not isinstance(message, tuple) or len(message) != 2 or message[0] != "scan":
+        raise ValueError("unknown message %r" % (message,))
+    request = message[1]
+    for name, value in request["params"].items():
+        setattr(scanner, name, value)
+    scanner.tickers = request["tickers"]
+    scanner.initial_prices = dict(request["initial_prices"])
+    return scanner.scan_universe(request["data"], request["held"])
+
+
+def serve(address, strategy, authkey, ready=None):
+    """
+    Runs a shard worker until it receives ``("stop",)``.
+
+    Each ``("scan", request)`` message is answered with ``("ok", partial
+    scan)`` of the request's tickers, or ``("error", traceback)`` if it fails.
+    ``ready`` (a connection) receives the bound address, which lets callers
+    bind to port 0.
+    """
+    if not authkey:
+        raise ValueError("serve needs an authentication key")
+    scanner = load_strategy(strategy)
+    with Listener(address, authkey=authkey) as listener:
+        if ready is not None:
+            ready.send(listener.address)
+            ready.close()
+        while True:
+            try:
+                conn = listener.accept()
+            except AuthenticationError:
+                continue
+            with conn:
+                while True:
+                    try:
+                        message = conn.recv()
+                    except EOFError:
+                        break
+                    if message == ("stop",):
+                        return
+                    try:
+                        reply = ("ok", _scan(scanner, message))
+                    except Exception:
+                        reply = ("error", traceback.format_exc())
+                    conn.send(reply)
+
+
+class ShardCoordinator:
+    """
+    Scan backend that fans a rebalance out to shard workers.
+
+    Assign an instance to ``strategy.scanner``; it is called with the same
+    ``(data, held_tickers)`` arguments as ``scan_universe`` and returns the
+    same merged result.
+    """
+
+    def __init__(self, strategy, addresses, authkey):
+        self.strategy = strategy
+        self.addresses = list(addresses)
+        self.authkey = authkey
+        self._connections = None
+
+    def connect(self):
+        if self._connections is None:
+            self._connections = [Client(a, authkey=self.authkey) for a in self.addresses]
+        return self._connections
+
+    def close(self):
+        for conn in self._connections or []:
+            conn.close()
+        self._connections = None
+
+    def __call__(self, data, held_tickers):
+        connections = self.connect()
+        strategy = self.strategy
+        shards = split_shards(strategy.tickers, len(connections))
+        held = set(held_tickers)
+        params = {name: getattr(strategy, name) for name in SCAN_PARAMS}
+
+        # Send every request before waiting on any reply so shards run in parallel.
+        for conn, tickers in zip(connections, shards):
+            members = set(tickers)
+            shard_held = [t for t in held_tickers if t in members]
+            conn.send(("scan", {
+                "tickers": tickers,
+                "held": shard_held,
+                "params": params,
+                "initial_prices": {t: strategy.initial_prices[t] for t in shard_held},
+                "data": shard_data(data, tickers + shard_held),
+            }))
+        # Every reply is read before reporting a failure, so no connection is
+        # left holding a stale reply for the next request.
+        replies = [conn.recv() for conn in connections]
+        failures = [
+            "shard %s:%s failed:\n%s" % (address[0], address[1], value)
+            for address, (status, value) in zip(self.addresses, replies) if status != "ok"
+        ]
+        if failures:
+            raise ShardError("\n".join(failures))
+        partials = [value for _, value in replies]
+
+        merged = {"liquid": [], "scores": {}, "func_DF": {}}
+        for partial in partials:
+            merged["liquid"].extend(partial["liquid"])
+            merged["scores"].update(partial["scores"])
+            merged["func_DF"].update(partial["func_DF"])
+
+        # Held names outside the universe still need their fundamental exit metric.
+        for ticker in held_tickers:
+            if ticker not in merged["func_DF"]:
+                merged["func_DF"][ticker] = strategy.func_DF(ticker, data, data["ohlcv"][ticker][-1]["close"])
+        return merged
+
+
+class LocalCluster:
+    """Local worker processes standing in for remote shard nodes."""
+
+    def __init__(self, strategy, n_workers, authkey=None, host=DEFAULT_HOST):
+        self.processes = []
+        self.addresses = []
+        self.authkey = authkey or os.urandom(32)
+        context = multiprocessing.get_context("spawn")
+        for _ in range(n_workers):
+            reader, writer = context.Pipe(duplex=False)
+            process = context.Process(target=serve, args=((host, 0), strategy, self.authkey, writer), daemon=True)
+            process.start()
+            writer.close()
+            self.addresses.append(reader.recv())
+            self.processes.append(process)
+
+    def stop(self):
+        for address, process in zip(self.addresses, self.processes):
+            if process.is_alive():
+                with Client(address, authkey=self.authkey) as conn:
+                    conn.send(("stop",))
+            process.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m toolkit.shards")
+    commands = parser.add_subparsers(dest="command", required=True)
+    command = commands.add_parser("serve", help="run a shard worker")
+    command.add_argument("address", help="[HOST:]PORT to listen on (host defaults to %s)" % DEFAULT_HOST)
+    command.add_argument("strategy", help="strategy folder")
+    command.add_argument("--authkey", help="authentication key (default: $%s)" % AUTHKEY_ENV)
+    args = parser.parse_args(argv)
+    try:
+        authkey = args.authkey.encode() if args.authkey else authkey_from_env()
+    except ValueError as exc:
+        parser.error(str(exc))
+    serve(parse_address(args.address), args.strategy, authkey)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Loading strategy modules from their folders.
+
+Strategy folders are named by UUID and hold a single ``main.py``; they are not
+importable packages, so they are loaded by path. Some folders hold only a
+placeholder main.py ("#Type code here"); ``is_strategy`` tells them apart
+without importing anything.
+"""
+import ast
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Strategies whose data["ohlcv"] is {ticker: [bars]}; every other strategy reads
+# a list of bars, each mapping ticker -> OHLCV dict.
+BY_TICKER = {
+    "78bf1974-7e8a-4f7b-930d-a9348c34d52f",
+    "35dfce14-dcb1-4717-8d21-17445bf0f6cb",
+}
+
+
+def strategy_path(strategy):
+    """Resolves a strategy folder name, folder path or file path to its main.py."""
+    path = strategy if os.path.isabs(strategy) else os.path.join(ROOT, strategy)
+    if os.path.isdir(path):
+        path = os.path.join(path, "main.py")
+    return path
+
+
+def ohlcv_layout(strategy):
+    """``"by_ticker"`` or ``"bars"``: the shape of ``data["ohlcv"]`` a strategy reads."""
+    folder = os.path.basename(os.path.dirname(strategy_path(strategy)))
+    return "by_ticker" if folder in BY_TICKER else "bars"
+
+
+def is_strategy(strategy):
+    """Whether a folder's main.py exists and defines a ``TradingStrategy`` class."""
+    try:
+        with open(strategy_path(strategy)) as f:
+            tree = ast.parse(f.read())
+    except (OSError, SyntaxError, ValueError):
+        return False
+    return any(isinstance(node, ast.ClassDef) and node.name == "TradingStrategy" for node in tree.body)
+
+
+def load_module(strategy, name=None):
+    """Imports a strategy's main.py under a unique module name and returns the module."""
+    path = strategy_path(strategy)
+    name = name or "strategy_" + os.path.basename(os.path.dirname(path)).replace("-", "_")
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def load_strategy(strategy):
+    """Instantiates the ``TradingStrategy`` defined in a strategy folder."""
+    return load_module(strategy).TradingStrategy()
@@ -0,0 +1,248 @@
+"""
+Walk-forward optimization of the timing strategies' constants.
+
+The ROAR and Lipps scripts hard-code ``rebalance_day``, MA windows, TSI spans
+and filter lengths that were fit on the whole history. ``WalkForward`` splits
+the bars into rolling (or anchored) train/test folds, picks the best
+parameter candidate on each train window and stitches the chosen candidates'
+targets over the following test windows into one out-of-sample timeline.
+
+A rule is any object with ``dates``, ``tickers``, a (D, N) ``prices`` panel
+and ``weights(params)`` returning (D, N) targets computed causally over the
+whole history. Causality is what makes the search cheap: each candidate's
+daily returns are computed once (``metrics.evaluate``) and every fold scores
+its train slice of that one (C, D) return matrix, so the cost is one
+vectorized backtest per candidate however many folds there are. Candidates
+are spread over a process pool in chunks; inside a worker the rule's
+``IndicatorCache`` keeps every indicator a candidate computed (a TSI pair, a
+midpoint length), so candidates that share a setting share the array.
+
+``LippsTimingRule`` is the vectorized form of e7962af0 (blended TSI score,
+31-period midline over rebalance-day scores, 52-bar Ichimoku midpoint,
+Tuesday rebalances), with each of those constants exposed as a parameter.
+"""
+import itertools
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from toolkit.asof import to_days
+from toolkit.indicators import midpoint, sma, tsi
+from toolkit.metrics import PERIODS, evaluate, price_panel, summary, timeline_from
+
+_rule = None
+_options = None
+
+
+class IndicatorCache:
+    """Indicator arrays over one close series keyed by ``(kernel, *args)``."""
+
+    def __init__(self, close):
+        self.close = close
+        self.values = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kernel, *args):
+        key = (kernel.__name__,) + args
+        if key in self.values:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.values[key] = kernel(self.close, *args)
+        return self.values[key]
+
+
+TIMING_DEFAULTS = {
+    "rebalance_day": 1, "short_spans": (5, 10), "long_spans": (5, 20),
+    "blend": 0.75, "midline": 31, "cloud": 52, "warmup": 120,
+}
+
+
+def timing_weights(cache, weekdays, params):
+    """
+    Risk-asset weight (0 or 1) of e7962af0 per bar along the last axis of
+    ``cache.close``; leading axes (e.g. simulated paths) are evaluated at once.
+
+    The score is appended on every post-warmup rebalance day, the decision
+    waits for the first valid midline, and weights hold between decisions.
+    """
+    p = dict(TIMING_DEFAULTS, **params)
+    close = cache.close
+    size = close.shape[-1]
+    score = p["blend"] * cache.get(tsi, *p["short_spans"]) + (1.0 - p["blend"]) * cache.get(tsi, *p["long_spans"])
+    regime = close > cache.get(midpoint, p["cloud"])
+    rebalance = np.flatnonzero((weekdays == p["rebalance_day"]) & (np.arange(size) >= p["warmup"] - 1))
+    history = score[..., rebalance]
+    line = sma(history, p["midline"])
+    valid = np.flatnonzero(~np.isnan(line).reshape(-1, len(rebalance)).all(axis=0))
+    if not len(valid):
+        return np.zeros(close.shape)
+    decided = rebalance[valid[0]:]
+    on = (history[..., valid[0]:] > line[..., valid[0]:]) & regime[..., decided]
+    rows = np.searchsorted(decided, np.arange(size), side="right") - 1
+    return np.where(rows >= 0, on[..., np.maximum(rows, 0)], False).astype(float)
+
+
+class LippsTimingRule:
+    """
+    e7962af0 over whole arrays: SPY when the blended TSI score is above its
+    midline and SPY closes above its cloud midpoint, BIL otherwise.
+
+    ``bars`` is ``{ticker: [bar, ...]}`` with at least SPY; the date axis is
+    SPY's. With ``TIMING_DEFAULTS`` the targets equal the script's bar by bar.
+    """
+
+    def __init__(self, bars, risk="SPY", safe="BIL"):
+        self.dates = [bar["date"] for bar in bars[risk]]
+        self.weekdays = (to_days(self.dates) + 3) % 7
+        self.tickers = [risk, safe]
+        self.prices = price_panel(bars, self.dates, self.tickers)
+        self.cache = IndicatorCache(self.prices[:, 0].copy())
+
+    def weights(self, params):
+        risk = timing_weights(self.cache, self.weekdays, params)
+        return np.column_stack([risk, 1.0 - risk])
+
+
+def folds(n, train, test, step=None, anchored=False):
+    """
+    ``(train, test)`` slice pairs over ``n`` bars: ``train`` bars followed by
+    ``test`` bars, advancing by ``step`` (default ``test``). Anchored folds
+    keep the train window's start at 0.
+    """
+    step = step or test
+    out = []
+    start = 0
+    while start + train + test <= n:
+        out.append((slice(0 if anchored else start, start + train), slice(start + train, start + train + test)))
+        start += step
+    return out
+
+
+def grid(space):
+    """Every combination of ``{name: [values]}``."""
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def sample(space, count, seed=0):
+    """``count`` distinct random combinations of ``{name: [values]}``."""
+    candidates = grid(space)
+    if count >= len(candidates):
+        return candidates
+    return random.Random(seed).sample(candidates, count)
+
+
+def sharpe(returns, periods=PERIODS):
+    std = returns.std(axis=-1, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(std > 1e-12, returns.mean(axis=-1) / std, -np.inf) * np.sqrt(periods)
+
+
+def total_return(returns, periods=PERIODS):
+    return np.expm1(np.log1p(returns).sum(axis=-1))
+
+
+def calmar(returns, periods=PERIODS):
+    equity = np.cumprod(1.0 + returns, axis=-1)
+    worst = (equity / np.maximum.accumulate(equity, axis=-1) - 1.0).min(axis=-1)
+    growth = equity[..., -1] ** (periods / returns.shape[-1]) - 1.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(worst < 0, growth / -worst, np.inf * np.sign(growth))
+
+
+OBJECTIVES = {"sharpe": sharpe, "return": total_return, "calmar": calmar}
+
+
+def candidate_returns(candidates, rule=None, options=None):
+    """Daily net returns (C, D) of each candidate over the rule's whole history."""
+    rule = rule or _rule
+    options = options or _options
+    return np.array([evaluate(rule.weights(params), rule.prices, **options)["returns"] for params in candidates])
+
+
+def _init_worker(rule, options):
+    global _rule, _options
+    _rule, _options = rule, options
+
+
+class WalkForward:
+    """
+    Walk-forward study of ``candidates`` (parameter dicts) for ``rule``.
+
+    ``train``/``test``/``step`` are in bars; ``objective`` names an entry of
+    ``OBJECTIVES`` scored on each train slice. ``lag`` and ``cost_bps`` go to
+    ``metrics.evaluate``. ``workers=0`` runs in-process.
+    """
+
+    def __init__(self, rule, candidates, train=756, test=126, step=None, anchored=False, objective="sharpe",
+                 lag=1, cost_bps=0.0, workers=None, chunk_size=8):
+        self.rule = rule
+        self.candidates = list(candidates)
+        self.folds = folds(len(rule.dates), train, test, step, anchored)
+        self.objective = OBJECTIVES[objective]
+        self.options = {"lag": lag, "cost_bps": cost_bps}
+        self.workers = os.cpu_count() if workers is None else workers
+        self.chunk_size = chunk_size
+        self.returns = None
+
+    def search(self):
+        """Computes (once) and returns the candidates' return matrix."""
+        if self.returns is not None:
+            return self.returns
+        chunks = [self.candidates[i:i + self.chunk_size] for i in range(0, len(self.candidates), self.chunk_size)]
+        if self.workers == 0:
+            parts = [candidate_returns(chunk, self.rule, self.options) for chunk in chunks]
+        else:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+            with ProcessPoolExecutor(min(self.workers, len(chunks)), context, _init_worker, (self.rule, self.options)) as pool:
+                parts = list(pool.map(candidate_returns, chunks))
+        self.returns = np.concatenate(parts) if parts else np.zeros((0, len(self.rule.dates)))
+        return self.returns
+
+    def run(self):
+        """
+        Selects a candidate per fold and stitches the out-of-sample targets.
+
+        Returns a dict with ``folds`` (dates, chosen params, train and test
+        scores), the stitched ``weights`` and ``timeline`` of the out-of-sample
+        span, its ``evaluate`` series as ``metrics`` and their ``summary``.
+        """
+        returns = self.search()
+        lag = self.options["lag"]
+        dates = self.rule.dates
+        stitched = np.zeros_like(self.rule.prices)
+        report = []
+        for train, test in self.folds:
+            scores = self.objective(returns[:, train])
+            best = int(np.argmax(scores))
+            params = self.candidates[best]
+            # Targets decided ``lag`` bars before each test bar are the ones held on it
+            rows = slice(test.start - lag, test.stop - lag)
+            stitched[rows] = np.nan_to_num(self.rule.weights(params))[rows]
+            report.append({
+                "train": (dates[train.start], dates[train.stop - 1]),
+                "test": (dates[test.start], dates[test.stop - 1]),
+                "params": params,
+                "train_score": float(scores[best]),
+                "test_score": float(self.objective(returns[best, test])),
+            })
+        if not self.folds:
+            return {"folds": [], "weights": stitched[:0], "timeline": [], "metrics": {}, "summary": {}}
+        span = slice(self.folds[0][1].start, self.folds[-1][1].stop)
+        series = evaluate(stitched, self.rule.prices, **self.options)
+        series = {name: values[span] for name, values in series.items()}
+        series["equity"] = np.cumprod(1.0 + series["returns"])
+        series["drawdown"] = series["equity"] / np.maximum.accumulate(series["equity"]) - 1.0
+        return {
+            "folds": report,
+            "weights": stitched[span],
+            "timeline": timeline_from(stitched[span], dates[span], self.rule.tickers),
+            "metrics": series,
+            "summary": {k: float(v) for k, v in summary(series).items()},
+        }
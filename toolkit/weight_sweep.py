@@ -0,0 +1,151 @@
+"""
+Weight sweep for the En/EAn fundamental scoring model (78bf1974).
+
+``En`` and ``EAn`` are linear in the components B1..B3 and A1..A3, and the
+``combined`` score is linear in En/EAn:
+
+    combined = Weight_En  * (W1*B1 + W2*B2 + W3*B3)
+             + Weight_EAn * (W1*A1 + W2*A2 + W3*A3)
+
+So the six component matrices (rebalance date x ticker) are computed once with
+the strategy's own ``calculate_components`` and every candidate weight vector
+(W1, W2, W3, Weight_En, Weight_EAn) becomes one row of a coefficient matrix.
+All candidates in a chunk are scored with a single matrix multiply, then the
+90th-percentile selection, the 3-period streak rule and the score-weighted
+allocation are applied per candidate with array operations.
+
+As in the strategy's ``apply_scan``, the candidates on each rebalance are the
+names already held plus the newly eligible ones: a name enters after a
+3-period streak and keeps its (floored) score weight after the streak breaks,
+until it exits.
+
+Research mode models the monthly scan only: stop losses, profit taking and the
+func_DF exit depend on daily prices and entry state and are left to the full
+backtest. Without ``exits`` a name is held from entry to the end of the sweep,
+so the results match the strategy only over spans where it made no exits; an
+``exits`` mask taken from a full backtest closes those positions as it did.
+"""
+import numpy as np
+
+COMPONENTS = ("B1", "B2", "B3", "A1", "A2", "A3")
+WEIGHT_FIELDS = ("W1", "W2", "W3", "Weight_En", "Weight_EAn")
+
+# Score the strategy assigns to liquid tickers whose feeds fail to score.
+MISSING_SCORE = -999.0
+
+
+def coefficient_matrix(weights):
+    """Maps (K, 5) weight vectors to (K, 6) coefficients on B1..B3, A1..A3."""
+    w = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    return np.hstack([w[:, 3:4] * w[:, :3], w[:, 4:5] * w[:, :3]])
+
+
+def component_matrices(strategy, frames):
+    """
+    Runs the strategy's liquidity filter and component scoring over ``frames``.
+
+    ``frames`` is an iterable of the ``data`` dicts the strategy sees on each
+    rebalance date (e.g. built with ``toolkit.asof.AsOfJoin``). Returns
+    ``(components, liquid)`` with shapes (6, D, T) and (D, T) over
+    ``strategy.tickers``; components are NaN where scoring failed.
+    """
+    tickers = strategy.tickers
+    components, liquid = [], []
+    for data in frames:
+        ohlcv = data.get("ohlcv", {})
+        rows = np.full((len(COMPONENTS), len(tickers)), np.nan)
+        mask = np.zeros(len(tickers), dtype=bool)
+        for j, ticker in enumerate(tickers):
+            if not strategy.check_liquidity(ticker, ohlcv.get(ticker, [])):
+                continue
+            mask[j] = True
+            values = strategy.calculate_components(ticker, data)
+            if values:
+                rows[:, j] = [values[c] for c in COMPONENTS]
+        components.append(rows)
+        liquid.append(mask)
+    return np.stack(components, axis=1), np.vstack(liquid)
+
+
+def iter_sweep(components, liquid, weights, percentile=90, streak=3, chunk_size=256, exits=None):
+    """
+    Evaluates weight vectors in chunks.
+
+    ``exits`` is an optional (D, T) mask of names dropped from the holdings on
+    each rebalance date (stops, profit taking, func_DF). Yields ``(index, allocations, turnover)`` per chunk, where ``index`` is the
+    slice of ``weights`` covered, ``allocations`` has shape (k, D, T) and
+    ``turnover`` (one-way, 0.5 * sum |dw|) has shape (k, D).
+    """
+    components = np.asarray(components, dtype=np.float64)
+    liquid = np.asarray(liquid, dtype=bool)
+    n_comp, n_dates, n_tickers = components.shape
+    flat = components.reshape(n_comp, -1)
+    failed = np.isnan(flat).any(axis=0).reshape(n_dates, n_tickers)
+    flat = np.nan_to_num(flat)
+    coefficients = coefficient_matrix(weights)
+    exits = np.zeros((n_dates, n_tickers), dtype=bool) if exits is None else np.asarray(exits, dtype=bool)
+
+    for start in range(0, len(coefficients), chunk_size):
+        coef = coefficients[start:start + chunk_size]
+        k = len(coef)
+        combined = (coef @ flat).reshape(k, n_dates, n_tickers)
+        combined[:, failed] = MISSING_SCORE
+        combined[:, ~liquid] = np.nan
+
+        has_liquid = liquid.any(axis=1)
+        threshold = np.full((k, n_dates), -np.inf)
+        if has_liquid.any():
+            threshold[:, has_liquid] = np.nanpercentile(combined[:, has_liquid], percentile, axis=2)
+
+        # Streaks only move for tickers that passed the liquidity filter.
+        # Held names stay candidates until they exit, whatever their streak.
+        counts = np.zeros((k, n_tickers), dtype=np.int64)
+        held = np.zeros((k, n_tickers), dtype=bool)
+        allocations = np.zeros((k, n_dates, n_tickers))
+        for d in range(n_dates):
+            top = combined[:, d] >= threshold[:, d, None]
+            counts = np.where(liquid[d], np.where(top, counts + 1, 0), counts)
+            held = (held | (counts >= streak)) & ~exits[d]
+            score = np.where(held, np.nan_to_num(np.maximum(combined[:, d], 0.0)), 0.0)
+            total = score.sum(axis=1, keepdims=True)
+            allocations[:, d] = np.divide(score, total, out=np.zeros_like(score), where=total > 0)
+
+        previous = np.concatenate([np.zeros((k, 1, n_tickers)), allocations[:, :-1]], axis=1)
+        turnover = 0.5 * np.abs(allocations - previous).sum(axis=2)
+        yield slice(start, start + k), allocations, turnover
+
+
+def sweep(components, liquid, weights, percentile=90, streak=3, chunk_size=256, keep=(), exits=None):
+    """
+    Evaluates every weight vector and summarizes the results.
+
+    Returns a dict with ``turnover`` (K, D), ``mean_turnover`` (K,),
+    ``holdings`` (K, D) number of names held, and ``allocations`` mapping each
+    candidate index in ``keep`` to its (D, T) allocation timeline.
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    keep = set(keep)
+    turnover = np.zeros((len(weights), np.shape(liquid)[0]))
+    holdings = np.zeros_like(turnover, dtype=np.int64)
+    kept = {}
+    for index, allocations, chunk_turnover in iter_sweep(
+        components, liquid, weights, percentile, streak, chunk_size, exits
+    ):
+        turnover[index] = chunk_turnover
+        holdings[index] = (allocations > 0).sum(axis=2)
+        for i in range(index.start, index.start + len(allocations)):
+            if i in keep:
+                kept[i] = allocations[i - index.start]
+    return {
+        "weights": weights,
+        "turnover": turnover,
+        "mean_turnover": turnover.mean(axis=1),
+        "holdings": holdings,
+        "allocations": kept,
+    }
+
+
+def weight_grid(*axes):
+    """Cartesian product of per-field value lists, in ``WEIGHT_FIELDS`` order."""
+    mesh = np.meshgrid(*[np.asarray(a, dtype=np.float64) for a in axes], indexing="ij")
+    return np.stack([m.ravel() for m in mesh], axis=1)
@@ -0,0 +1,116 @@
+"""
+Bounded ``data["ohlcv"]`` windows for strategies that declare their lookback.
+
+``data["ohlcv"]`` normally carries the whole history and grows by one bar per
+call, although every strategy here only reads a bounded tail of it. A strategy
+can declare how many bars it reads with a ``max_lookback`` property, either as
+one number or per ticker (``"*"`` is the default for unlisted tickers):
+
+    @property
+    def max_lookback(self):
+        return 662
+
+``WindowedRunner`` then hands the strategy a ``RecordView`` over the last
+``max_lookback`` bars of a ring buffer, so per-call cost and memory stop
+growing with the length of the backtest. Both ``data["ohlcv"]`` layouts are
+supported: a list of ``{ticker: bar}`` rows (``"bars"``), which is bounded by
+the largest declared lookback, and ``{ticker: [bars]}`` (``"by_ticker"``).
+
+Given a ``reference`` instance of the same strategy, the runner also runs it
+on the unbounded history and records every bar where the two allocations
+differ in ``mismatches``.
+"""
+from toolkit.allocations import weights_of
+from toolkit.asof import RecordView
+
+
+def declared_lookback(strategy):
+    """The ``max_lookback`` a strategy declares, or None for unbounded."""
+    return getattr(strategy, "max_lookback", None)
+
+
+def lookback_for(lookback, ticker=None):
+    """Bars to keep for ``ticker`` (the largest declared value when ticker is None)."""
+    if lookback is None or isinstance(lookback, int):
+        return lookback
+    if ticker is None:
+        return max(lookback.values()) if lookback and None not in lookback.values() else None
+    return lookback.get(ticker, lookback.get("*"))
+
+
+class RingWindow:
+    """
+    Keeps the last ``size`` items appended (all of them when size is None).
+
+    Items live in a buffer of up to ``2 * size`` entries that is cut back to
+    ``size`` when full, so appends are amortized O(1) and ``view()`` is always
+    a contiguous, non-copying slice. Cutting back swaps in a new list, so
+    views handed out earlier stay valid.
+    """
+
+    def __init__(self, size=None):
+        self.size = size
+        self.buffer = []
+
+    def append(self, item):
+        if self.size is not None and len(self.buffer) >= 2 * self.size:
+            self.buffer = self.buffer[-self.size:]
+        self.buffer.append(item)
+
+    def __len__(self):
+        return len(self.buffer) if self.size is None else min(len(self.buffer), self.size)
+
+    def view(self):
+        return RecordView(self.buffer, len(self.buffer) - len(self), len(self.buffer))
+
+
+class WindowedRunner:
+    """
+    Feeds a strategy one bar at a time through lookback-bounded windows.
+
+    ``step(bar, extra)`` takes the new bar as ``{ticker: bar}`` plus any other
+    ``data`` entries (alt-data feeds) and returns the strategy's allocation.
+    """
+
+    def __init__(self, strategy, layout="bars", reference=None):
+        self.strategy = strategy
+        self.layout = layout
+        self.lookback = declared_lookback(strategy)
+        self.rows = RingWindow(lookback_for(self.lookback))
+        self.windows = {}
+        self.reference = reference
+        self.history = [] if layout == "bars" else {}
+        self.mismatches = []
+        self.bars = 0
+
+    def _ohlcv(self, bar):
+        if self.layout == "bars":
+            self.rows.append(bar)
+            return self.rows.view()
+        for ticker, quote in bar.items():
+            if ticker not in self.windows:
+                self.windows[ticker] = RingWindow(lookback_for(self.lookback, ticker))
+            self.windows[ticker].append(quote)
+        return {ticker: window.view() for ticker, window in self.windows.items()}
+
+    def _full(self, bar):
+        if self.layout == "bars":
+            self.history.append(bar)
+            return self.history
+        for ticker, quote in bar.items():
+            self.history.setdefault(ticker, []).append(quote)
+        return self.history
+
+    def step(self, bar, extra=None):
+        data = {"ohlcv": self._ohlcv(bar)}
+        data.update(extra or {})
+        target = self.strategy.run(data)
+        if self.reference is not None:
+            full = {"ohlcv": self._full(bar)}
+            full.update(extra or {})
+            expected = self.reference.run(full)
+            if weights_of(target) != weights_of(expected):
+                date = next(iter(bar.values()), {}).get("date")
+                self.mismatches.append({"bar": self.bars, "date": date, "bounded": weights_of(target), "unbounded": weights_of(expected)})
+        self.bars += 1
+        return target